@@ -0,0 +1,241 @@
+# bench/checks.py
+
+"""
+Regression checks for behaviour the benchmark can't show as a latency:
+each one drives the real code against the local stand-ins and asserts
+what happened. Exits non-zero if any check fails.
+
+    python -m bench.checks
+    python -m bench.checks presign_drift
+"""
+
+import os
+import sys
+import asyncio
+import logging
+import argparse
+import tempfile
+import traceback
+from typing import Awaitable, Callable, Dict, List
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+
+from solders.keypair import Keypair
+from bench.standins import StandIns
+from bench.run import _configure_env
+
+logger = logging.getLogger(__name__)
+
+Check = Callable[[StandIns, List[str]], Awaitable[None]]
+CHECKS: Dict[str, Check] = {}
+
+
+def check(fn: Check) -> Check:
+    CHECKS[fn.__name__[len("check_"):]] = fn
+    return fn
+
+
+@check
+async def check_presign_drift(standins: StandIns, mints: List[str]) -> None:
+    from transactions.fetch_price import fetch_price_usdc, usdc_prices
+    from transactions.presign import presigned
+    from transactions.wallets import get_wallets
+
+    keypair = get_wallets().default().keypair
+    mint = mints[-1]
+    args = dict(address=mint, slippage=5, tip_lamports=10_000, keypair=keypair)
+
+    async def prepared() -> None:
+        presigned.prepare(sol_amounts=["0.05"], **args)
+        await asyncio.gather(*presigned._tasks.values())
+
+    # nothing repriced since the entry was built: its own price is still current, so handed out
+    await prepared()
+    assert presigned.take(lamports=50_000_000, **args) is not None, "dropped without any price change"
+
+    # no price at all to compare against: dropped
+    await prepared()
+    usdc_prices._cache.pop(mint, None)
+    assert presigned.take(lamports=50_000_000, **args) is None, "taken without a current price"
+
+    # a newer price within the drift limit: handed out
+    await prepared()
+    await fetch_price_usdc(mint, fresh=True)
+    assert presigned.take(lamports=50_000_000, **args) is not None, "dropped although the price held"
+
+    # price moved 10% between prepare and take: dropped
+    await prepared()
+    standins.move_price(mint, 1.10)
+    await fetch_price_usdc(mint, fresh=True)
+    assert presigned.take(lamports=50_000_000, **args) is None, "taken after a 10% move"
+
+
+@check
+async def check_confirm_deadline(standins: StandIns, mints: List[str]) -> None:
+    from transactions.confirmations import ConfirmationTracker
+
+    # every RPC call fails: the timeout must still resolve the future
+    tracker = ConfirmationTracker(interval=0.05, use_ws=False)
+    saved = {name: standins.faults[name].error_rate for name in ("rpc", "rpc2")}
+    for name in saved:
+        standins.faults[name].error_rate = 1.0
+    try:
+        fut = tracker.track(str(Keypair().sign_message(b"never sent")), timeout=0.3)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), 3)
+        except asyncio.TimeoutError:
+            raise AssertionError("confirmation never resolved while the RPC was down")
+        except Exception as e:
+            assert "Timed out" in str(e), f"unexpected failure: {e}"
+        else:
+            raise AssertionError("unsent signature confirmed")
+    finally:
+        for name, rate in saved.items():
+            standins.faults[name].error_rate = rate
+        await asyncio.sleep(0.2)   # let hedged/failed-over calls drain
+
+
+@check
+async def check_twap_stop(standins: StandIns, mints: List[str]) -> None:
+    from constants import BUY, JITO_PROCESSOR
+    from transactions.executor import get_swap_executor
+    from transactions.twap import get_twap_scheduler
+    from transactions.wallets import get_wallets
+
+    scheduler, executor = get_twap_scheduler(), get_swap_executor()
+    wallet = get_wallets().default()
+    task = {"buy_slippage": 5, "buy_tip": "0.00001", "processor": JITO_PROCESSOR}
+
+    async def order(stop_after: float):
+        sends = standins.chain.sends
+        o = scheduler.start(chat_id=1, mint=mints[-1], side=BUY, size=0.05, slices=1, duration=0,
+                            task=task, wallet=wallet)
+        await asyncio.sleep(stop_after)
+        assert scheduler.cancel(o.id), "order already finished"
+        await scheduler.join()
+        await executor.join()
+        return o, standins.chain.sends - sends
+
+    # slice queued behind another swap on the wallet's lane when stopped
+    executor.submit(wallet.address, lambda: asyncio.sleep(0.5))
+    o, sent = await order(0.05)
+    assert (o.status, o.filled, sent) == ("cancelled", 0, 0), f"queued slice ran: {o.status} filled={o.filled} sends={sent}"
+
+    # slice stopped while it was being quoted
+    standins.faults["jupiter"].latency_ms = 300
+    try:
+        o, sent = await order(0.1)
+    finally:
+        standins.faults["jupiter"].latency_ms = 0
+    assert (o.status, o.filled, sent) == ("cancelled", 0, 0), f"quoting slice sent: {o.status} filled={o.filled} sends={sent}"
+
+
+@check
+async def check_cu_reset(standins: StandIns, mints: List[str]) -> None:
+    from constants import BUY, SOL_MINT, JITO_PROCESSOR
+    from transactions.confirmations import OnChainError
+    from transactions.cu_profile import get_cu_profiles, route_key, CU_MIN_SAMPLES
+    from transactions.routes import get_quote
+    from transactions.swap_jito import execute_swap
+
+    profiles = get_cu_profiles()
+    task = {"buy_slippage": 5, "buy_tip": "0.00001", "processor": JITO_PROCESSOR, "amount": "0.07"}
+    key = route_key(await get_quote(SOL_MINT, mints[-1], 70_000_000, 5))
+    # a learned limit far below what the route now needs
+    for _ in range(CU_MIN_SAMPLES):
+        profiles.record(key, 50_000)
+    standins.chain.cu_demand = 1_000_000
+    try:
+        await execute_swap(address=mints[-1], side=BUY, task=task)
+    except OnChainError:
+        pass
+    else:
+        raise AssertionError("swap under a too-tight limit landed")
+    finally:
+        standins.chain.cu_demand = None
+    await profiles.join()
+    assert profiles.units(key) is None, "route kept its too-tight limit after running out of compute"
+
+
+@check
+async def check_read_after_write(standins: StandIns, mints: List[str]) -> None:
+    from transactions.rpc_client import get_rpc, rpc_call, RpcError
+    from transactions.wallets import get_wallets
+
+    rpc, owner = get_rpc(), get_wallets().default().address
+    saved = rpc.write_slot
+    try:
+        # a swap just confirmed at the current slot
+        rpc.note_write(standins.chain.slot)
+        # finalized reads (no commitment) trail it by ~32 slots and must not be pinned to it
+        result = await rpc_call("getMultipleAccounts", [[mints[0]], {"encoding": "base64"}])
+        assert result["value"][0] is not None, "finalized read came back empty"
+        await rpc_call("getBalance", [owner])
+        # confirmed reads are pinned: a write no node has seen yet is refused everywhere
+        rpc.note_write(standins.chain.slot + 1000)
+        try:
+            await rpc_call("getBalance", [owner, {"commitment": "confirmed"}])
+        except RpcError:
+            pass
+        else:
+            raise AssertionError("confirmed read ignored the last write slot")
+    finally:
+        rpc.write_slot = saved
+
+
+async def main_async(names: List[str]) -> int:
+    mints = [str(Keypair().pubkey()) for _ in range(3)]
+    standins = StandIns(mints=tuple(mints), pump_mints=tuple(mints[:1]), land_ms=300)
+    url = await standins.start()
+    _configure_env(url, tempfile.mkdtemp(prefix="bench-checks-"), wallets=2, rpc_endpoints=2)
+    # prices come from the (movable) price endpoint, not pool reserves
+    os.environ["POOL_PRICES"] = "0"
+
+    from helpers.client_session import close_session
+    from helpers.outbox import close_outbox
+    from helpers.ws_hub import close_ws_hubs
+    from transactions.blockhash import get_blockhash_manager
+    from transactions.wallet_state import stop_wallet_mirrors
+    from transactions.fee_estimator import stop_fee_estimator
+    from transactions.pool_prices import stop_price_engine
+
+    failed = 0
+    try:
+        for name in names:
+            try:
+                await CHECKS[name](standins, mints)
+            except Exception:
+                failed += 1
+                print(f"FAIL  {name}\n{traceback.format_exc()}")
+            else:
+                print(f"ok    {name}")
+    finally:
+        await get_blockhash_manager().stop()
+        await stop_wallet_mirrors()
+        await stop_fee_estimator()
+        await stop_price_engine()
+        await close_outbox()
+        await close_ws_hubs()
+        await close_session()
+        await standins.stop()
+    return failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Regression checks against the local stand-ins.")
+    parser.add_argument("checks", nargs="*", help=f"default: all of {', '.join(CHECKS)}")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    unknown = [n for n in args.checks if n not in CHECKS]
+    if unknown:
+        raise SystemExit(f"unknown check {unknown[0]!r}; choose from {', '.join(CHECKS)}")
+
+    # checks inject failures on purpose; their warnings are expected
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.ERROR)
+    sys.exit(1 if asyncio.run(main_async(args.checks or list(CHECKS))) else 0)
+
+
+if __name__ == "__main__":
+    main()
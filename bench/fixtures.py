@@ -0,0 +1,138 @@
+# bench/fixtures.py
+
+"""
+Recorded mainnet responses the stand-ins can replay.
+
+Fixtures are keyed per entity rather than per request, so replay still
+hits when the bot batches differently from the recording:
+
+    quote    "<inputMint>:<outputMint>"  Jupiter /quote body
+    price    "<mint>"                    one entry of Jupiter /price data
+    account  "<address>"                 getMultipleAccounts value (base64); mint,
+                                         metadata PDA and pump.fun bonding curve
+    supply   "<mint>"                    getTokenSupply value
+
+Record with:
+
+    python -m bench.fixtures --mints <mint>[,<mint>...] --out bench/fixtures/sample.json
+"""
+
+import os
+import json
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+from solders.pubkey import Pubkey
+
+SOL_MINT  = "So11111111111111111111111111111111111111112"
+USDC_MINT = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+TOKEN_METADATA_PROGRAM = Pubkey.from_string("metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
+PUMP_PROGRAM           = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+
+DEFAULT_JUPITER_BASE_URL  = "https://lite-api.jup.ag/swap"
+DEFAULT_JUPITER_PRICE_URL = "https://lite-api.jup.ag/price/v2"
+
+
+def metadata_pda(mint: str) -> Pubkey:
+    pda, _ = Pubkey.find_program_address(
+        [b"metadata", bytes(TOKEN_METADATA_PROGRAM), bytes(Pubkey.from_string(mint))],
+        TOKEN_METADATA_PROGRAM,
+    )
+    return pda
+
+
+def bonding_curve_pda(mint: str) -> Pubkey:
+    pda, _ = Pubkey.find_program_address([b"bonding-curve", bytes(Pubkey.from_string(mint))], PUMP_PROGRAM)
+    return pda
+
+
+class Fixtures:
+    def __init__(self, data: Optional[Dict[str, Dict[str, Any]]] = None, mints: Optional[List[str]] = None):
+        self.data = data or {}
+        self.mints = mints or []
+
+    @classmethod
+    def load(cls, path: str) -> "Fixtures":
+        with open(path) as f:
+            raw = json.load(f)
+        return cls(raw.get("data"), raw.get("mints"))
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"mints": self.mints, "data": self.data}, f, indent=1, sort_keys=True)
+
+    def get(self, kind: str, key: str) -> Optional[Any]:
+        return self.data.get(kind, {}).get(key)
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        self.data.setdefault(kind, {})[key] = value
+
+
+async def record(mints: List[str], rpc_url: str, jupiter_base: str, price_url: str) -> Fixtures:
+    """Fetch everything a summary/swap of `mints` reads from the real services."""
+    from aiohttp import ClientSession
+
+    fixtures = Fixtures(mints=list(mints))
+
+    async with ClientSession() as session:
+        async def rpc(method: str, params: list):
+            body = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+            async with session.post(rpc_url, json=body) as resp:
+                data = await resp.json(content_type=None)
+            if data.get("error"):
+                raise RuntimeError(f"{method}: {data['error']}")
+            return data["result"]
+
+        async def quote(in_mint: str, out_mint: str, amount: int) -> None:
+            url = f"{jupiter_base}/v1/quote"
+            params = {"inputMint": in_mint, "outputMint": out_mint, "amount": str(amount), "slippageBps": "500"}
+            async with session.get(url, params=params) as resp:
+                body = await resp.json()
+            if body.get("routePlan"):
+                fixtures.put("quote", f"{in_mint}:{out_mint}", body)
+
+        async with session.get(price_url, params={"ids": ",".join(mints)}) as resp:
+            prices = (await resp.json()).get("data") or {}
+        for mint, entry in prices.items():
+            if entry:
+                fixtures.put("price", mint, entry)
+
+        addresses = [a for m in mints for a in (m, str(metadata_pda(m)), str(bonding_curve_pda(m)))]
+        for i in range(0, len(addresses), 99):
+            chunk = addresses[i:i + 99]
+            result = await rpc("getMultipleAccounts", [chunk, {"encoding": "base64"}])
+            for address, account in zip(chunk, result["value"]):
+                if account:
+                    fixtures.put("account", address, account)
+
+        for mint in mints:
+            fixtures.put("supply", mint, (await rpc("getTokenSupply", [mint]))["value"])
+            await quote(SOL_MINT, mint, 10**8)
+            await quote(mint, SOL_MINT, 10**6)
+            await quote(mint, USDC_MINT, 10**6)
+    return fixtures
+
+
+def main() -> None:
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Record stand-in fixtures from the real services.")
+    parser.add_argument("--mints", required=True, help="comma-separated token mints")
+    parser.add_argument("--out", required=True, help="fixture file to write")
+    parser.add_argument("--rpc-url", default=os.getenv("RPC_URL"))
+    parser.add_argument("--jupiter-base-url", default=os.getenv("JUPITER_BASE_URL", DEFAULT_JUPITER_BASE_URL))
+    parser.add_argument("--jupiter-price-url", default=os.getenv("JUPITER_PRICE_URL", DEFAULT_JUPITER_PRICE_URL))
+    args = parser.parse_args()
+    if not args.rpc_url:
+        parser.error("--rpc-url or RPC_URL is required")
+
+    mints = [m.strip() for m in args.mints.split(",") if m.strip()]
+    fixtures = asyncio.run(record(mints, args.rpc_url, args.jupiter_base_url, args.jupiter_price_url))
+    fixtures.save(args.out)
+    print(f"recorded {sum(len(v) for v in fixtures.data.values())} fixtures for {len(mints)} mints → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+# bench/run.py
+
+"""
+Offline end-to-end benchmark: start the local stand-ins, point the bot at
+them through its environment variables, then drive real code paths with
+N concurrent simulated users and report latency percentiles and ops/sec.
+
+    python -m bench.run --users 20 --ops 10
+    python -m bench.run --scenarios swap --latency rpc=20:5,jupiter=80:20,jito=40 --errors jito=0.1
+    python -m bench.run --rpc-endpoints 2 --latency rpc=20:60,rpc2=20:60
+    python -m bench.run --fixtures bench/fixtures/sample.json --out bench_output.txt
+
+Scenarios:
+    summary   helpers.token_summary.get_token_summary
+    swap      transactions.swap_jito.swap (buy/sell alternating, through landing);
+              with --pump-tokens N the first N mints sit on a pump.fun
+              bonding curve and skip Jupiter
+    fanout    transactions.swap_jito.fan_out_swap, a buy on every --wallets wallet
+    telegram  Update objects through the real Application handlers
+              (token address message, then a quick-buy button); latency is
+              handler time, the queued swaps show up in the stage table
+"""
+
+import os
+import sys
+import time
+import json
+import asyncio
+import logging
+import argparse
+import tempfile
+import itertools
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+
+from solders.keypair import Keypair
+from bench.standins import StandIns, Fault, SERVICES
+from bench.fixtures import Fixtures
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = ("summary", "portfolio", "swap", "fanout", "telegram")
+BENCH_TOKEN = "123456:bench"
+JITO_REGIONS = 3
+
+
+@dataclass
+class Result:
+    scenario: str
+    users: int
+    ok: int
+    errors: int
+    wall_s: float
+    p50: float
+    p95: float
+    p99: float
+    max_ms: float
+
+    @property
+    def ops_per_sec(self) -> float:
+        return (self.ok + self.errors) / self.wall_s if self.wall_s else 0.0
+
+
+def _parse_faults(latency: str, errors: str) -> Dict[str, Fault]:
+    """'rpc=20:5,jupiter=80' (mean:jitter ms) and 'jito=0.1' (error rate)."""
+    faults = {name: Fault() for name in SERVICES}
+    for item in filter(None, (latency or "").split(",")):
+        name, _, value = item.partition("=")
+        mean, _, jitter = value.partition(":")
+        faults[name.strip()].latency_ms = float(mean)
+        faults[name.strip()].jitter_ms = float(jitter or 0)
+    for item in filter(None, (errors or "").split(",")):
+        name, _, rate = item.partition("=")
+        faults[name.strip()].error_rate = float(rate)
+    return faults
+
+
+def _configure_env(url: str, cache_dir: str, wallets: int, rpc_endpoints: int = 1) -> None:
+    # set before any repo module is imported; load_dotenv() never overrides these
+    os.environ.update({
+        "RPC_URL":           f"{url}/rpc",
+        "JUPITER_BASE_URL":  f"{url}/swap",
+        "JUPITER_PRICE_URL": f"{url}/price/v2",
+        "JITO_ENDPOINTS":    ",".join(f"{url}/jito/{i}" for i in range(JITO_REGIONS)),
+        "KEEPALIVE_URLS":    f"{url}/ping",
+        "SOL_PRIVATE_KEY":   str(Keypair()),
+        "SOL_PRIVATE_KEYS":  ",".join(str(Keypair()) for _ in range(wallets - 1)),
+        "TG_BOT_TOKEN":      BENCH_TOKEN,
+        "CACHE_DIR":         cache_dir,
+        "SEND_VIA_RPC":      "0",
+        "JITO_TIP_FLOOR_URL": f"{url}/jito/tip_floor",
+    })
+    if rpc_endpoints > 1:
+        os.environ["RPC_URLS"] = ",".join([f"{url}/rpc", f"{url}/rpc2"][:rpc_endpoints])
+
+
+async def _drive(name: str, users: int, ops: int, op: Callable[[int, int], Awaitable[bool]]) -> Result:
+    from helpers.metrics import Histogram
+
+    hist = Histogram()
+    tally = {"ok": 0, "errors": 0}
+
+    async def user(u: int) -> None:
+        for i in range(ops):
+            start = time.perf_counter()
+            try:
+                ok = await op(u, i)
+            except Exception as e:
+                logger.debug("%s op failed: %s", name, e)
+                ok = False
+            hist.record((time.perf_counter() - start) * 1000)
+            tally["ok" if ok else "errors"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(u) for u in range(users)))
+    wall = time.perf_counter() - start
+    return Result(name, users, tally["ok"], tally["errors"], wall,
+                  hist.percentile(.5), hist.percentile(.95), hist.percentile(.99), hist.max_ms)
+
+
+class _Sink:
+    """Stands in for the Telegram message a notification replies to."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self):
+        # a chat of its own, so the outbox's per-chat limit doesn't serialise the run
+        self.chat_id = self.message_id = next(self._ids)
+        self.texts: List[str] = []
+
+    async def reply_text(self, text, **kwargs):
+        self.texts.append(text)
+        return self
+
+    async def edit_text(self, text, **kwargs):
+        self.texts[-1] = text
+        return self
+
+
+async def run_summary(mints: List[str], users: int, ops: int) -> Result:
+    from helpers.token_summary import get_token_summary
+
+    async def op(u: int, i: int) -> bool:
+        await get_token_summary(mints[(u + i) % len(mints)])
+        return True
+
+    return await _drive("summary", users, ops, op)
+
+
+async def run_portfolio(mints: List[str], users: int, ops: int) -> Result:
+    from helpers.portfolio import get_portfolio
+
+    async def op(u: int, i: int) -> bool:
+        await get_portfolio()
+        return True
+
+    return await _drive("portfolio", users, ops, op)
+
+
+async def run_swap(mints: List[str], users: int, ops: int) -> Result:
+    from constants import BUY, SELL, JITO_PROCESSOR
+    from transactions.swap_jito import swap
+
+    async def op(u: int, i: int) -> bool:
+        side = BUY if i % 2 == 0 else SELL
+        task = {
+            "buy_slippage": 5, "sell_slippage": 2, "buy_tip": "0.00001", "sell_tip": "0.00001",
+            "processor": JITO_PROCESSOR, "amount": "0.05", "autosell_pct": "50", "side": side,
+        }
+        sig = await swap(address=mints[(u + i) % len(mints)], side=side, task=task, reply_message=_Sink())
+        return sig is not None
+
+    return await _drive("swap", users, ops, op)
+
+
+async def run_fanout(mints: List[str], users: int, ops: int) -> Result:
+    from constants import BUY, JITO_PROCESSOR
+    from transactions.swap_jito import fan_out_swap
+    from transactions.wallets import get_wallets
+
+    wallets = get_wallets().select()
+
+    async def op(u: int, i: int) -> bool:
+        task = {"buy_slippage": 5, "buy_tip": "0.00001", "processor": JITO_PROCESSOR, "amount": "0.05"}
+        results = await fan_out_swap(address=mints[(u + i) % len(mints)], side=BUY, task=task, wallets=wallets)
+        return all(r.signature for r in results)
+
+    return await _drive("fanout", users, ops, op)
+
+
+async def run_telegram(mints: List[str], users: int, ops: int, base_url: str) -> Result:
+    from telegram import Update
+    from telegram.ext import ApplicationBuilder
+    from tg.index import build_application, setup_message_handler
+    from helpers.swap_notification import join_notifications
+    from transactions.executor import get_swap_executor
+
+    app = build_application(
+        ApplicationBuilder().token(BENCH_TOKEN).base_url(f"{base_url}/bot").updater(None)
+    )
+    failed = set()
+
+    async def on_error(update, context):
+        if isinstance(update, Update):
+            failed.add(update.update_id)
+    app.add_error_handler(on_error)
+
+    await app.initialize()
+    await setup_message_handler(app)
+    counter = iter(range(1, 10**9))
+
+    def update(payload: dict) -> Update:
+        return Update.de_json({"update_id": next(counter), **payload}, app.bot)
+
+    async def op(u: int, i: int) -> bool:
+        chat = {"id": 10_000 + u, "type": "private"}
+        sender = {"id": 10_000 + u, "is_bot": False, "first_name": f"user{u}"}
+        if i % 2 == 0:
+            upd = update({"message": {
+                "message_id": i + 1, "date": int(time.time()), "chat": chat, "from": sender,
+                "text": mints[(u + i // 2) % len(mints)],
+            }})
+        else:
+            upd = update({"callback_query": {
+                "id": str(i), "from": sender, "chat_instance": str(u),
+                "data": "quick_buy_amount:0.05",
+                "message": {"message_id": i, "date": int(time.time()), "chat": chat,
+                            "from": {"id": 1, "is_bot": True, "first_name": "Bench"}, "text": "menu"},
+            }})
+        await app.process_update(upd)
+        return upd.update_id not in failed
+
+    try:
+        result = await _drive("telegram", users, ops, op)
+        # handlers only enqueue swaps; let them land before the report
+        await get_swap_executor().join()
+        # their receipts are edited through this app's bot
+        await join_notifications()
+        return result
+    finally:
+        await app.shutdown()
+
+
+def render(results: List[Result], stages: Dict[str, tuple], standins: StandIns, args) -> str:
+    lines = [
+        f"users={args.users} ops/user={args.ops} latency={args.latency or '-'} errors={args.errors or '-'} "
+        f"land_ms={args.land_ms} fixtures={args.fixtures or '-'}",
+        "",
+        f"{'scenario':<10} {'users':>5} {'ok':>6} {'err':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'ops/s':>9}",
+    ]
+    for r in results:
+        lines.append(
+            f"{r.scenario:<10} {r.users:>5} {r.ok:>6} {r.errors:>5} {r.p50:>9.1f} {r.p95:>9.1f} "
+            f"{r.p99:>9.1f} {r.max_ms:>9.1f} {r.ops_per_sec:>9.1f}"
+        )
+    lines += ["", f"{'stage':<48} {'p50':>8} {'p95':>8} {'p99':>8} {'n':>7}"]
+    for label, (p50, p95, p99, n) in sorted(stages.items()):
+        lines.append(f"{label[:48]:<48} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {n:>7}")
+    lines += ["", "requests served: " + json.dumps(standins.requests),
+              f"transactions sent: {standins.chain.sends}, landed: {len(standins.chain.landed)}"]
+    return "\n".join(lines)
+
+
+async def main_async(args) -> str:
+    fixtures = Fixtures.load(args.fixtures) if args.fixtures else Fixtures()
+    mints = [m for m in (args.mints or "").split(",") if m] or fixtures.mints or [
+        str(Keypair().pubkey()) for _ in range(args.tokens)
+    ]
+    standins = StandIns(
+        faults=_parse_faults(args.latency, args.errors), fixtures=fixtures, mints=tuple(mints),
+        pump_mints=tuple(mints[:args.pump_tokens]),
+        slot_ms=args.slot_ms, land_ms=args.land_ms, drop_rate=args.drop_rate,
+    )
+    url = await standins.start()
+    cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+    _configure_env(url, cache_dir, args.wallets, args.rpc_endpoints)
+
+    from helpers import metrics
+    from helpers.client_session import close_session
+    from helpers.outbox import close_outbox
+    from helpers.swap_notification import join_notifications
+    from helpers.ws_hub import close_ws_hubs
+    from transactions.blockhash import get_blockhash_manager
+    from transactions.wallet_state import stop_wallet_mirrors
+    from transactions.fee_estimator import stop_fee_estimator
+    from transactions.pool_prices import stop_price_engine
+
+    results, stages = [], {}
+    try:
+        for name in args.scenarios.split(","):
+            metrics.reset()
+            if name == "summary":
+                results.append(await run_summary(mints, args.users, args.ops))
+            elif name == "portfolio":
+                results.append(await run_portfolio(mints, args.users, args.ops))
+            elif name == "swap":
+                results.append(await run_swap(mints, args.users, args.ops))
+            elif name == "fanout":
+                results.append(await run_fanout(mints, args.users, args.ops))
+            elif name == "telegram":
+                results.append(await run_telegram(mints, args.users, args.ops, url))
+            else:
+                raise SystemExit(f"unknown scenario {name!r}; choose from {', '.join(SCENARIOS)}")
+            await join_notifications()
+            stages.update({f"{name}: {k.replace(f' @ {url}', ' @ local')}": v for k, v in metrics.snapshot().items()})
+    finally:
+        await get_blockhash_manager().stop()
+        await stop_wallet_mirrors()
+        await stop_fee_estimator()
+        await stop_price_engine()
+        await close_outbox()
+        await close_ws_hubs()
+        await close_session()
+        await standins.stop()
+    return render(results, stages, standins, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline swap/summary/Telegram benchmark against local stand-ins.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--ops", type=int, default=10, help="operations per user")
+    parser.add_argument("--tokens", type=int, default=5, help="synthetic mints when no fixtures/--mints")
+    parser.add_argument("--mints", help="comma-separated mints to use")
+    parser.add_argument("--pump-tokens", type=int, default=0, help="mints given a synthetic pump.fun bonding curve")
+    parser.add_argument("--wallets", type=int, default=4, help="generated wallets (fanout scenario)")
+    parser.add_argument("--rpc-endpoints", type=int, default=1, choices=(1, 2), help="RPC providers in the pool (rpc, rpc2)")
+    parser.add_argument("--latency", default="", help="per service mean[:jitter] ms, e.g. rpc=20:5,jupiter=80")
+    parser.add_argument("--errors", default="", help="per service error rate, e.g. jito=0.1,rpc=0.01")
+    parser.add_argument("--slot-ms", type=float, default=400)
+    parser.add_argument("--land-ms", type=float, default=800, help="delay before a sent tx confirms")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of transactions that never land")
+    parser.add_argument("--fixtures", help="recorded fixture file to replay")
+    parser.add_argument("--out", help="also write the report to this file")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+    report = asyncio.run(main_async(args))
+    print(report)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+# bench/standins.py
+
+"""
+Local stand-ins for every service the bot talks to: Jupiter (quote,
+swap-instructions, price), Jito block engines, Solana JSON-RPC + WebSocket
+and the Telegram Bot API. All served from one aiohttp app on localhost,
+with per-service latency/error injection and optional recorded fixtures.
+
+Only aiohttp and solders are imported here: the repo modules read their
+endpoints from the environment at import time, so the servers must be up
+before they are imported.
+"""
+
+import json
+import time
+import base64
+import random
+import struct
+import asyncio
+import hashlib
+import logging
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from aiohttp import web, WSMsgType
+from solders.hash import Hash
+from solders.pubkey import Pubkey
+from solders.transaction import VersionedTransaction
+from bench.fixtures import Fixtures, metadata_pda, bonding_curve_pda
+
+logger = logging.getLogger(__name__)
+
+SOL_MINT       = "So11111111111111111111111111111111111111112"
+USDC_MINT      = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+TOKEN_PROGRAM  = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+JUPITER_PROGRAM = "JUP6LkbZbjS1jKKwapdHNy74zcZ3tLUZoi5QNyVTaV4"
+COMPUTE_BUDGET  = "ComputeBudget111111111111111111111111111111"
+SYSTEM_PROGRAM  = "11111111111111111111111111111111"
+TIP_ACCOUNT     = "96gYZGLnJYVFmbjzopPSU6QiEV5fGqZNyN9nmNhvrZU5"
+PUMP_PROGRAM    = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+RAYDIUM_AMM     = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+SOL_USDC_POOL   = "58oQChx4yWmvKdwLLZzBi4ChoCc2fqCUWBkwMihLYQo2"
+POOL_DEPTH      = 100_000_000   # whole tokens in each synthetic pool
+
+SOL_PRICE_USDC  = 150.0
+TOKEN_DECIMALS  = 6
+TOKEN_SUPPLY    = 1_000_000_000 * 10**TOKEN_DECIMALS
+SOL_BALANCE     = 5 * 10**9
+TOKEN_BALANCE   = 1_000_000 * 10**TOKEN_DECIMALS
+GENESIS_SLOT    = 300_000_000
+HEIGHT_OFFSET   = 20_000_000   # block height trails slot by skipped slots
+BLOCKHASH_VALID = 150          # blocks a blockhash stays valid
+FINALIZED_LAG   = 32           # slots the finalized bank trails the confirmed one
+
+SERVICES = ("jupiter", "jito", "rpc", "rpc2", "ws", "telegram")
+
+
+@dataclass
+class Fault:
+    """Injected behaviour for one service."""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    async def delay(self) -> None:
+        ms = random.gauss(self.latency_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms
+        if ms > 0:
+            await asyncio.sleep(ms / 1000)
+
+    def fails(self) -> bool:
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+def _token_price(mint: str) -> float:
+    # stable pseudo-random price per mint, 1e-6 .. 1 USDC
+    h = int.from_bytes(hashlib.sha256(mint.encode()).digest()[:4], "little")
+    return 10 ** -(1 + h % 6) * (1 + h % 9)
+
+# mint -> factor applied on top of its base price (StandIns.move_price)
+_price_moves: Dict[str, float] = {}
+
+def _price(mint: str) -> float:
+    if mint == SOL_MINT:
+        return SOL_PRICE_USDC
+    if mint == USDC_MINT:
+        return 1.0
+    return _token_price(mint) * _price_moves.get(mint, 1.0)
+
+def _decimals(mint: str) -> int:
+    return 9 if mint == SOL_MINT else TOKEN_DECIMALS
+
+
+def _mint_account(decimals: int) -> dict:
+    raw = bytearray(82)
+    struct.pack_into("<Q", raw, 36, TOKEN_SUPPLY)
+    raw[44] = decimals
+    raw[45] = 1  # is_initialized
+    return _account(bytes(raw), TOKEN_PROGRAM)
+
+def _metadata_account(mint: str) -> dict:
+    name = f"Bench {mint[:4]}".encode()
+    symbol = mint[:4].upper().encode()
+    raw = (
+        b"\x04" + bytes(32) + bytes(Pubkey.from_string(mint))
+        + struct.pack("<I", 32) + name.ljust(32, b"\x00")
+        + struct.pack("<I", 10) + symbol.ljust(10, b"\x00")
+        + struct.pack("<I", 200) + bytes(200)
+    )
+    return _account(raw, "metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
+
+def _curve_account(mint: str) -> dict:
+    # a fresh pump.fun curve: initial virtual reserves, nothing sold yet
+    raw = (
+        bytes.fromhex("17b7f83760d8ac60")
+        + struct.pack("<QQQQQ?", 1_073_000_000 * 10**6, 30 * 10**9, 793_100_000 * 10**6, 0, TOKEN_SUPPLY, False)
+        + hashlib.sha256(f"creator:{mint}".encode()).digest()
+    )
+    return _account(raw, PUMP_PROGRAM)
+
+def _address(seed: str) -> str:
+    return str(Pubkey.from_bytes(hashlib.sha256(seed.encode()).digest()))
+
+def _amm_pool(base_mint: str, quote_mint: str) -> Tuple[dict, str, str]:
+    """A Raydium AMM v4 pool account (only the fields the bot reads) and its two vaults."""
+    base_vault, quote_vault = _address(f"vault:{base_mint}:{base_mint}"), _address(f"vault:{base_mint}:{quote_mint}")
+    raw = bytearray(752)
+    struct.pack_into("<QQ", raw, 32, _decimals(base_mint), _decimals(quote_mint))
+    for offset, key in ((336, base_vault), (368, quote_vault), (400, base_mint), (432, quote_mint)):
+        raw[offset:offset + 32] = bytes(Pubkey.from_string(key))
+    return _account(bytes(raw), RAYDIUM_AMM), base_vault, quote_vault
+
+def _vault_account(mint: str, owner: str, amount: int) -> dict:
+    raw = bytearray(165)
+    raw[0:32] = bytes(Pubkey.from_string(mint))
+    raw[32:64] = bytes(Pubkey.from_string(owner))
+    struct.pack_into("<Q", raw, 64, amount)
+    raw[108] = 1  # initialized
+    return _account(bytes(raw), TOKEN_PROGRAM)
+
+def _account(raw: bytes, owner: str, lamports: int = 1_461_600) -> dict:
+    return {
+        "data": [base64.b64encode(raw).decode(), "base64"],
+        "executable": False,
+        "lamports": lamports,
+        "owner": owner,
+        "rentEpoch": 18446744073709551615,
+        "space": len(raw),
+    }
+
+
+class Chain:
+    """Just enough ledger: a ticking slot, blockhashes and landing signatures."""
+
+    def __init__(self, slot_ms: float, land_ms: float, drop_rate: float):
+        self.slot_ms = slot_ms
+        self.land_ms = land_ms
+        self.drop_rate = drop_rate
+        self.slot = GENESIS_SLOT
+        self.landed: Dict[str, int] = {}
+        self.submitted: Set[str] = set()
+        self.sends = 0
+        # when set, transactions with a lower compute unit limit land failed, out of compute
+        self.cu_demand: Optional[int] = None
+        self.errors: Dict[str, dict] = {}
+        self.units: Dict[str, int] = {}
+        self.sig_watchers: Dict[str, List[Tuple["web.WebSocketResponse", int]]] = {}
+        self.slot_watchers: Dict[int, "web.WebSocketResponse"] = {}
+        self._ticker: Optional[asyncio.Task] = None
+
+    @property
+    def block_height(self) -> int:
+        return self.slot - HEIGHT_OFFSET
+
+    def blockhash(self) -> Hash:
+        return Hash(hashlib.sha256(f"blockhash:{self.slot}".encode()).digest())
+
+    def start(self) -> None:
+        self._ticker = asyncio.create_task(self._tick())
+
+    def stop(self) -> None:
+        if self._ticker:
+            self._ticker.cancel()
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.slot_ms / 1000)
+            self.slot += 1
+            for sub, ws in list(self.slot_watchers.items()):
+                await _notify(ws, "slotNotification", sub,
+                              {"parent": self.slot - 1, "root": self.slot - 32, "slot": self.slot})
+
+    def submit(self, tx_b64: str) -> str:
+        tx = VersionedTransaction.from_bytes(base64.b64decode(tx_b64))
+        sig = str(tx.signatures[0])
+        self.sends += 1
+        if sig not in self.submitted:
+            self.submitted.add(sig)
+            limit = _cu_limit(tx)
+            if self.cu_demand and limit is not None and limit < self.cu_demand:
+                self.errors[sig] = {"InstructionError": [len(tx.message.instructions) - 1, "ComputationalBudgetExceeded"]}
+                self.units[sig] = limit
+            if random.random() >= self.drop_rate:
+                asyncio.get_running_loop().call_later(self.land_ms / 1000, self._land, sig)
+        return sig
+
+    def _land(self, sig: str) -> None:
+        self.landed[sig] = self.slot
+        for ws, sub in self.sig_watchers.pop(sig, []):
+            asyncio.create_task(_notify(ws, "signatureNotification", sub,
+                                        {"context": {"slot": self.slot}, "value": {"err": self.errors.get(sig)}}))
+
+
+def _cu_limit(tx: VersionedTransaction) -> Optional[int]:
+    # SetComputeUnitLimit: tag 2, then the u32 limit
+    keys = tx.message.account_keys
+    for ix in tx.message.instructions:
+        if str(keys[ix.program_id_index]) == COMPUTE_BUDGET and ix.data[:1] == b"\x02":
+            return struct.unpack_from("<I", bytes(ix.data), 1)[0]
+    return None
+
+
+async def _notify(ws: web.WebSocketResponse, method: str, sub: int, result) -> None:
+    if ws.closed:
+        return
+    try:
+        await ws.send_str(json.dumps({
+            "jsonrpc": "2.0", "method": method,
+            "params": {"result": result, "subscription": sub},
+        }))
+    except ConnectionResetError:
+        pass
+
+
+class StandIns:
+    """
+    Serve every stand-in on one localhost port:
+
+        /swap/v1/quote, /swap/v1/swap-instructions, /price/v2   Jupiter
+        /jito/{n}                                               block engines
+        /rpc  (POST JSON-RPC, GET WebSocket)                    Solana node
+        /rpc2 (same)                                            second RPC provider, own faults
+        /bot{token}/{method}                                    Telegram Bot API
+        /ping                                                   keep-alive target
+    """
+
+    def __init__(
+        self,
+        faults: Optional[Dict[str, Fault]] = None,
+        fixtures: Optional[Fixtures] = None,
+        mints: Tuple[str, ...] = (),
+        pump_mints: Tuple[str, ...] = (),
+        slot_ms: float = 400,
+        land_ms: float = 800,
+        drop_rate: float = 0.0,
+    ):
+        self.faults = {name: Fault() for name in SERVICES}
+        self.faults.update(faults or {})
+        self.fixtures = fixtures or Fixtures()
+        self.mints = set(mints)
+        self.chain = Chain(slot_ms, land_ms, drop_rate)
+        self.requests: Dict[str, int] = {name: 0 for name in SERVICES}
+        self.telegram_calls: Dict[str, int] = {}
+        self._pdas = {str(metadata_pda(m)): m for m in self.mints}
+        # mints still on a pump.fun bonding curve (the bot quotes these without Jupiter)
+        self._curves = {str(bonding_curve_pda(m)): m for m in pump_mints}
+        # every other mint trades in a Raydium AMM v4 pool against SOL, priced like the quote endpoint
+        self._amm_pools: Dict[str, dict] = {}
+        self._vaults: Dict[str, dict] = {}
+        self._add_pool(SOL_USDC_POOL, SOL_MINT, USDC_MINT, 100_000)
+        for mint in self.mints - set(pump_mints):
+            self._add_pool(_address(f"pool:{mint}"), mint, SOL_MINT, POOL_DEPTH)
+        self._sub_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def _add_pool(self, address: str, base_mint: str, quote_mint: str, depth: int) -> None:
+        account, base_vault, quote_vault = _amm_pool(base_mint, quote_mint)
+        quote_depth = depth * _price(base_mint) / _price(quote_mint)
+        self._amm_pools[address] = account
+        self._vaults[base_vault] = _vault_account(base_mint, address, depth * 10**_decimals(base_mint))
+        self._vaults[quote_vault] = _vault_account(quote_mint, address, int(quote_depth * 10**_decimals(quote_mint)))
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application(client_max_size=16 * 1024**2)
+        app.router.add_get("/swap/v1/quote", self.quote)
+        app.router.add_post("/swap/v1/swap-instructions", self.swap_instructions)
+        app.router.add_get("/price/v2", self.price)
+        app.router.add_post("/jito/{n}", self.jito)
+        app.router.add_get("/jito/tip_floor", self.tip_floor)
+        app.router.add_post("/rpc", self.rpc)
+        app.router.add_get("/rpc", self.ws)
+        app.router.add_post("/rpc2", self.rpc)
+        app.router.add_get("/rpc2", self.ws)
+        app.router.add_route("*", "/bot{token}/{method}", self.telegram)
+        app.router.add_route("*", "/ping", self.ping)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        self.chain.start()
+        return self.url
+
+    def move_price(self, mint: str, factor: float) -> None:
+        """Scale a mint's quote/price endpoint price from now on (pool reserves are left alone)."""
+        _price_moves[mint] = _price_moves.get(mint, 1.0) * factor
+
+    async def stop(self) -> None:
+        _price_moves.clear()
+        self.chain.stop()
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def _enter(self, service: str) -> bool:
+        """Count the request, apply latency; False when an error should be injected."""
+        self.requests[service] += 1
+        fault = self.faults[service]
+        await fault.delay()
+        return not fault.fails()
+
+    # --- Jupiter -------------------------------------------------------
+
+    async def quote(self, request: web.Request) -> web.Response:
+        if not await self._enter("jupiter"):
+            return web.json_response({"error": "injected failure"}, status=503)
+        q = request.query
+        in_mint, out_mint = q["inputMint"], q["outputMint"]
+        recorded = self.fixtures.get("quote", f"{in_mint}:{out_mint}")
+        if recorded is not None:
+            return web.json_response(recorded)
+        amount = int(q["amount"])
+        out = int(amount / 10**_decimals(in_mint) * _price(in_mint) / _price(out_mint) * 10**_decimals(out_mint))
+        slippage_bps = int(q.get("slippageBps", 50))
+        swap_info = {
+            "ammKey": str(Pubkey.from_bytes(hashlib.sha256(f"{in_mint}{out_mint}".encode()).digest())),
+            "label": "Bench AMM",
+            "inputMint": in_mint, "outputMint": out_mint,
+            "inAmount": str(amount), "outAmount": str(out),
+            "feeAmount": "0", "feeMint": in_mint,
+        }
+        return web.json_response({
+            "inputMint": in_mint, "inAmount": str(amount),
+            "outputMint": out_mint, "outAmount": str(out),
+            "otherAmountThreshold": str(out * (10_000 - slippage_bps) // 10_000),
+            "swapMode": "ExactIn", "slippageBps": slippage_bps,
+            "priceImpactPct": "0.001",
+            "routePlan": [{"swapInfo": swap_info, "percent": 100}],
+            "contextSlot": self.chain.slot, "timeTaken": 0.001,
+        })
+
+    async def swap_instructions(self, request: web.Request) -> web.Response:
+        if not await self._enter("jupiter"):
+            return web.json_response({"error": "injected failure"}, status=503)
+        body = await request.json()
+        user = body["userPublicKey"]
+        quote = body["quoteResponse"]
+        tip = (body.get("prioritizationFeeLamports") or {}).get("jitoTipLamports") or 0
+        pool = quote["routePlan"][0]["swapInfo"]["ammKey"]
+
+        def ix(program: str, accounts, data: bytes) -> dict:
+            return {
+                "programId": program,
+                "accounts": [{"pubkey": k, "isSigner": s, "isWritable": w} for k, s, w in accounts],
+                "data": base64.b64encode(data).decode(),
+            }
+
+        other = []
+        if tip:
+            other.append(ix(SYSTEM_PROGRAM, [(user, True, True), (TIP_ACCOUNT, False, True)],
+                            struct.pack("<IQ", 2, tip)))
+        bh = self.chain.blockhash()
+        return web.json_response({
+            "computeBudgetInstructions": [
+                ix(COMPUTE_BUDGET, [], b"\x02" + struct.pack("<I", 200_000)),
+                ix(COMPUTE_BUDGET, [], b"\x03" + struct.pack("<Q", 1_000)),
+            ],
+            "setupInstructions": [],
+            "swapInstruction": ix(JUPITER_PROGRAM, [(user, True, True), (pool, False, True)],
+                                  hashlib.sha256(json.dumps(quote, sort_keys=True).encode()).digest()[:16]),
+            "cleanupInstruction": None,
+            "otherInstructions": other,
+            "addressLookupTableAddresses": [],
+            "blockhashWithMetadata": {
+                "blockhash": list(bytes(bh)),
+                "lastValidBlockHeight": self.chain.block_height + BLOCKHASH_VALID,
+            },
+        })
+
+    async def price(self, request: web.Request) -> web.Response:
+        if not await self._enter("jupiter"):
+            return web.json_response({"error": "injected failure"}, status=503)
+        data = {}
+        for mint in request.query.get("ids", "").split(","):
+            if not mint:
+                continue
+            recorded = self.fixtures.get("price", mint)
+            data[mint] = recorded if recorded is not None else {
+                "id": mint, "type": "derivedPrice", "price": str(_price(mint)),
+            }
+        return web.json_response({"data": data, "timeTaken": 0.001})
+
+    # --- Jito ----------------------------------------------------------
+
+    async def jito(self, request: web.Request) -> web.Response:
+        if not await self._enter("jito"):
+            return web.json_response(
+                {"jsonrpc": "2.0", "id": 1, "error": {"code": -32097, "message": "rate limited"}}, status=429
+            )
+        body = await request.json()
+        try:
+            sig = self.chain.submit(body["params"][0])
+        except Exception as e:
+            return web.json_response({"jsonrpc": "2.0", "id": body.get("id"),
+                                      "error": {"code": -32602, "message": str(e)}})
+        return web.json_response({"jsonrpc": "2.0", "id": body.get("id"), "result": sig})
+
+    async def tip_floor(self, request: web.Request) -> web.Response:
+        if not await self._enter("jito"):
+            return web.Response(status=503, text="injected failure")
+        return web.json_response([{
+            "time": "2025-01-01T00:00:00Z",
+            "landed_tips_25th_percentile": 0.000005,
+            "landed_tips_50th_percentile": 0.00001,
+            "landed_tips_75th_percentile": 0.00004,
+            "landed_tips_95th_percentile": 0.0005,
+            "landed_tips_99th_percentile": 0.002,
+            "ema_landed_tips_50th_percentile": 0.00001,
+        }])
+
+    # --- Solana JSON-RPC -----------------------------------------------
+
+    async def rpc(self, request: web.Request) -> web.Response:
+        if not await self._enter(request.path.strip("/")):
+            return web.Response(status=503, text="injected failure")
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([self._rpc_one(c) for c in body])
+        return web.json_response(self._rpc_one(body))
+
+    def _rpc_one(self, call: dict) -> dict:
+        method, params = call.get("method"), call.get("params") or []
+        handler = getattr(self, f"_rpc_{method}", None)
+        if handler is None:
+            return {"jsonrpc": "2.0", "id": call.get("id"),
+                    "error": {"code": -32601, "message": "Method not found"}}
+        config = next((p for p in params if isinstance(p, dict) and "minContextSlot" in p), None)
+        if config is not None:
+            # the bank for the requested commitment (finalized when none is given)
+            bank = self.chain.slot
+            if config.get("commitment", "finalized") == "finalized":
+                bank -= FINALIZED_LAG
+            if bank < config["minContextSlot"]:
+                return {"jsonrpc": "2.0", "id": call.get("id"), "error": {
+                    "code": -32016, "message": "Minimum context slot has not been reached",
+                    "data": {"contextSlot": bank}}}
+        try:
+            result = handler(*params)
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": call.get("id"),
+                    "error": {"code": -32602, "message": f"Invalid params: {e}"}}
+        return {"jsonrpc": "2.0", "id": call.get("id"), "result": result}
+
+    def _ctx(self, value) -> dict:
+        return {"context": {"apiVersion": "2.2.0", "slot": self.chain.slot}, "value": value}
+
+    def _lookup(self, address: str) -> Optional[dict]:
+        recorded = self.fixtures.get("account", address)
+        if recorded is not None:
+            return recorded
+        if address in self.mints:
+            return _mint_account(TOKEN_DECIMALS)
+        if address in self._pdas:
+            return _metadata_account(self._pdas[address])
+        if address in self._curves:
+            return _curve_account(self._curves[address])
+        return self._amm_pools.get(address) or self._vaults.get(address)
+
+    def _rpc_getBalance(self, owner, config=None):
+        return self._ctx(SOL_BALANCE)
+
+    def _rpc_getTokenAccountsByOwner(self, owner, filt, config=None):
+        if "mint" in filt:
+            mints = [filt["mint"]] if filt["mint"] in self.mints else []
+        else:
+            # every bench mint is a classic Token mint
+            mints = sorted(self.mints) if filt.get("programId") == TOKEN_PROGRAM else []
+        return self._ctx([self._token_account(owner, mint) for mint in mints])
+
+    def _token_account(self, owner: str, mint: str) -> dict:
+        amount = {"amount": str(TOKEN_BALANCE), "decimals": TOKEN_DECIMALS,
+                  "uiAmount": TOKEN_BALANCE / 10**TOKEN_DECIMALS,
+                  "uiAmountString": str(TOKEN_BALANCE // 10**TOKEN_DECIMALS)}
+        pubkey = str(Pubkey.from_bytes(hashlib.sha256(f"{owner}{mint}".encode()).digest()))
+        return {
+            "pubkey": pubkey,
+            "account": {
+                "data": {"program": "spl-token", "space": 165, "parsed": {
+                    "type": "account",
+                    "info": {"mint": mint, "owner": owner, "state": "initialized",
+                             "isNative": False, "tokenAmount": amount},
+                }},
+                "executable": False, "lamports": 2_039_280, "owner": TOKEN_PROGRAM,
+                "rentEpoch": 18446744073709551615, "space": 165,
+            },
+        }
+
+    def _rpc_getTokenSupply(self, mint, config=None):
+        recorded = self.fixtures.get("supply", mint)
+        if recorded is not None:
+            return self._ctx(recorded)
+        if mint not in self.mints:
+            raise ValueError("not a Token mint")
+        return self._ctx({"amount": str(TOKEN_SUPPLY), "decimals": TOKEN_DECIMALS,
+                          "uiAmount": TOKEN_SUPPLY / 10**TOKEN_DECIMALS,
+                          "uiAmountString": str(TOKEN_SUPPLY // 10**TOKEN_DECIMALS)})
+
+    def _rpc_getSupply(self, config=None):
+        total = 600_000_000 * 10**9
+        return self._ctx({"total": total, "circulating": total, "nonCirculating": 0,
+                          "nonCirculatingAccounts": []})
+
+    def _rpc_getMultipleAccounts(self, addresses, config=None):
+        return self._ctx([self._lookup(a) for a in addresses])
+
+    def _rpc_getProgramAccounts(self, program, config=None):
+        if program != RAYDIUM_AMM:
+            return []
+        memcmps = [f["memcmp"] for f in (config or {}).get("filters", []) if "memcmp" in f]
+        found = []
+        for address, account in self._amm_pools.items():
+            raw = base64.b64decode(account["data"][0])
+            if all(raw[m["offset"]:m["offset"] + 32] == bytes(Pubkey.from_string(m["bytes"])) for m in memcmps):
+                found.append({"pubkey": address, "account": account})
+        return found
+
+    def _rpc_getAccountInfo(self, address, config=None):
+        return self._ctx(self._lookup(address))
+
+    def _rpc_getLatestBlockhash(self, config=None):
+        return self._ctx({"blockhash": str(self.chain.blockhash()),
+                          "lastValidBlockHeight": self.chain.block_height + BLOCKHASH_VALID})
+
+    def _rpc_getBlockHeight(self, config=None):
+        return self.chain.block_height
+
+    def _rpc_getSlot(self, config=None):
+        return self.chain.slot
+
+    def _rpc_getSignatureStatuses(self, sigs, config=None):
+        statuses = []
+        for sig in sigs:
+            slot = self.chain.landed.get(sig)
+            statuses.append(None if slot is None else {
+                "slot": slot, "confirmations": None, "err": self.chain.errors.get(sig),
+                "status": {"Err": self.chain.errors[sig]} if sig in self.chain.errors else {"Ok": None},
+                "confirmationStatus": "confirmed",
+            })
+        return self._ctx(statuses)
+
+    def _rpc_getRecentPrioritizationFees(self, accounts=None):
+        # busier (more accounts) sets pay more; deterministic per slot
+        scale = 1 + len(accounts or [])
+        return [
+            {"slot": slot, "prioritizationFee": (slot * 7919 % 1000) * scale}
+            for slot in range(max(self.chain.slot - 149, 0), self.chain.slot + 1)
+        ]
+
+    def _rpc_getTransaction(self, sig, config=None):
+        slot = self.chain.landed.get(sig)
+        if slot is None:
+            return None
+        # route cost plus a little per-tx noise
+        units = 80_000 + int.from_bytes(hashlib.sha256(sig.encode()).digest()[:2], "little") % 20_000
+        return {"slot": slot, "blockTime": None,
+                "meta": {"err": self.chain.errors.get(sig), "fee": 5000,
+                         "computeUnitsConsumed": self.chain.units.get(sig, units)}}
+
+    def _rpc_sendTransaction(self, tx_b64, config=None):
+        return self.chain.submit(tx_b64)
+
+    # --- Solana WebSocket ----------------------------------------------
+
+    async def ws(self, request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subs: Dict[int, Tuple[str, Optional[str]]] = {}
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                body = json.loads(msg.data)
+                for call in (body if isinstance(body, list) else [body]):
+                    if not await self._enter("ws"):
+                        await ws.close()
+                        return ws
+                    reply, landed = self._ws_call(ws, subs, call)
+                    await ws.send_str(json.dumps(reply))
+                    if landed is not None:
+                        # already confirmed: notify right after the subscription id
+                        await _notify(ws, "signatureNotification", reply["result"],
+                                      {"context": {"slot": landed}, "value": {"err": self.chain.errors.get(call["params"][0])}})
+        finally:
+            for sub, (kind, key) in subs.items():
+                self._ws_forget(ws, sub, kind, key)
+        return ws
+
+    def _ws_call(self, ws, subs, call: dict) -> Tuple[dict, Optional[int]]:
+        method, params, call_id = call.get("method", ""), call.get("params") or [], call.get("id")
+        if method.endswith("Unsubscribe"):
+            sub = params[0]
+            if sub in subs:
+                self._ws_forget(ws, sub, *subs.pop(sub))
+            return {"jsonrpc": "2.0", "result": True, "id": call_id}, None
+        if not method.endswith("Subscribe"):
+            return {"jsonrpc": "2.0", "id": call_id, "error": {"code": -32601, "message": "Method not found"}}, None
+
+        sub = next(self._sub_ids)
+        kind = method[:-len("Subscribe")]
+        key = params[0] if params else None
+        reply = {"jsonrpc": "2.0", "result": sub, "id": call_id}
+        if kind == "signature" and key in self.chain.landed:
+            return reply, self.chain.landed[key]
+        subs[sub] = (kind, key)
+        if kind == "signature":
+            self.chain.sig_watchers.setdefault(key, []).append((ws, sub))
+        elif kind == "slot":
+            self.chain.slot_watchers[sub] = ws
+        # account/program subscriptions are acknowledged; balances never change here
+        return reply, None
+
+    def _ws_forget(self, ws, sub: int, kind: str, key: Optional[str]) -> None:
+        if kind == "signature":
+            watchers = self.chain.sig_watchers.get(key) or []
+            watchers[:] = [(w, s) for w, s in watchers if s != sub]
+        elif kind == "slot":
+            self.chain.slot_watchers.pop(sub, None)
+
+    # --- Telegram Bot API ----------------------------------------------
+
+    async def telegram(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.telegram_calls[method] = self.telegram_calls.get(method, 0) + 1
+        if not await self._enter("telegram"):
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1},
+            }, status=429)
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+        return web.json_response({"ok": True, "result": self._telegram_result(method, params)})
+
+    def _telegram_result(self, method: str, params: dict):
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot",
+                    "can_join_groups": False, "can_read_all_group_messages": False,
+                    "supports_inline_queries": False}
+        if method in ("sendMessage", "editMessageText", "editMessageReplyMarkup"):
+            chat_id = int(params.get("chat_id") or 0)
+            message_id = params.get("message_id")
+            return {
+                "message_id": int(message_id) if message_id else next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": 1, "is_bot": True, "first_name": "Bench"},
+                "text": params.get("text", ""),
+            }
+        return True
+
+    async def ping(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
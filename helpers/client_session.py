@@ -11,6 +11,9 @@ load_dotenv()
 JUPITER_URL = "https://lite-api.jup.ag/swap/v1"
 JITO_URL    = "https://mainnet.block-engine.jito.wtf/api/v1/transactions"
 HELIUS_URL  = "https://mainnet.helius-rpc.com/"
+KEEPALIVE_URLS = [
+    u.strip() for u in os.getenv("KEEPALIVE_URLS", "").split(",") if u.strip()
+] or [JUPITER_URL, JITO_URL, HELIUS_URL]
 
 KEEPALIVE_INTERVAL = 19  # seconds
 
@@ -22,9 +25,8 @@ async def _keep_alive() -> None:
     global _session
     while True:
         try:
-            await _session.post(JUPITER_URL, timeout=5)
-            await _session.post(JITO_URL,    timeout=5)
-            await _session.post(HELIUS_URL,  timeout=5)
+            for url in KEEPALIVE_URLS:
+                await _session.post(url, timeout=5)
         except Exception:
             # swallow any errors
             pass
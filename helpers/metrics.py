@@ -0,0 +1,200 @@
+# helpers/metrics.py
+
+import os
+import time
+import asyncio
+import logging
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlsplit
+from typing import Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+METRICS_TEXTFILE       = os.getenv("METRICS_TEXTFILE")            # node_exporter textfile path
+METRICS_PORT           = int(os.getenv("METRICS_PORT", "0"))      # serve /metrics on localhost when set
+METRICS_WRITE_INTERVAL = 15  # seconds
+PREFIX                 = "tgbot"
+
+# log-linear buckets over microseconds: 32 sub-buckets per power of two (~3% error)
+_SUB_BITS = 5
+_SUB      = 1 << _SUB_BITS
+_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _bucket(us: int) -> int:
+    if us < _SUB:
+        return us
+    shift = us.bit_length() - _SUB_BITS - 1
+    return (shift + 1) * _SUB + (us >> shift) - _SUB
+
+def _bucket_floor(index: int) -> int:
+    if index < _SUB:
+        return index
+    shift = index // _SUB - 1
+    return (index % _SUB + _SUB) << shift
+
+
+class Histogram:
+    """HDR-style latency histogram in milliseconds; O(1) record, sparse buckets."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        index = _bucket(max(0, int(ms * 1000)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(_bucket_floor(index + 1) / 1000, self.max_ms)
+        return self.max_ms
+
+
+# (stage, endpoint) -> histogram ; (name, result) -> count
+_histograms: Dict[Tuple[str, Optional[str]], Histogram] = {}
+_counters: Dict[Tuple[str, str], int] = {}
+
+
+@lru_cache(maxsize=256)
+def endpoint_label(url: str) -> str:
+    """scheme://host[:port] of an endpoint URL; paths, queries and userinfo often carry API keys."""
+    parts = urlsplit(url)
+    host = parts.netloc.rpartition("@")[2]
+    return f"{parts.scheme}://{host}" if parts.scheme and host else "?"
+
+def observe(stage: str, ms: float, endpoint: Optional[str] = None) -> None:
+    """Record one latency sample for a stage (optionally per endpoint, labelled by host only)."""
+    key = (stage, None if endpoint is None else endpoint_label(endpoint))
+    hist = _histograms.get(key)
+    if hist is None:
+        hist = _histograms[key] = Histogram()
+    hist.record(ms)
+
+def count(name: str, result: str = "ok", n: int = 1) -> None:
+    """Bump a success/failure style counter."""
+    key = (name, result)
+    _counters[key] = _counters.get(key, 0) + n
+
+@contextmanager
+def span(stage: str, endpoint: Optional[str] = None):
+    """
+    Time a block as one stage sample and count it as ok/error:
+
+        with span("quote"):
+            quote = await get_quote_jupiter(...)
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        count(stage, "error")
+        raise
+    else:
+        count(stage, "ok")
+    finally:
+        observe(stage, (time.perf_counter() - start) * 1000, endpoint)
+
+
+def snapshot() -> Dict[str, Tuple[float, float, float, int]]:
+    """{label: (p50, p95, p99, count)} for every recorded stage."""
+    out = {}
+    for (stage, endpoint), h in _histograms.items():
+        label = stage if endpoint is None else f"{stage} @ {endpoint}"
+        out[label] = (h.percentile(.5), h.percentile(.95), h.percentile(.99), h.count)
+    return out
+
+def reset() -> None:
+    """Drop all samples and counters."""
+    _histograms.clear()
+    _counters.clear()
+
+
+def render_stats() -> str:
+    """HTML block for the Telegram /stats command."""
+    lines = ["📈 <b>Latency (ms)</b>  p50 / p95 / p99 · n", ""]
+    for (stage, endpoint), h in sorted(_histograms.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+        label = stage if endpoint is None else f"{stage} @ {endpoint}"
+        lines.append(
+            f"<code>{label}</code>: {h.percentile(.5):.0f} / {h.percentile(.95):.0f} / "
+            f"{h.percentile(.99):.0f} · {h.count}"
+        )
+    if _counters:
+        lines += ["", "🔢 <b>Counters</b>", ""]
+        for (name, result), n in sorted(_counters.items()):
+            lines.append(f"<code>{name}</code> {result}: {n}")
+    if len(lines) == 2:
+        lines.append("No samples yet.")
+    return "\n".join(lines)
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def render_prometheus() -> str:
+    """Prometheus text exposition of every histogram (as summaries) and counter."""
+    out = [
+        f"# HELP {PREFIX}_latency_ms Stage latency in milliseconds.",
+        f"# TYPE {PREFIX}_latency_ms summary",
+    ]
+    for (stage, endpoint), h in _histograms.items():
+        labels = f'stage="{_label(stage)}"'
+        if endpoint is not None:
+            labels += f',endpoint="{_label(endpoint)}"'
+        for q in _QUANTILES:
+            out.append(f'{PREFIX}_latency_ms{{{labels},quantile="{q}"}} {h.percentile(q):.3f}')
+        out.append(f"{PREFIX}_latency_ms_sum{{{labels}}} {h.total_ms:.3f}")
+        out.append(f"{PREFIX}_latency_ms_count{{{labels}}} {h.count}")
+    out += [
+        f"# HELP {PREFIX}_events_total Outcomes per stage.",
+        f"# TYPE {PREFIX}_events_total counter",
+    ]
+    for (name, result), n in _counters.items():
+        out.append(f'{PREFIX}_events_total{{name="{_label(name)}",result="{_label(result)}"}} {n}')
+    return "\n".join(out) + "\n"
+
+
+def _write_textfile(path: str, body: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(body)
+    os.replace(tmp, path)
+
+async def _textfile_loop(path: str) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(None, _write_textfile, path, render_prometheus())
+        except Exception as e:
+            logger.warning("metrics textfile write failed: %s", e)
+        await asyncio.sleep(METRICS_WRITE_INTERVAL)
+
+async def start_exporter() -> None:
+    """Start the textfile writer and/or local /metrics endpoint if configured."""
+    if METRICS_TEXTFILE:
+        asyncio.create_task(_textfile_loop(METRICS_TEXTFILE))
+    if METRICS_PORT:
+        from aiohttp import web
+
+        async def handle(_request):
+            return web.Response(text=render_prometheus(), content_type="text/plain")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", METRICS_PORT).start()
@@ -0,0 +1,303 @@
+# helpers/outbox.py
+
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from dotenv import load_dotenv
+from telegram.error import BadRequest, RetryAfter
+from helpers.metrics import observe, count
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Telegram's documented limits: ~30 msg/s per bot, ~1 msg/s per chat, 20 msg/min per group
+TG_GLOBAL_RATE  = float(os.getenv("TG_GLOBAL_RATE", "30"))
+TG_CHAT_RATE    = float(os.getenv("TG_CHAT_RATE", "1"))
+TG_CHAT_BURST   = float(os.getenv("TG_CHAT_BURST", "3"))
+TG_GROUP_RATE   = float(os.getenv("TG_GROUP_RATE", str(20 / 60)))
+DIGEST_CACHE    = 4096   # messages whose last delivered text/markup hash we remember
+
+# lower is sent first
+TRADE   = 0   # fills, confirmations, trade errors
+DEFAULT = 1
+MENU    = 2   # menu renders and refreshes
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = time.monotonic()
+        self.paused_until = 0.0   # set from RetryAfter
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until one token can be taken (0 if now)."""
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.paused_until - now)
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+@dataclass
+class _Job:
+    priority: int
+    seq: int
+    chat_id: int
+    call: Callable[[], Awaitable]
+    key: Optional[Tuple[int, int]] = None    # (chat_id, message_id) for edits
+    digest: Optional[str] = None
+    queued: float = field(default_factory=time.monotonic)
+    futures: List[asyncio.Future] = field(default_factory=list)
+
+
+def _digest(text: str, reply_markup) -> str:
+    markup = reply_markup.to_json() if reply_markup is not None else ""
+    return hashlib.sha1(f"{text}\0{markup}".encode()).hexdigest()
+
+
+def _retry_seconds(e: RetryAfter) -> float:
+    value = e.retry_after
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+def _target(obj):
+    """The Message behind a Message or CallbackQuery."""
+    return getattr(obj, "message", None) if hasattr(obj, "edit_message_text") else obj
+
+
+class Outbox:
+    """
+    Single outbound path for chat messages.
+    Every send/edit/delete waits for a token from the bot-wide bucket and
+    from its chat's bucket, goes out in priority order (trade messages
+    before menus), and at most one call per chat is in flight so messages
+    keep their order. A queued edit of a message that already has one
+    pending replaces it, and edits that would render the same text and
+    markup as the last delivered one are skipped. RetryAfter pauses the
+    chat (or the whole bot) and puts the call back at the head of the queue.
+    """
+
+    def __init__(self, global_rate: float = TG_GLOBAL_RATE, chat_rate: float = TG_CHAT_RATE,
+                 chat_burst: float = TG_CHAT_BURST, group_rate: float = TG_GROUP_RATE):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[int, TokenBucket] = {}
+        self._pending: List[_Job] = []
+        self._edits: Dict[Tuple[int, int], _Job] = {}
+        self._delivered: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self._busy: Set[int] = set()
+        self._seq = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # --- public API -----------------------------------------------------
+
+    async def reply(self, message, text: str, priority: int = DEFAULT, **kwargs):
+        """message.reply_text(text, **kwargs) through the queue; returns the sent Message."""
+        message = _target(message)
+        sent = await self._submit(message.chat_id, priority, lambda: message.reply_text(text, **kwargs))
+        if sent is not None and hasattr(sent, "message_id"):
+            self._remember((sent.chat_id, sent.message_id), _digest(text, kwargs.get("reply_markup")))
+        return sent
+
+    async def edit(self, message, text: str, priority: int = DEFAULT, **kwargs):
+        """
+        message.edit_text(text, **kwargs) through the queue (`message` may be
+        a CallbackQuery). Returns the edited Message, or the original one when
+        the edit was skipped as unchanged.
+        """
+        message = _target(message)
+        key = (message.chat_id, message.message_id)
+        digest = _digest(text, kwargs.get("reply_markup"))
+
+        async def call():
+            try:
+                return await message.edit_text(text, **kwargs)
+            except BadRequest as e:
+                if "message is not modified" in e.message.lower():
+                    return message
+                raise
+
+        job = self._edits.get(key)
+        if job is not None:
+            # not sent yet: the newest render wins, at the most urgent priority asked for
+            job.call, job.digest = call, digest
+            if priority < job.priority:
+                job.priority = priority
+            count("outbox", "coalesced")
+            return await self._attach(job)
+        if self._delivered.get(key) == digest:
+            count("outbox", "unchanged")
+            return message
+        return await self._submit(message.chat_id, priority, call, key=key, digest=digest)
+
+    async def delete(self, message, priority: int = DEFAULT):
+        message = _target(message)
+        key = (message.chat_id, message.message_id)
+        job = self._edits.pop(key, None)
+        if job is not None:
+            # an edit of a message about to be deleted would only fail with BadRequest
+            self._pending.remove(job)
+            count("outbox", "dropped_edit")
+            for fut in job.futures:
+                if not fut.done():
+                    fut.set_result(message)
+        self._delivered.pop(key, None)
+        return await self._submit(message.chat_id, priority, message.delete)
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for job in self._pending:
+            for fut in job.futures:
+                if not fut.done():
+                    fut.cancel()
+        self._pending.clear()
+        self._edits.clear()
+
+    # --- queue ----------------------------------------------------------
+
+    async def _submit(self, chat_id: int, priority: int, call, key=None, digest=None):
+        self._seq += 1
+        job = _Job(priority, self._seq, chat_id, call, key, digest)
+        self._pending.append(job)
+        if key is not None:
+            self._edits[key] = job
+        return await self._attach(job)
+
+    def _attach(self, job: _Job) -> Awaitable:
+        fut = asyncio.get_running_loop().create_future()
+        job.futures.append(fut)
+        self._ensure_running()
+        self._wake.set()
+        return fut
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._dispatch())
+
+    def _bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if chat_id < 0:
+                bucket = TokenBucket(self.group_rate, self.chat_burst)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _remember(self, key: Tuple[int, int], digest: str) -> None:
+        self._delivered[key] = digest
+        self._delivered.move_to_end(key)
+        while len(self._delivered) > DIGEST_CACHE:
+            self._delivered.popitem(last=False)
+
+    def _next(self, now: float) -> Tuple[Optional[_Job], float]:
+        """Most urgent job whose chat is ready, else how long until one might be."""
+        best, wait = None, None
+        for job in self._pending:
+            if job.chat_id in self._busy:
+                continue
+            delay = self._bucket(job.chat_id).delay(now)
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+            elif best is None or (job.priority, job.seq) < (best.priority, best.seq):
+                best = job
+        return best, (wait if wait is not None else 1.0)
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._wake.clear()
+            if not self._pending:
+                await self._wake.wait()
+                continue
+            now = time.monotonic()
+            job, wait = self._next(now)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            delay = self._global.delay(now)
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue   # a more urgent job may have arrived meanwhile
+            self._global.take(now)
+            self._bucket(job.chat_id).take(now)
+            self._pending.remove(job)
+            if job.key is not None and self._edits.get(job.key) is job:
+                del self._edits[job.key]
+            self._busy.add(job.chat_id)
+            asyncio.create_task(self._run(job))
+
+    async def _run(self, job: _Job) -> None:
+        observe("outbox_wait", (time.monotonic() - job.queued) * 1000)
+        try:
+            result = await job.call()
+        except RetryAfter as e:
+            seconds = _retry_seconds(e)
+            count("outbox", "retry_after")
+            logger.warning("Telegram flood limit in chat %s, waiting %.1fs", job.chat_id, seconds)
+            self._bucket(job.chat_id).paused_until = time.monotonic() + seconds
+            self._requeue(job)
+            return
+        except Exception as e:
+            count("outbox", "error")
+            for fut in job.futures:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        finally:
+            self._busy.discard(job.chat_id)
+            self._wake.set()
+        count("outbox", "sent")
+        if job.key is not None:
+            self._remember(job.key, job.digest)
+        for fut in job.futures:
+            if not fut.done():
+                fut.set_result(result)
+
+    def _requeue(self, job: _Job) -> None:
+        if job.key is not None:
+            newer = self._edits.get(job.key)
+            if newer is not None:
+                # a newer render was queued meanwhile; it supersedes this one
+                newer.futures.extend(job.futures)
+                return
+            self._edits[job.key] = job
+        self._pending.append(job)
+
+
+_outbox: Optional[Outbox] = None
+
+def get_outbox() -> Outbox:
+    """Return the shared outbound queue."""
+    global _outbox
+    if _outbox is None:
+        _outbox = Outbox()
+    return _outbox
+
+async def close_outbox() -> None:
+    global _outbox
+    if _outbox is not None:
+        await _outbox.close()
+        _outbox = None
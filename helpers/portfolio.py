@@ -0,0 +1,153 @@
+import asyncio, html
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from constants import SOL_MINT
+from transactions.rpc_client import rpc_call, rpc_batch
+from transactions.mint_info import get_mint_index, TOKEN_PROGRAM, TOKEN_2022_PROGRAM
+from transactions.fetch_price import fetch_prices_usdc
+from transactions.wallet_state import get_wallet_mirror
+from transactions.wallets import get_wallets
+
+PAGE_SIZE = 10
+
+
+@dataclass
+class Holding:
+    mint: str
+    name: str
+    symbol: str
+    amount: float               # UI units
+    price_usdc: Optional[float] # None when Jupiter has no price
+    value_usdc: Optional[float]
+
+
+@dataclass
+class Portfolio:
+    owner: str
+    sol_balance: float
+    sol_price: Optional[float]
+    holdings: List[Holding] = field(default_factory=list)
+    empty_accounts: int = 0     # zero-balance token accounts (rent that could be reclaimed)
+
+    @property
+    def tokens_value_usdc(self) -> float:
+        return sum(h.value_usdc or 0.0 for h in self.holdings)
+
+    @property
+    def total_value_usdc(self) -> Optional[float]:
+        if self.sol_price is None:
+            return None
+        return self.sol_balance * self.sol_price + self.tokens_value_usdc
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-len(self.holdings) // PAGE_SIZE))
+
+
+async def _raw_balances(owner: str):
+    """(lamports, {mint: (raw amount, decimals)}, empty account count)."""
+    mirror = get_wallet_mirror(owner)
+    totals: Dict[str, List[int]] = {}
+    empty = 0
+    if mirror and mirror.live:
+        for h in mirror.holdings():
+            if h.amount == 0:
+                empty += 1
+                continue
+            entry = totals.setdefault(h.mint, [0, h.decimals])
+            entry[0] += h.amount
+        return mirror.sol().lamports, {m: tuple(v) for m, v in totals.items()}, empty
+
+    # one HTTP round trip: balance + both token programs
+    parsed = {"encoding": "jsonParsed", "commitment": "processed"}
+    with rpc_batch():
+        sol_call = rpc_call("getBalance", [owner, {"commitment": "processed"}])
+        calls = [
+            rpc_call("getTokenAccountsByOwner", [owner, {"programId": program}, parsed])
+            for program in (TOKEN_PROGRAM, TOKEN_2022_PROGRAM)
+        ]
+    lamports = (await sol_call)["value"]
+    for call in calls:
+        for keyed in (await call).get("value") or []:
+            info = keyed["account"]["data"]["parsed"]["info"]
+            amount = int(info["tokenAmount"]["amount"])
+            if amount == 0:
+                empty += 1
+                continue
+            entry = totals.setdefault(info["mint"], [0, int(info["tokenAmount"]["decimals"])])
+            entry[0] += amount
+    return lamports, {m: tuple(v) for m, v in totals.items()}, empty
+
+
+async def get_portfolio(owner: Optional[str] = None) -> Portfolio:
+    """
+    Every holding of `owner` (default wallet) with USDC values, sorted by value.
+    Costs one RPC batch (none while the wallet mirror is live), one batched
+    price request and whatever metadata the mint index doesn't have yet.
+    """
+    owner = owner or get_wallets().default().address
+    lamports, balances, empty = await _raw_balances(owner)
+    mints = list(balances)
+
+    prices, infos = await asyncio.gather(
+        fetch_prices_usdc([SOL_MINT] + mints),
+        get_mint_index().get_many(mints),
+    )
+
+    holdings = []
+    for mint, (raw, decimals) in balances.items():
+        info = infos.get(mint)
+        amount = raw / 10**decimals
+        price = prices.get(mint)
+        holdings.append(Holding(
+            mint=mint,
+            name=(info and info.name) or mint[:6],
+            symbol=(info and info.symbol) or "?",
+            amount=amount,
+            price_usdc=price,
+            value_usdc=None if price is None else amount * price,
+        ))
+    # valued holdings first (largest first), then unpriced ones by size
+    holdings.sort(key=lambda h: (h.value_usdc is None, -(h.value_usdc or 0.0), -h.amount))
+    return Portfolio(owner, lamports / 1e9, prices.get(SOL_MINT), holdings, empty)
+
+
+def _compact(x: float) -> str:
+    for div, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if abs(x) >= div:
+            return f"{x / div:.2f}{suffix}"
+    return f"{x:,.2f}" if abs(x) >= 1 else f"{x:.4g}"
+
+
+def render_portfolio(p: Portfolio, page: int = 0) -> str:
+    """HTML for one page of the portfolio."""
+    page = min(max(page, 0), p.pages - 1)
+    sol_usd = p.sol_price or 0.0
+    total = p.total_value_usdc
+    lines = [
+        f"📊 <b>Portfolio</b>  <code>{p.owner[:4]}…{p.owner[-4:]}</code>",
+        "",
+        f"💎 SOL: <code>{p.sol_balance:,.4f}</code>" + (f"  (${_compact(p.sol_balance * sol_usd)})" if p.sol_price else ""),
+        f"🪙 Tokens: <code>{len(p.holdings)}</code>  (${_compact(p.tokens_value_usdc)})",
+    ]
+    if total is not None:
+        lines.append(f"💰 Total: <b>${_compact(total)}</b>  ≈ <code>{total / sol_usd:,.3f} SOL</code>")
+    lines.append("")
+
+    start = page * PAGE_SIZE
+    for i, h in enumerate(p.holdings[start:start + PAGE_SIZE], start=start + 1):
+        if h.value_usdc is None:
+            value = "no price"
+        else:
+            value = f"${_compact(h.value_usdc)}"
+            if p.sol_price:
+                value += f" · {h.value_usdc / sol_usd:,.4f} SOL"
+        symbol = html.escape("".join(c for c in h.symbol if c.isprintable()).strip() or "?")
+        lines.append(f"{i}. <b>{symbol}</b> {_compact(h.amount)} — {value}\n    <code>{h.mint}</code>")
+    if not p.holdings:
+        lines.append("No token holdings.")
+    if p.empty_accounts:
+        lines += ["", f"🧹 {p.empty_accounts} empty token account(s)"]
+    if p.pages > 1:
+        lines += ["", f"Page {page + 1}/{p.pages}"]
+    return "\n".join(lines)
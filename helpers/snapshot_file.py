@@ -0,0 +1,79 @@
+# helpers/snapshot_file.py
+
+import os
+import json
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _write_file(path: str, data: Any) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class SnapshotFile:
+    """
+    Debounced JSON mirror of some in-memory state. `schedule()` after a
+    change; `delay` seconds later `snapshot()` is taken on the event loop
+    and written in the default executor (temp file + rename). At most one
+    write is in flight, and a change made during a write is written after
+    it, so the file always ends on the latest snapshot.
+    """
+
+    def __init__(self, path: str, snapshot: Callable[[], Any], delay: float, name: str):
+        self.path = path
+        self.snapshot = snapshot
+        self.delay = delay
+        self.name = name
+        self._dirty = False
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._writing: Optional[asyncio.Future] = None
+
+    def load(self) -> Optional[Any]:
+        """The saved JSON, or None when there is none or it can't be read."""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("%s file %s unreadable: %s", self.name, self.path, e)
+            return None
+
+    def schedule(self) -> None:
+        self._dirty = True
+        if self._handle is None and self._writing is None:
+            self._handle = asyncio.get_running_loop().call_later(self.delay, self._flush)
+
+    def _flush(self) -> None:
+        self._handle = None
+        if self._writing is not None:
+            return   # picked up again when the current write finishes
+        self._dirty = False
+        loop = asyncio.get_running_loop()
+        self._writing = loop.run_in_executor(None, _write_file, self.path, self.snapshot())
+        self._writing.add_done_callback(self._written)
+
+    def _written(self, fut: asyncio.Future) -> None:
+        self._writing = None
+        if not fut.cancelled() and fut.exception():
+            logger.warning("%s write failed: %s", self.name, fut.exception())
+        if self._dirty and self._handle is None:
+            self._handle = asyncio.get_running_loop().call_later(self.delay, self._flush)
+
+    async def close(self) -> None:
+        """Write any pending change now and wait for it."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._writing is not None:
+            await asyncio.shield(self._writing)
+        if self._dirty:
+            self._dirty = False
+            await asyncio.get_running_loop().run_in_executor(None, _write_file, self.path, self.snapshot())
@@ -1,33 +1,80 @@
+import os
+import asyncio
 import logging
 from constants import BUY
-from typing import Optional
+from typing import Optional, Set
 from helpers.token_summary import get_token_summary, render_token_summary
+from helpers.outbox import get_outbox, TRADE
+from helpers.metrics import span, count
 
 logger = logging.getLogger(__name__)
 
+NOTIFY_ENRICH_CONCURRENCY = int(os.getenv("NOTIFY_ENRICH_CONCURRENCY", "16"))  # summaries fetched at once
+
+_enrich_slots: Optional[asyncio.Semaphore] = None
+_enrichments: Set[asyncio.Task] = set()
+
+
+def _receipt(task: dict, side: str, tx_sig: str) -> str:
+    if side == BUY:
+        display_amount = f"{task.get('amount', 0)} SOL"
+    else:
+        display_amount = f"{float(task.get('autosell_pct', 0))} %"
+    return (
+        f"🚀 <b>{task['processor'].title()} {side.title()} Executed</b>\n\n"
+        f"<b>↔ Side:</b> <code>{side.title()}</code>\n"
+        f"<b>💰 Amount:</b> <code>{display_amount}</code>\n"
+    )
+
+
+async def _enrich(message, receipt: str, address: str, tx_sig: str) -> None:
+    """Edit balance, value and market cap into the receipt once finalized data is in."""
+    global _enrich_slots
+    if _enrich_slots is None:
+        _enrich_slots = asyncio.Semaphore(NOTIFY_ENRICH_CONCURRENCY)
+    try:
+        async with _enrich_slots:
+            with span("notify_enrich"):
+                info = await get_token_summary(address, use_ws=True, fresh=True)
+        await get_outbox().edit(
+            message,
+            f"{receipt}{render_token_summary(info)}<b>🔗 tx:</b> <code>{tx_sig}</code>\n",
+            parse_mode="HTML",
+            disable_web_page_preview=True
+        )
+        count("notify_enrich", "ok")
+    except Exception as e:
+        # the receipt already told the user the swap landed
+        count("notify_enrich", "error")
+        logger.warning("swap notification enrichment failed for %s: %s", tx_sig, e)
+
+
 async def swap_notification(*, task: dict, address: str, side: str, reply_message, tx_sig: Optional[str] = None,  error: Optional['str'] =  None):
+    """
+    Post the fill as soon as it is confirmed, then enrich the same message
+    in the background (bounded by NOTIFY_ENRICH_CONCURRENCY).
+    """
     try:
         if error:
-            raise RuntimeError(error)            
-        amt = task.get('amount', 0)
-        pct = float(task.get('autosell_pct', 0))
-        if side == BUY:
-            display_amount = f"{amt} SOL"
-        else:
-            display_amount = f"{pct} %"
-        info = await get_token_summary(address, use_ws=True)
-        text = (
-            f"🚀 <b>{task['processor'].title()} {side.title()} Executed</b>\n\n"
-            f"<b>↔ Side:</b> <code>{side.title()}</code>\n"
-            f"<b>💰 Amount:</b> <code>{display_amount}</code>\n"
-            f"{render_token_summary(info)}"
-            f"<b>🔗 tx:</b> <code>{tx_sig}</code>\n"
-        )
-        await reply_message.reply_text(
-            text,
+            raise RuntimeError(error)
+        receipt = _receipt(task, side, tx_sig)
+        message = await get_outbox().reply(
+            reply_message,
+            f"{receipt}<b>🔗 tx:</b> <code>{tx_sig}</code>\n\n⏳ <i>Loading balances…</i>",
+            priority=TRADE,
             parse_mode="HTML",
             disable_web_page_preview=True
-        )  
+        )
     except Exception as e:
         err_text = f"⚠️ {side} Error: {e}"
-        await reply_message.reply_text(err_text, parse_mode="HTML")
\ No newline at end of file
+        await get_outbox().reply(reply_message, err_text, priority=TRADE, parse_mode="HTML")
+        return
+    enrichment = asyncio.create_task(_enrich(message, receipt, address, tx_sig))
+    _enrichments.add(enrichment)
+    enrichment.add_done_callback(_enrichments.discard)
+
+
+async def join_notifications() -> None:
+    """Wait for background enrichments still running (used by the bench)."""
+    while _enrichments:
+        await asyncio.gather(*list(_enrichments), return_exceptions=True)
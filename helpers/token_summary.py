@@ -26,14 +26,29 @@ class TokenSummary:
 async def get_token_summary(
     mint_address: str,
     use_ws: bool = False,
-    ws_timeout: float = 5.0
+    ws_timeout: float = 5.0,
+    fresh: bool = False
 ) -> TokenSummary:
     """
     Fetch name/symbol, token balance, SOL price, USDC price, supply, and SOL balance.
     If use_ws=True, waits up to `ws_timeout` seconds for a 'finalized' balance update.
+    fresh=True bypasses the price cache and the wallet mirror (used right after a swap).
+    All RPC reads start together so they share one JSON-RPC batch round trip.
     """
-    # 1) Lookup SPL account & balance
-    balance_info = await get_token_account_balance(mint_address)
+    balance_task    = asyncio.create_task(get_token_account_balance(mint_address, fresh=fresh))
+    price_sol_task  = asyncio.create_task(fetch_price_sol(mint_address, fresh=fresh))
+    price_usdc_task = asyncio.create_task(fetch_price(  mint_address, fresh=fresh))
+    supply_task     = asyncio.create_task(fetch_supply( mint_address))
+    sol_bal_task    = asyncio.create_task(get_sol_balance(fresh=fresh))
+    metadata_task   = asyncio.create_task(fetch_token_metadata(mint_address))
+
+    # 1) SPL account & balance
+    try:
+        balance_info = await balance_task
+    except Exception:
+        for t in (price_sol_task, price_usdc_task, supply_task, sol_bal_task, metadata_task):
+            t.cancel()
+        raise
     # optionally wait for finalized balance update via WS
     if use_ws:
         from solders.pubkey import Pubkey as _PK
@@ -41,7 +56,7 @@ async def get_token_summary(
         if acct:
             try:
                 notif = await asyncio.wait_for(
-                    ws_subscribe("account", _PK.from_string(acct), commitment="finalized").__anext__(),
+                    ws_subscribe("account", _PK.from_string(acct), commitment="finalized", encoding="jsonParsed").__anext__(),
                     ws_timeout
                 )
                 ba = notif.result.value.data.parsed.info.tokenAmount
@@ -51,22 +66,14 @@ async def get_token_summary(
                 pass
     balance = balance_info["amount"] / 10**balance_info["decimals"]
 
-    # 2) Market data
-    price_sol_task  = asyncio.create_task(fetch_price_sol(mint_address))
-    price_usdc_task = asyncio.create_task(fetch_price(  mint_address))
-    supply_task     = asyncio.create_task(fetch_supply( mint_address))
-    sol_bal_task    = asyncio.create_task(get_sol_balance())
-
-    price_sol, price_usdc, supply, sol_balance_lamports = await asyncio.gather(
-        price_sol_task, price_usdc_task, supply_task, sol_bal_task
+    # 2) Market data + 3) metadata
+    price_sol, price_usdc, supply, sol_balance_lamports, (name, symbol) = await asyncio.gather(
+        price_sol_task, price_usdc_task, supply_task, sol_bal_task, metadata_task
     )
     total_value_sol = price_sol * balance / 1_000
     market_cap_usdc = price_usdc * supply
     sol_balance     = sol_balance_lamports / 1e9
 
-    # 3) Metadata
-    name, symbol = await fetch_token_metadata(mint_address)
-
     return TokenSummary(
         name=name,
         mint_address=mint_address,
@@ -0,0 +1,326 @@
+# helpers/ws_hub.py
+
+import os
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+from dotenv import load_dotenv
+from solana.rpc.websocket_api import connect, SubscriptionError
+from solders.rpc.responses import SubscriptionResult
+from websockets.exceptions import ConnectionClosed
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+RPC_URL = os.getenv('RPC_URL')
+# websocket endpoints of the default hub; derived from RPC_URLS / RPC_URL when unset
+WS_URLS = [u.strip() for u in (os.getenv("WS_URLS") or os.getenv("RPC_URLS") or RPC_URL or "").split(",") if u.strip()]
+
+WS_CONNECTIONS    = int(os.getenv("WS_CONNECTIONS", "2"))  # sockets per endpoint
+SUBSCRIBE_TIMEOUT = 10.0  # seconds to wait for a subscription id
+SUBSCRIBE_RETRIES = 3
+QUEUE_SIZE        = 256   # buffered notifications per subscriber
+RECONNECT_MIN     = 0.25
+RECONNECT_MAX     = 10.0
+
+# subscriptions the node removes by itself after the first notification
+ONE_SHOT = {"signature"}
+
+_CLOSED = object()
+
+
+def to_ws_url(url: str) -> str:
+    return (url.replace("https://", "wss://")
+               .replace("http://", "ws://")
+               .replace("/?", "?"))
+
+
+class HubSubscription:
+    """
+    One logical subscription on a shared socket.
+    Iterate it with `async for` to receive the raw solders notifications.
+    """
+
+    def __init__(self, conn: "_Connection", method: str, args: tuple, kwargs: dict):
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs
+        self.sub_id: Optional[int] = None
+        self.closed = False
+        # called after a reconnect re-established this subscription (notifications may have been missed)
+        self.on_resubscribe: Optional[Callable[[], None]] = None
+        self._conn = conn
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def _push(self, item) -> None:
+        if self._queue.full():
+            # slow consumer: keep the latest state, drop the oldest
+            self._queue.get_nowait()
+        self._queue.put_nowait(item)
+
+    def _finish(self, exc: Optional[BaseException] = None) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._push(exc if exc is not None else _CLOSED)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self._queue.get()
+        if item is _CLOSED:
+            self._queue.put_nowait(_CLOSED)
+            raise StopAsyncIteration
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    async def close(self) -> None:
+        """Stop receiving notifications and release the server-side subscription."""
+        self._finish()
+        await self._conn.unsubscribe(self)
+
+
+class _Connection:
+    """A single reconnecting socket carrying many subscriptions."""
+
+    def __init__(self, url: str, on_drop: Optional[Callable[["_Connection"], None]] = None):
+        self.url = url
+        self.on_drop = on_drop
+        self.ws = None
+        self.subs: Set[HubSubscription] = set()
+        self._routes: Dict[int, HubSubscription] = {}
+        self._pending: Dict[int, Tuple[asyncio.Future, HubSubscription]] = {}
+        self._send_lock = asyncio.Lock()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        for sub in list(self.subs):
+            sub._finish()
+        self.subs.clear()
+
+    async def _run(self) -> None:
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                async with connect(self.url) as ws:
+                    self.ws = ws
+                    self._ready.set()
+                    delay = RECONNECT_MIN
+                    resub = asyncio.create_task(self._resubscribe_all())
+                    try:
+                        await self._read_loop(ws)
+                    finally:
+                        resub.cancel()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("ws %s dropped: %s", self.url, e)
+            finally:
+                self._ready.clear()
+                self.ws = None
+                self._routes.clear()
+                for fut, _ in self._pending.values():
+                    if not fut.done():
+                        fut.set_exception(ConnectionError("websocket connection lost"))
+                self._pending.clear()
+                for sub in self.subs:
+                    sub.sub_id = None
+            if self.on_drop:
+                self.on_drop(self)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    async def _read_loop(self, ws) -> None:
+        while True:
+            try:
+                msgs = await ws.recv()
+            except SubscriptionError as e:
+                entry = self._pending.pop(e.subscription.id, None)
+                if entry and not entry[0].done():
+                    entry[0].set_exception(e)
+                continue
+            except ConnectionClosed:
+                raise
+            except Exception as e:
+                logger.debug("ws %s: unparsable frame: %s", self.url, e)
+                continue
+
+            for msg in msgs:
+                if isinstance(msg, SubscriptionResult):
+                    entry = self._pending.pop(msg.id, None)
+                    if entry:
+                        fut, sub = entry
+                        sub.sub_id = msg.result
+                        self._routes[msg.result] = sub
+                        self.subs.add(sub)
+                        if not fut.done():
+                            fut.set_result(msg.result)
+                    continue
+                sub_id = getattr(msg, "subscription", None)
+                sub = self._routes.get(sub_id)
+                if sub is None:
+                    continue
+                sub._push(msg)
+                if sub.method in ONE_SHOT:
+                    self._routes.pop(sub_id, None)
+                    self.subs.discard(sub)
+                    sub.sub_id = None
+                    sub._finish()
+
+    async def _resubscribe_all(self) -> None:
+        for sub in list(self.subs):
+            if sub.closed or sub.sub_id is not None:
+                continue
+            try:
+                await self.subscribe(sub)
+            except Exception as e:
+                logger.warning("ws %s: resubscribe %s failed: %s", self.url, sub.method, e)
+                self.subs.discard(sub)
+                sub._finish(e)
+                continue
+            if sub.on_resubscribe:
+                sub.on_resubscribe()
+
+    async def subscribe(self, sub: HubSubscription) -> int:
+        await asyncio.wait_for(self._ready.wait(), SUBSCRIBE_TIMEOUT)
+        ws = self.ws
+        fut = asyncio.get_running_loop().create_future()
+        async with self._send_lock:
+            await getattr(ws, f"{sub.method}_subscribe")(*sub.args, **sub.kwargs)
+            # the request we just sent carries the highest id on this socket
+            req_id = max(ws.sent_subscriptions)
+            self._pending[req_id] = (fut, sub)
+        try:
+            return await asyncio.wait_for(fut, SUBSCRIBE_TIMEOUT)
+        finally:
+            self._pending.pop(req_id, None)
+
+    async def unsubscribe(self, sub: HubSubscription) -> None:
+        self.subs.discard(sub)
+        sub_id, sub.sub_id = sub.sub_id, None
+        if sub_id is None:
+            return
+        self._routes.pop(sub_id, None)
+        ws = self.ws
+        if ws is None:
+            return
+        try:
+            async with self._send_lock:
+                await getattr(ws, f"{sub.method}_unsubscribe")(sub_id)
+        except Exception:
+            # socket gone or solana-py lost track of the id; nothing left to release
+            pass
+
+
+class WsHub:
+    """
+    Long-lived subscription hub: a few persistent sockets per endpoint,
+    any number of account/signature/slot/logs/program subscriptions on top.
+    Reconnects and resubscribes transparently. With several endpoints,
+    subscriptions on a socket that drops move to a live socket on another
+    endpoint instead of waiting for the reconnect.
+    """
+
+    def __init__(self, url: Union[str, Sequence[str]], connections: int = WS_CONNECTIONS):
+        urls = [url] if isinstance(url, str) else list(url)
+        self.urls = [to_ws_url(u) for u in urls]
+        self.url = self.urls[0]
+        self._conns = [
+            _Connection(u, on_drop=self._on_drop if len(self.urls) > 1 else None)
+            for u in self.urls for _ in range(max(1, connections))
+        ]
+        self._migrations: Set[asyncio.Task] = set()
+
+    def _pick(self, exclude: Optional[str] = None) -> Optional[_Connection]:
+        # least-loaded socket, preferring ones that are up right now
+        conns = [c for c in self._conns if c.url != exclude]
+        live = [c for c in conns if c.ws is not None]
+        return min(live or conns, key=lambda c: len(c.subs)) if conns else None
+
+    def _on_drop(self, conn: _Connection) -> None:
+        subs = [s for s in conn.subs if not s.closed]
+        if not subs or not any(c.ws is not None and c.url != conn.url for c in self._conns):
+            return   # nowhere better to go: the socket resubscribes them itself on reconnect
+        conn.subs.difference_update(subs)
+        task = asyncio.create_task(self._migrate(conn, subs))
+        self._migrations.add(task)
+        task.add_done_callback(self._migrations.discard)
+
+    async def _migrate(self, dropped: _Connection, subs: List[HubSubscription]) -> None:
+        for sub in subs:
+            if sub.closed:
+                continue
+            target = self._pick(exclude=dropped.url)
+            sub._conn = target
+            try:
+                await target.subscribe(sub)
+            except Exception as e:
+                logger.debug("ws: moving %s to %s failed: %s", sub.method, target.url, e)
+                # back on the original socket; it resubscribes on reconnect
+                sub._conn = dropped
+                dropped.subs.add(sub)
+                continue
+            if sub.on_resubscribe:
+                sub.on_resubscribe()
+
+    async def subscribe(self, method: str, *args, **kwargs) -> HubSubscription:
+        """
+        Subscribe via the least-loaded socket, e.g.
+        `await hub.subscribe("account", pubkey, commitment="confirmed")`.
+        """
+        last_exc: Optional[BaseException] = None
+        for conn in self._conns:
+            conn.start()
+        for _ in range(SUBSCRIBE_RETRIES):
+            conn = self._pick()
+            sub = HubSubscription(conn, method, args, kwargs)
+            try:
+                await conn.subscribe(sub)
+                return sub
+            except (ConnectionError, ConnectionClosed, asyncio.TimeoutError) as e:
+                last_exc = e
+        raise ConnectionError(f"could not subscribe to {method} on {', '.join(self.urls)}: {last_exc}")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": sum(1 for c in self._conns if c.ws is not None),
+            "subscriptions": sum(len(c.subs) for c in self._conns),
+        }
+
+    async def close(self) -> None:
+        for task in list(self._migrations):
+            task.cancel()
+        for conn in self._conns:
+            await conn.stop()
+
+
+_hubs: Dict[str, WsHub] = {}
+
+def get_ws_hub(url: Optional[str] = None) -> WsHub:
+    """Return the shared hub for `url` (defaults to the WS_URLS pool), creating it on first use."""
+    urls = [to_ws_url(url)] if url else [to_ws_url(u) for u in WS_URLS]
+    key = ",".join(urls)
+    hub = _hubs.get(key)
+    if hub is None:
+        hub = _hubs[key] = WsHub(urls)
+    return hub
+
+async def close_ws_hubs() -> None:
+    """Close every shared hub and its sockets."""
+    for hub in list(_hubs.values()):
+        await hub.close()
+    _hubs.clear()
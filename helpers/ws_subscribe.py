@@ -1,21 +1,21 @@
-import os
-from solana.rpc.websocket_api import connect
-from dotenv import load_dotenv
+from helpers.ws_hub import get_ws_hub
 
-load_dotenv()
+# feeds that take no commitment argument
+_NO_COMMITMENT = {"slot", "slots_updates", "root", "vote"}
 
-RPC_URL = os.getenv('RPC_URL')
 
-
-async def ws_subscribe(method: str, param, commitment: str = "confirmed", ws_url: str = None):
-    url = (ws_url or RPC_URL).replace("https://", "wss://").replace("/?", "?")
-    async with connect(url) as ws:
-        await getattr(ws, f"{method}_subscribe")(param, commitment=commitment)
-        sub_msg = await ws.recv()
-        sub_id = sub_msg[0].result
-        try:
-            while True:
-                msg = await ws.recv()
-                yield msg[0]
-        finally:
-            await getattr(ws, f"{method}_unsubscribe")(sub_id)
+async def ws_subscribe(method: str, param, commitment: str = "confirmed", ws_url: str = None, **kwargs):
+    """
+    Yield notifications for one subscription. Rides on the shared WsHub
+    sockets instead of opening a new connection per call.
+    """
+    hub = get_ws_hub(ws_url)
+    args = () if param is None else (param,)
+    if method not in _NO_COMMITMENT:
+        kwargs["commitment"] = commitment
+    sub = await hub.subscribe(method, *args, **kwargs)
+    try:
+        async for msg in sub:
+            yield msg
+    finally:
+        await sub.close()
@@ -0,0 +1,50 @@
+import os, sys
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from telegram.constants import ParseMode
+from constants import LAMPORTS_PER_SOL
+from transactions.fee_estimator import get_fee_estimator, tip_for, TIERS, FIXED
+from helpers.outbox import get_outbox
+from tg.quick_swap import get_task
+
+
+def _age(seconds) -> str:
+    return "never" if seconds is None else f"{seconds:.0f}s ago"
+
+
+def render_fees(task: dict) -> str:
+    estimator = get_fee_estimator()
+    current = task.get('fee_tier')
+    lines = ["⛽ <b>Fees</b>", ""]
+    for tier in TIERS:
+        tip = estimator.tip_lamports(tier)
+        price = estimator.cu_price(tier)
+        mark = "▶" if tier == current else "  "
+        lines.append(
+            f"{mark} <b>{tier}</b>  tip <code>{'-' if tip is None else f'{tip / LAMPORTS_PER_SOL:.6f} SOL'}</code>"
+            f"  CU price <code>{'-' if price is None else f'{price:,} µL'}</code>"
+        )
+    lines.append(
+        f"{'▶' if current == FIXED else '  '} <b>{FIXED}</b>  tip <code>{tip_for(dict(task, fee_tier=FIXED), 'buy_tip') / LAMPORTS_PER_SOL:.6f} SOL</code>"
+    )
+    stale = estimator.staleness()
+    lines += [
+        "",
+        f"Priority fees sampled {_age(stale['priority_fees'])} · Jito tips {_age(stale['jito_tips'])}"
+        + (f" · last sample {estimator.last_sample_ms:.0f}ms" if estimator.last_sample_ms is not None else ""),
+        f"Tracking {len(estimator.account_fees)} account set(s). Change with <code>/tip p50|p75|p95|fixed</code>",
+    ]
+    return "\n".join(lines)
+
+
+async def tip(update, context):
+    """/tip shows the current estimates; /tip <tier> picks the tier this chat's swaps use."""
+    task = get_task(context)
+    args = context.args or []
+    if args:
+        tier = args[0].lower()
+        if tier not in TIERS and tier != FIXED:
+            return await get_outbox().reply(update.message, "Usage: <code>/tip p50|p75|p95|fixed</code>", parse_mode=ParseMode.HTML)
+        task['fee_tier'] = tier
+    await get_outbox().reply(update.message, render_fees(task), parse_mode=ParseMode.HTML)
@@ -7,11 +7,23 @@ from telegram.constants import ParseMode
 from telegram.ext import (ApplicationBuilder, CommandHandler, CallbackQueryHandler,
     MessageHandler, filters, ContextTypes)
 from transactions.balance_handler import show_balance
+from transactions.blockhash import get_blockhash_manager
+from helpers.metrics import render_stats, start_exporter
+from helpers.outbox import get_outbox, MENU
+from transactions.wallets import get_wallets
+from transactions.wallet_state import start_wallet_mirrors
 from tg.quick_swap import (show_quick_sell_menu, show_quick_buy_menu, 
     handle_quick_swap_message, handle_quick_swap_callback)
+from tg.multi_swap import multibuy, multisell, show_wallets
+from tg.portfolio import show_portfolio, handle_portfolio_callback
+from tg.orders import take_profit, stop_loss, limit, show_orders, cancel_order, start_order_engine
+from tg.twap import twap, show_twaps, stop_twap
+from tg.fees import tip
+from transactions.fee_estimator import get_fee_estimator
 
 MAIN_MENU_KB = InlineKeyboardMarkup([
     [InlineKeyboardButton("Quick Swap",      callback_data='quick_trade')],
+    [InlineKeyboardButton("Portfolio 📊",    callback_data='portfolio:page:0')],
     [InlineKeyboardButton("Refresh 🔄",      callback_data='main_refresh')],
 ])
 SOLANA_REGEX = re.compile(r'[1-9A-HJ-NP-Za-km-z]{43,44}')
@@ -20,19 +32,26 @@ async def start(update, context):
     MENU_TEXT = "🖥️ Main menu"
     await show_balance(update)
     if update.message:
-        await update.message.reply_text(
-            MENU_TEXT, 
+        await get_outbox().reply(
+            update.message,
+            MENU_TEXT,
+            priority=MENU,
             reply_markup=MAIN_MENU_KB
         )
 
+async def stats(update, context):
+    await get_outbox().reply(update.message, render_stats(), parse_mode=ParseMode.HTML)
+
 async def button_handler(update, context):
     data = update.callback_query.data
     await update.callback_query.answer()
     if data == "refresh":
         header = await show_balance(update)
-        await update.callback_query.edit_message_text(
-            header, parse_mode=ParseMode.MARKDOWN, reply_markup=MAIN_MENU_KB
+        await get_outbox().edit(
+            update.callback_query, header, priority=MENU, parse_mode=ParseMode.MARKDOWN, reply_markup=MAIN_MENU_KB
         )
+    elif data.startswith('portfolio:'):
+        await handle_portfolio_callback(update, context)
     elif data.startswith('quick_') or SOLANA_REGEX.match(data):
         await handle_quick_swap_callback(update, context)
     
@@ -74,14 +93,24 @@ async def message_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         else:
             # Invalid—prompt again, keep waiting flag
             context.user_data['waiting_for'] = 'quick_swap_token_address'
-            return await update.message.reply_text(
+            return await get_outbox().reply(
+                update.message,
                 '❌ Invalid Solana address. Please send it again:'
             )
     text = update.message.text.strip()
-    await update.message.delete() 
+    await get_outbox().delete(update.message)
 
 async def setup_message_handler(app):
     bot_id = app.bot.id
+    # keep a recent blockhash warm so swaps never wait for one
+    get_blockhash_manager().start()
+    # balances for every wallet, kept live over websocket subscriptions
+    start_wallet_mirrors(w.address for w in get_wallets().wallets)
+    # TP / SL / limit orders saved from the last run resume polling
+    start_order_engine(app.bot)
+    # priority fee / Jito tip percentiles sampled in the background
+    get_fee_estimator()
+    await start_exporter()
 
     app.add_handler(
         MessageHandler(
@@ -92,11 +121,30 @@ async def setup_message_handler(app):
         )
     )
 
-if __name__ == "__main__":
-    builder = ApplicationBuilder().token(os.getenv("TG_BOT_TOKEN"))
+def build_application(builder: ApplicationBuilder):
+    # swaps run on the executor, so handlers return quickly and updates can overlap
+    builder.concurrent_updates(True)
     builder.post_init(setup_message_handler)
     app = builder.build()
     app.add_handler(CommandHandler("start", start))
+    app.add_handler(CommandHandler("stats", stats))
+    app.add_handler(CommandHandler("tip", tip))
+    app.add_handler(CommandHandler("wallets", show_wallets))
+    app.add_handler(CommandHandler("portfolio", show_portfolio))
+    app.add_handler(CommandHandler("multibuy", multibuy))
+    app.add_handler(CommandHandler("multisell", multisell))
+    app.add_handler(CommandHandler("tp", take_profit))
+    app.add_handler(CommandHandler("sl", stop_loss))
+    app.add_handler(CommandHandler("limit", limit))
+    app.add_handler(CommandHandler("orders", show_orders))
+    app.add_handler(CommandHandler("cancel", cancel_order))
+    app.add_handler(CommandHandler("twap", twap))
+    app.add_handler(CommandHandler("twaps", show_twaps))
+    app.add_handler(CommandHandler("stoptwap", stop_twap))
     app.add_handler(CallbackQueryHandler(button_handler))
+    return app
+
+if __name__ == "__main__":
+    app = build_application(ApplicationBuilder().token(os.getenv("TG_BOT_TOKEN")))
     print("Solana bot running…")
     app.run_polling()
@@ -0,0 +1,91 @@
+import os, sys, time, html
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from telegram.constants import ParseMode
+from constants import BUY, SELL
+from transactions.swap_jito import fan_out_swap
+from transactions.wallets import get_wallets
+from helpers.outbox import get_outbox, TRADE
+from tg.quick_swap import SOLANA_REGEX, get_task
+
+MULTIBUY_USAGE  = "Usage: <code>/multibuy &lt;mint&gt; &lt;SOL each&gt; [wallets, e.g. 1-8]</code>"
+MULTISELL_USAGE = "Usage: <code>/multisell &lt;mint&gt; &lt;percent&gt; [wallets, e.g. 1-8]</code>"
+
+
+async def show_wallets(update, context):
+    lines = ["👛 <b>Wallets</b>", ""]
+    for w in get_wallets().wallets:
+        lines.append(f"{w.index}. <code>{w.address}</code>")
+    if len(lines) == 2:
+        lines.append("No wallets configured.")
+    await get_outbox().reply(update.message, "\n".join(lines), parse_mode=ParseMode.HTML)
+
+
+def _parse_args(args, side):
+    """(mint, amount, wallets) from command args, or raise ValueError."""
+    if len(args) < 2 or not SOLANA_REGEX.fullmatch(args[0]):
+        raise ValueError(MULTIBUY_USAGE if side == BUY else MULTISELL_USAGE)
+    try:
+        amount = float(args[1])
+    except ValueError:
+        amount = 0
+    if amount <= 0 or (side == SELL and amount > 100):
+        raise ValueError("❌ Invalid amount" + ("" if side == BUY else ": send 1–100"))
+    try:
+        wallets = get_wallets().select(args[2] if len(args) > 2 else None)
+    except ValueError as e:
+        # echoes the user's spec; the reply is HTML (the usage messages above already are)
+        raise ValueError(f"❌ {html.escape(str(e))}")
+    if not wallets:
+        raise ValueError("❌ No wallets selected")
+    return args[0], amount, wallets
+
+
+def render_fanout(side, mint, amount, results, elapsed):
+    ok = [r for r in results if r.signature]
+    unit = "SOL each" if side == BUY else "%"
+    lines = [
+        f"🧺 <b>Multi-{side} {amount:g} {unit}</b> · {len(ok)}/{len(results)} landed · {elapsed:.1f}s",
+        f"<code>{mint}</code>",
+        "",
+    ]
+    for r in results:
+        if r.signature:
+            lines.append(f"✅ {r.wallet.label}: <code>{r.signature}</code>")
+        else:
+            lines.append(f"❌ {r.wallet.label}: {html.escape(r.error or 'failed')}")
+    return "\n".join(lines)
+
+
+async def _fan_out(update, context, side):
+    try:
+        mint, amount, wallets = _parse_args(context.args or [], side)
+    except ValueError as e:
+        return await get_outbox().reply(update.message, str(e), parse_mode=ParseMode.HTML)
+
+    order = dict(get_task(context))
+    order['side'] = side
+    if side == BUY:
+        order['amount'] = amount
+    else:
+        order['autosell_pct'] = amount
+    status = await get_outbox().reply(
+        update.message, f"⏳ Multi-{side} on {len(wallets)} wallet(s)…", parse_mode=ParseMode.HTML
+    )
+
+    async def run():
+        started = time.monotonic()
+        results = await fan_out_swap(address=mint, side=side, task=order, wallets=wallets)
+        await get_outbox().edit(
+            status, render_fanout(side, mint, amount, results, time.monotonic() - started),
+            priority=TRADE, parse_mode=ParseMode.HTML, disable_web_page_preview=True
+        )
+    context.application.create_task(run(), update=update)
+
+
+async def multibuy(update, context):
+    await _fan_out(update, context, BUY)
+
+async def multisell(update, context):
+    await _fan_out(update, context, SELL)
@@ -0,0 +1,137 @@
+import os, sys
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from telegram.constants import ParseMode
+from constants import BUY
+from transactions.orders import get_order_engine, KINDS, ABOVE
+from transactions.fetch_price import fetch_price_usdc
+from transactions.swap_jito import swap
+from helpers.outbox import get_outbox, TRADE
+from tg.quick_swap import SOLANA_REGEX, get_task
+
+ORDERS_USAGE = (
+    "Usage:\n"
+    "<code>/tp &lt;mint&gt; &lt;price|+50%&gt; [sell %]</code>\n"
+    "<code>/sl &lt;mint&gt; &lt;price|-20%&gt; [sell %]</code>\n"
+    "<code>/limit buy &lt;mint&gt; &lt;price|-10%&gt; &lt;SOL&gt;</code>\n"
+    "<code>/limit sell &lt;mint&gt; &lt;price|+10%&gt; &lt;sell %&gt;</code>\n"
+    "Prices are USDC per token; +N% / -N% is relative to the current price."
+)
+KIND_LABELS = {"tp": "🎯 TP", "sl": "🛑 SL", "limit_buy": "📥 Limit buy", "limit_sell": "📤 Limit sell"}
+
+
+class ChatTarget:
+    """A chat to notify when no message is left to reply to (orders fire long after the command)."""
+
+    def __init__(self, bot, chat_id: int):
+        self.bot = bot
+        self.chat_id = chat_id
+
+    async def reply_text(self, text, **kwargs):
+        return await self.bot.send_message(self.chat_id, text, **kwargs)
+
+
+async def _parse_price(mint: str, spec: str) -> float:
+    """Absolute USDC price, or +N% / -N% from the current one."""
+    if spec.endswith("%"):
+        pct = float(spec[:-1])
+        current = await fetch_price_usdc(mint)
+        if not current:
+            raise ValueError("❌ No price for this token yet; give an absolute price")
+        return current * (1 + pct / 100)
+    return float(spec)
+
+
+def _render_order(order) -> str:
+    arrow = "≥" if order.direction == ABOVE else "≤"
+    if order.side == BUY:
+        size = f"{order.task['amount']} SOL"
+    else:
+        size = f"{order.task['autosell_pct']}%"
+    return (
+        f"#{order.id} {KIND_LABELS[order.kind]} {size} when price {arrow} ${order.trigger:.6g}\n"
+        f"    <code>{order.mint}</code>"
+    )
+
+
+async def _place(update, context, kind, mint, price_spec, size):
+    if not SOLANA_REGEX.fullmatch(mint or ""):
+        raise ValueError(ORDERS_USAGE)
+    try:
+        trigger = await _parse_price(mint, price_spec)
+        size = float(size)
+    except (TypeError, ValueError) as e:
+        raise ValueError(str(e) if str(e).startswith("❌") else ORDERS_USAGE)
+    side = KINDS[kind][0]
+    if size <= 0 or (side != BUY and size > 100):
+        raise ValueError("❌ Invalid size" + ("" if side == BUY else ": send 1–100"))
+    task = dict(get_task(context), token_address=mint)
+    if side == BUY:
+        task['amount'] = size
+    else:
+        task['autosell_pct'] = size
+    order = get_order_engine().add(update.effective_chat.id, mint, kind, trigger, task)
+    await get_outbox().reply(update.message, f"✅ Order placed\n{_render_order(order)}", parse_mode=ParseMode.HTML)
+
+
+async def _place_or_explain(update, context, kind, mint, price_spec, size):
+    try:
+        await _place(update, context, kind, mint, price_spec, size)
+    except ValueError as e:
+        await get_outbox().reply(update.message, str(e), parse_mode=ParseMode.HTML)
+
+
+async def _sell_trigger(update, context, kind):
+    args = list(context.args or [])
+    if len(args) < 2:
+        return await get_outbox().reply(update.message, ORDERS_USAGE, parse_mode=ParseMode.HTML)
+    await _place_or_explain(update, context, kind, args[0], args[1], args[2] if len(args) > 2 else "100")
+
+
+async def take_profit(update, context):
+    await _sell_trigger(update, context, "tp")
+
+async def stop_loss(update, context):
+    await _sell_trigger(update, context, "sl")
+
+
+async def limit(update, context):
+    args = list(context.args or [])
+    if len(args) < 4 or args[0].lower() not in ("buy", "sell"):
+        return await get_outbox().reply(update.message, ORDERS_USAGE, parse_mode=ParseMode.HTML)
+    await _place_or_explain(update, context, f"limit_{args[0].lower()}", args[1], args[2], args[3])
+
+
+async def show_orders(update, context):
+    orders = get_order_engine().open_orders(update.effective_chat.id)
+    lines = ["📒 <b>Open orders</b>", ""] + [_render_order(o) for o in orders]
+    if not orders:
+        lines.append("None. " + ORDERS_USAGE)
+    else:
+        lines += ["", "Cancel with <code>/cancel &lt;id&gt;</code>"]
+    await get_outbox().reply(update.message, "\n".join(lines), parse_mode=ParseMode.HTML)
+
+
+async def cancel_order(update, context):
+    try:
+        order_id = int((context.args or [""])[0].lstrip("#"))
+    except ValueError:
+        return await get_outbox().reply(update.message, "Usage: <code>/cancel &lt;id&gt;</code>", parse_mode=ParseMode.HTML)
+    if get_order_engine().cancel(order_id, update.effective_chat.id):
+        await get_outbox().reply(update.message, f"🗑 Order #{order_id} cancelled")
+    else:
+        await get_outbox().reply(update.message, f"❌ No open order #{order_id}")
+
+
+def start_order_engine(bot) -> None:
+    """Start polling; triggered orders swap through swap_jito.swap and report to their chat."""
+    async def fire(order, price):
+        target = ChatTarget(bot, order.chat_id)
+        await get_outbox().reply(
+            target, f"⚡ Order triggered at ${price:.6g}\n{_render_order(order)}",
+            priority=TRADE, parse_mode=ParseMode.HTML
+        )
+        return await swap(address=order.mint, side=order.side, task=order.task, reply_message=target)
+
+    get_order_engine().start(fire)
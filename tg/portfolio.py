@@ -0,0 +1,51 @@
+import os, sys, time
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.constants import ParseMode
+from helpers.outbox import get_outbox, MENU
+from helpers.portfolio import get_portfolio, render_portfolio
+
+PORTFOLIO_TTL = 20  # seconds a fetched portfolio is reused while paging
+
+
+def _keyboard(page: int, pages: int) -> InlineKeyboardMarkup:
+    nav = []
+    if page > 0:
+        nav.append(InlineKeyboardButton("◀ Prev", callback_data=f"portfolio:page:{page - 1}"))
+    if page < pages - 1:
+        nav.append(InlineKeyboardButton("Next ▶", callback_data=f"portfolio:page:{page + 1}"))
+    rows = [nav] if nav else []
+    rows.append([InlineKeyboardButton("🔄 Refresh", callback_data=f"portfolio:refresh:{page}")])
+    return InlineKeyboardMarkup(rows)
+
+
+async def _load(context, fresh: bool):
+    cached = context.chat_data.get('portfolio')
+    if cached and not fresh and time.monotonic() - cached[0] < PORTFOLIO_TTL:
+        return cached[1]
+    portfolio = await get_portfolio()
+    context.chat_data['portfolio'] = (time.monotonic(), portfolio)
+    return portfolio
+
+
+async def show_portfolio(update, context):
+    status = await get_outbox().reply(update.effective_message, "⏳ Loading portfolio…")
+    portfolio = await _load(context, fresh=True)
+    await get_outbox().edit(
+        status, render_portfolio(portfolio, 0), priority=MENU, parse_mode=ParseMode.HTML,
+        reply_markup=_keyboard(0, portfolio.pages), disable_web_page_preview=True
+    )
+
+
+async def handle_portfolio_callback(update, context):
+    """portfolio:page:N flips pages from the cached snapshot; portfolio:refresh:N refetches."""
+    query = update.callback_query
+    _, action, page = query.data.split(':', 2)
+    portfolio = await _load(context, fresh=(action == 'refresh'))
+    page = min(max(int(page), 0), portfolio.pages - 1)
+    await get_outbox().edit(
+        query, render_portfolio(portfolio, page), priority=MENU, parse_mode=ParseMode.HTML,
+        reply_markup=_keyboard(page, portfolio.pages), disable_web_page_preview=True
+    )
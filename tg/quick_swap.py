@@ -4,43 +4,67 @@ if root not in sys.path:
     sys.path.insert(0, root)
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from constants import JITO_PROCESSOR, BUY, SELL
-from transactions.swap_jito import swap
+from transactions.swap_jito import swap, buy_params
+from transactions.account import get_user_keypair
+from transactions.wallets import get_wallets
+from transactions.executor import get_swap_executor, ExecutorBusy
+from transactions.presign import presigned, PRESIGN_ENABLED
+from transactions.fee_estimator import FEE_TIER
 from helpers.token_summary import get_token_summary, render_token_summary
+from helpers.outbox import get_outbox, MENU
 from telegram.constants import ParseMode
-from telegram.error import BadRequest
 import re
 
 SOLANA_REGEX = re.compile(r'[1-9A-HJ-NP-Za-km-z]{43,44}')
 
+QUICK_BUY_AMOUNTS = ('0.00001', '0.05', '0.5', '1')
+
 default_buy_slippage = 5
 default_sell_slippage = 2
 
-task = {
+DEFAULT_TASK = {
     'sell_slippage': default_sell_slippage,
     'buy_slippage': default_buy_slippage,
     'buy_fee': '0.000001',
     'buy_tip': '0.00001',
     'sell_fee': '0.000001',
     'sell_tip': '0.00001',
+    'fee_tier': FEE_TIER,   # fixed tips above are the fallback when estimates are stale
     'processor': JITO_PROCESSOR
 }
 
 
+def get_task(context) -> dict:
+    """This chat's trade settings and current order, created from DEFAULT_TASK."""
+    return context.chat_data.setdefault('task', dict(DEFAULT_TASK))
+
+
+async def _enqueue(message, job):
+    """Run `job` on the wallet's swap lane; tell the chat if it has to wait or can't queue."""
+    executor = get_swap_executor()
+    wallet = get_wallets().default().address
+    ahead = executor.pending(wallet)
+    try:
+        executor.submit(wallet, job)
+    except ExecutorBusy:
+        return await get_outbox().reply(message, '🚦 Too many swaps pending on this wallet. Try again once they land.')
+    if ahead:
+        await get_outbox().reply(message, f'⏳ Queued behind {ahead} swap(s) on this wallet…')
+
+
 async def _send_or_edit(obj, text, **kwargs):
+    """Edit a callback's message or reply to a plain one; menus yield to trade messages."""
     kwargs.setdefault("parse_mode", ParseMode.HTML)
-    try:
-        if hasattr(obj, "edit_message_text"):
-            await obj.edit_message_text(text, **kwargs)
-        else:
-            await obj.reply_text(text, **kwargs)
-    except BadRequest as e:
-        if "message is not modified" in e.message.lower():
-            return
-        raise
+    kwargs.setdefault("priority", MENU)
+    if hasattr(obj, "edit_message_text"):
+        await get_outbox().edit(obj, text, **kwargs)
+    else:
+        await get_outbox().reply(obj, text, **kwargs)
 
 async def show_quick_buy_menu(obj, context):
     context.user_data.setdefault('quick_trade', {})['mode'] = 'buy'
     qt = context.user_data['quick_trade']
+    task = get_task(context)
     info = await get_token_summary(qt['token_address'])
 
 
@@ -62,10 +86,17 @@ async def show_quick_buy_menu(obj, context):
     if swap_text and swap_text != task['token_address']:
         await _send_or_edit(obj, swap_text, disable_web_page_preview=True)
     await _send_or_edit(obj, f"⚡ <b>Buy</b>: {render_token_summary(info)}", reply_markup=InlineKeyboardMarkup(kb))
+    if PRESIGN_ENABLED:
+        slippage, tip_lamports = buy_params(task)
+        presigned.prepare(
+            address=task['token_address'], sol_amounts=QUICK_BUY_AMOUNTS,
+            slippage=slippage, tip_lamports=tip_lamports, keypair=get_user_keypair()
+        )
 
 async def show_quick_sell_menu(obj, context):
     context.user_data.setdefault('quick_trade', {})['mode'] = 'sell'
     qt = context.user_data['quick_trade']
+    task = get_task(context)
     info = await get_token_summary(qt['token_address'], use_ws=True)
 
     kb = [
@@ -91,8 +122,9 @@ async def show_quick_sell_menu(obj, context):
 async def handle_quick_swap_callback(update, context):
     query = update.callback_query
     data  = query.data
+    task  = get_task(context)
     if data == 'quick_trade':
-        await query.message.reply_text('🔹 Send token address:')
+        await get_outbox().reply(query.message, '🔹 Send token address:')
         context.user_data['waiting_for'] = 'quick_swap_token_address'
         return
 
@@ -108,25 +140,33 @@ async def handle_quick_swap_callback(update, context):
         task['side'] = BUY
         task['amount'] = val
         task['user_id'] = update.effective_user.id
-        await query.edit_message_text('⏳ Processing buy swap…')
-        await swap(
-            address=task['token_address'], side=task['side'], task=task, reply_message=query.message
-        )
-        return await show_quick_sell_menu(query.message, context)
+        await get_outbox().edit(query, '⏳ Processing buy swap…')
+        order = dict(task)
+
+        async def job():
+            await swap(
+                address=order['token_address'], side=order['side'], task=order, reply_message=query.message
+            )
+            await show_quick_sell_menu(query.message, context)
+        return await _enqueue(query.message, job)
 
     if data.startswith('quick_sell_pct:'):
         _, val = data.split(':', 1)
         task['side'] = SELL
         task['autosell_pct'] = val
-        await query.edit_message_text('⏳ Processing sell swap…')
-        await swap(
-            address=task['token_address'], side=task['side'], task=task, reply_message=query.message
-        )
-        await show_quick_buy_menu(query.message, context)
-        return
+        await get_outbox().edit(query, '⏳ Processing sell swap…')
+        order = dict(task)
+
+        async def job():
+            await swap(
+                address=order['token_address'], side=order['side'], task=order, reply_message=query.message
+            )
+            await show_quick_buy_menu(query.message, context)
+        return await _enqueue(query.message, job)
 
 async def handle_quick_swap_message(update, context):
     wait = context.user_data.get('waiting_for')
+    task = get_task(context)
     field = None
 
     text = update.message.text.strip()
@@ -139,11 +179,11 @@ async def handle_quick_swap_message(update, context):
         if task.get('side') == BUY:
             prompt = 'amount (SOL)'
             context.user_data['waiting_for'] = 'quick_buy_amount:custom'
-            await update.message.reply_text(f'🔹 Send {prompt}:')
+            await get_outbox().reply(update.message, f'🔹 Send {prompt}:')
         else:
             prompt = 'sell %'
             context.user_data['waiting_for'] = 'quick_sell_pct:custom'
-            await update.message.reply_text(f'🔹 Send {prompt}:')
+            await get_outbox().reply(update.message, f'🔹 Send {prompt}:')
         return
     if wait in ('quick_buy_slippage', 'quick_sell_slippage'):
         is_buy = (wait == 'quick_buy_slippage')
@@ -155,7 +195,7 @@ async def handle_quick_swap_message(update, context):
             assert 0 <= val <= 100
         except:
             context.user_data['waiting_for'] = wait
-            return await update.message.reply_text(f"❌ Invalid {prompt}. Send 0–100:")
+            return await get_outbox().reply(update.message, f"❌ Invalid {prompt}. Send 0–100:")
         if is_buy:
             field = 'buy_slippage'
         else:
@@ -164,7 +204,7 @@ async def handle_quick_swap_message(update, context):
         task[field] = text
         # clear the flag, delete the user’s message
         context.user_data.pop('waiting_for', None)
-        await update.message.delete()
+        await get_outbox().delete(update.message)
 
         # re-render the correct menu (make sure your menu uses buy_slippage / sell_slippage)
         if is_buy:
@@ -183,18 +223,22 @@ async def handle_quick_swap_message(update, context):
                 task['autosell_pct'] = val
         except ValueError:
             context.user_data['waiting_for'] = wait
-            return await update.message.reply_text(
+            return await get_outbox().reply(
+                update.message,
                 f"❌ Invalid option. Please send a number{' between 1 and 100' if not is_buy else ''}:"
             )
-        await update.message.delete()
-        processing_message = await update.message.reply_text(f'⏳ Processing {"buy" if is_buy else "sell"} swap…')
-        await swap(
-            address    = task['token_address'],
-            side       = task['side'],
-            task       = task,
-            reply_message=update.message
-        )
-    
-    await processing_message.delete()
-    context.user_data.pop('waiting_for', None)
-    return await show_quick_buy_menu(update.message, context)
\ No newline at end of file
+        await get_outbox().delete(update.message)
+        processing_message = await get_outbox().reply(update.message, f'⏳ Processing {"buy" if is_buy else "sell"} swap…')
+        context.user_data.pop('waiting_for', None)
+        order = dict(task)
+
+        async def job():
+            await swap(
+                address    = order['token_address'],
+                side       = order['side'],
+                task       = order,
+                reply_message=update.message
+            )
+            await get_outbox().delete(processing_message)
+            await show_quick_buy_menu(update.message, context)
+        return await _enqueue(processing_message, job)
\ No newline at end of file
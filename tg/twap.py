@@ -0,0 +1,106 @@
+import os, sys, time, html
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root not in sys.path:
+    sys.path.insert(0, root)
+from telegram.constants import ParseMode
+from constants import BUY, SELL, LAMPORTS_PER_SOL
+from transactions.twap import get_twap_scheduler, TWAP_JITTER, TWAP_MAX_IMPACT_PCT
+from helpers.outbox import get_outbox, TRADE, DEFAULT
+from tg.quick_swap import SOLANA_REGEX, get_task
+
+TWAP_USAGE = (
+    "Usage:\n"
+    "<code>/twap buy &lt;mint&gt; &lt;SOL total&gt; &lt;slices&gt; &lt;minutes&gt; [jitter=20] [impact=3]</code>\n"
+    "<code>/twap sell &lt;mint&gt; &lt;percent&gt; &lt;slices&gt; &lt;minutes&gt; [jitter=20] [impact=3]</code>\n"
+    "jitter: ± % of each interval; impact: skip slices quoted above this price impact %."
+)
+
+
+def _parse_args(args):
+    """(side, mint, size, slices, seconds, jitter, max impact %) or raise ValueError."""
+    if len(args) < 5 or args[0].lower() not in (BUY, SELL) or not SOLANA_REGEX.fullmatch(args[1]):
+        raise ValueError(TWAP_USAGE)
+    options = {"jitter": TWAP_JITTER * 100, "impact": TWAP_MAX_IMPACT_PCT}
+    try:
+        size, slices, minutes = float(args[2]), int(args[3]), float(args[4])
+        for opt in args[5:]:
+            key, _, value = opt.partition("=")
+            if key not in options:
+                raise ValueError
+            options[key] = float(value)
+    except ValueError:
+        raise ValueError(TWAP_USAGE)
+    side = args[0].lower()
+    if side == SELL and not 0 < size <= 100:
+        raise ValueError("❌ Invalid percent: send 1–100")
+    return side, args[1], size, slices, minutes * 60, options["jitter"] / 100, options["impact"]
+
+
+def render_twap(order) -> str:
+    unit = "SOL" if order.side == BUY else "%"
+    lines = [
+        f"⏱ <b>TWAP #{order.id} {order.side} {order.size:g} {unit}</b> · {order.slices} slices over {order.duration / 60:.3g} min",
+        f"<code>{order.mint}</code>",
+        "",
+        f"Slices: {order.done}/{order.slices} · filled {order.filled} · skipped {len(order.skipped)}",
+    ]
+    if order.total:
+        if order.side == BUY:
+            lines.append(f"Spent: <code>{order.spent / LAMPORTS_PER_SOL:,.4f} / {order.total / LAMPORTS_PER_SOL:,.4f} SOL</code>")
+        else:
+            lines.append(f"Sold: <code>{order.spent:,} / {order.total:,}</code> raw · got <code>{order.received / LAMPORTS_PER_SOL:,.4f} SOL</code>")
+    if order.skipped:
+        lines.append(f"Last skip: {html.escape(order.skipped[-1])}")
+    if order.signatures:
+        lines.append(f"Last tx: <code>{order.signatures[-1]}</code>")
+    if order.status == "running":
+        if order.next_at:
+            lines.append(f"Next slice in {max(order.next_at - time.monotonic(), 0):.0f}s · /stoptwap {order.id}")
+    elif order.status == "failed":
+        lines.append(f"❌ Stopped: {html.escape(order.error or 'failed')}")
+    else:
+        lines.append(f"{'✅' if order.status == 'done' else '🛑'} {order.status.title()}")
+    return "\n".join(lines)
+
+
+async def twap(update, context):
+    try:
+        side, mint, size, slices, seconds, jitter, impact = _parse_args(list(context.args or []))
+    except ValueError as e:
+        return await get_outbox().reply(update.message, str(e), parse_mode=ParseMode.HTML)
+
+    status = await get_outbox().reply(update.message, f"⏱ Starting TWAP {side}…", parse_mode=ParseMode.HTML)
+
+    async def on_progress(order):
+        # every update replaces the queued one, so only the latest state is sent
+        await get_outbox().edit(
+            status, render_twap(order), priority=DEFAULT if order.status == "running" else TRADE,
+            parse_mode=ParseMode.HTML, disable_web_page_preview=True
+        )
+
+    try:
+        get_twap_scheduler().start(
+            chat_id=update.effective_chat.id, mint=mint, side=side, size=size, slices=slices,
+            duration=seconds, task=dict(get_task(context), token_address=mint),
+            jitter=jitter, max_impact_pct=impact, on_progress=on_progress,
+        )
+    except ValueError as e:
+        await get_outbox().edit(status, f"❌ {e}")
+
+
+async def show_twaps(update, context):
+    orders = get_twap_scheduler().active(update.effective_chat.id)
+    if not orders:
+        return await get_outbox().reply(update.message, "No TWAP orders running.")
+    await get_outbox().reply(update.message, "\n\n".join(render_twap(o) for o in orders), parse_mode=ParseMode.HTML)
+
+
+async def stop_twap(update, context):
+    try:
+        order_id = int((context.args or [""])[0].lstrip("#"))
+    except ValueError:
+        return await get_outbox().reply(update.message, "Usage: <code>/stoptwap &lt;id&gt;</code>", parse_mode=ParseMode.HTML)
+    if get_twap_scheduler().cancel(order_id, update.effective_chat.id):
+        await get_outbox().reply(update.message, f"🛑 TWAP #{order_id} stopped")
+    else:
+        await get_outbox().reply(update.message, f"❌ No running TWAP #{order_id}")
@@ -1,68 +1,73 @@
-import os, base64
+import os
 from dotenv import load_dotenv
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey
-from solders.pubkey import Pubkey
-from helpers.client_session import get_session
-from typing import Dict
-from construct import Struct, Int8ul, Bytes, PaddedString
+from transactions.rpc_client import rpc_call
+from typing import Dict, Optional
+from transactions.mint_info import get_mint_index
+from transactions.wallets import get_wallets
+from transactions.wallet_state import get_wallet_mirror
+from helpers.metrics import count
 
 load_dotenv()
 
-RPC_URL = os.getenv("RPC_URL")
+RPC_URL = os.getenv("RPC_URL") or os.getenv("RPC_URLS")
 if not RPC_URL:
-    raise RuntimeError("RPC_URL must be set in environment")
+    raise RuntimeError("RPC_URL or RPC_URLS must be set in environment")
 
 def get_user_keypair() -> Keypair:
-    key = os.environ.get("SOL_PRIVATE_KEY")
-    if not key:
-        raise RuntimeError("❌ SOL_PRIVATE_KEY not set")
-    try:
-        return Keypair.from_base58_string(key)
-    except Exception as e:
-        raise RuntimeError(f"❌ Invalid SOL_PRIVATE_KEY: {e}")
+    """Keypair of the default wallet (parsed once by the registry)."""
+    return get_wallets().default().keypair
 
 def get_user_pubkey() -> Pubkey:
-    return Pubkey.from_string(str(get_user_keypair().pubkey()))
+    return get_wallets().default().pubkey
 
-async def get_sol_balance() -> int:
+async def get_sol_balance(owner: Optional[str] = None, fresh: bool = False) -> int:
     """
-    Fetch native SOL balance via JSON-RPC getBalance.
-    Returns lamports as int.
+    Native SOL balance in lamports (default wallet unless `owner`).
+    Served from the live wallet mirror when it is up; otherwise (or with
+    fresh=True) via JSON-RPC getBalance, which also refreshes the mirror.
     """
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getBalance",
-        "params": [str(get_user_pubkey()), {"commitment": "processed"}]
-    }
-    session = await get_session()
-    resp = await session.post(RPC_URL, json=payload)
-    resp.raise_for_status()
-    result = (await resp.json()).get("result", {})
-    return result.get("value", 0)
+    owner = owner or get_wallets().default().address
+    mirror = get_wallet_mirror(owner)
+    if mirror and mirror.live and not fresh:
+        count("balance_read", "mirror")
+        return mirror.sol().lamports
+    count("balance_read", "rpc")
+    result = await rpc_call(
+        "getBalance", [owner, {"commitment": "processed"}]
+    )
+    if mirror and result:
+        mirror.apply_sol(result["value"], result["context"]["slot"])
+    return (result or {}).get("value", 0)
 
 async def get_token_account_balance(
-    mint_address: str
+    mint_address: str,
+    owner: Optional[str] = None,
+    fresh: bool = False
 ) -> Dict[str, int]:
     """
-    Fetch SPL token balance (smallest units) for a given mint via JSON-RPC getTokenAccountsByOwner.
-    Returns {"mint": mint_address, "amount": balance}.
+    Fetch SPL token balance (smallest units) for a given mint.
+    Served from the live wallet mirror when it is up; otherwise (or with
+    fresh=True) via JSON-RPC getTokenAccountsByOwner, which also refreshes the mirror.
+    Returns {"mint": mint_address, "amount": balance, "decimals": decimals}.
     """
-    session = await get_session()
-    payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "getTokenAccountsByOwner",
-        "params": [
-            str(get_user_pubkey()),
-            {"mint": mint_address},
-            {"encoding": "jsonParsed", "commitment": "processed"},
-        ]
-    }
-    resp = await session.post(RPC_URL, json=payload, timeout=10)
-    resp.raise_for_status()
-    data = (await resp.json()).get("result", {}).get("value", [])
+    owner = owner or get_wallets().default().address
+    mirror = get_wallet_mirror(owner)
+    if mirror and mirror.live and not fresh:
+        count("balance_read", "mirror")
+        held = mirror.token(mint_address)
+        return {"mint": mint_address, "amount": held["amount"], "decimals": held["decimals"]}
+    count("balance_read", "rpc")
+    result = await rpc_call("getTokenAccountsByOwner", [
+        owner,
+        {"mint": mint_address},
+        {"encoding": "jsonParsed", "commitment": "processed"},
+    ])
+    data = (result or {}).get("value", [])
+    if mirror:
+        for keyed in data:
+            mirror.apply_parsed(keyed, keyed["account"]["owner"], result["context"]["slot"])
     if not data:
         return {"mint": mint_address, "amount": 0, "decimals": 0}
     info = data[0]["account"]["data"]["parsed"]["info"]["tokenAmount"]
@@ -72,47 +77,13 @@ async def get_token_account_balance(
         "decimals": int(info.get("decimals", 0)),
     }
     
-TOKEN_METADATA_PROGRAM = Pubkey.from_string("metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
-
-# Construct layout to parse name & symbol
-_MD_LAYOUT = Struct(
-    "key" / Int8ul,
-    "update_authority" / Bytes(32),
-    "mint" / Bytes(32),
-    "name" / PaddedString(32, "utf8"),
-    "symbol" / PaddedString(10, "utf8"),
-)
-
 async def fetch_token_metadata(mint_address: str):
     """
-    Return (name, symbol) from on‐chain Metaplex metadata, or fallback
-    to the truncated mint on any error (including invalid Base58).
+    Return (name, symbol) from on‐chain Metaplex metadata.
+    Served from the mint index, so hot tokens cost no RPC at all.
+    Raises ValueError for invalid mints or mints without metadata.
     """
-    # try to compute the PDA, but bail out on invalid strings
-    try:
-        mint_pub = Pubkey.from_string(mint_address)
-        pda, _ = Pubkey.find_program_address(
-            [b"metadata", bytes(TOKEN_METADATA_PROGRAM), bytes(mint_pub)],
-            TOKEN_METADATA_PROGRAM,
-        )
-    except ValueError as e:
-        raise ValueError(f"Invalid mint: {mint_address}") from e
-
-    session = await get_session()
-    payload = {
-        "jsonrpc": "2.0", "id": 1,
-        "method": "getAccountInfo",
-        "params": [str(pda), {"encoding": "base64"}]
-    }
-    resp = await session.post(RPC_URL, json=payload, timeout=10)
-    resp.raise_for_status()
-    info = (await resp.json()).get("result", {}).get("value")
-    if not info or not info.get("data"):
+    info = await get_mint_index().get(mint_address)
+    if info.name is None:
         raise ValueError(f"Invalid mint: {mint_address}")
-
-    raw = base64.b64decode(info["data"][0])
-    parsed = _MD_LAYOUT.parse(raw)
-
-    name = parsed.name.rstrip("\x00").strip()
-    sym  = parsed.symbol.rstrip("\x00").strip()
-    return name, sym
\ No newline at end of file
+    return info.name, info.symbol
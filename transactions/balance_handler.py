@@ -4,6 +4,7 @@ from telegram import Update
 from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from telegram.error import BadRequest
+from helpers.outbox import get_outbox
 from transactions.account import get_sol_balance, get_user_pubkey
 
 load_dotenv()
@@ -17,13 +18,13 @@ async def show_balance(update: Update):
     try:
         lamports = await get_sol_balance()
         header   = f"💰 `{get_user_pubkey()}`\nSOL: `{lamports / 1e9:.2f}`"
-        await msg_obj.reply_text(header, parse_mode=ParseMode.MARKDOWN)
+        await get_outbox().reply(msg_obj, header, parse_mode=ParseMode.MARKDOWN)
     except BadRequest as e:
         if "not modified" not in str(e).lower():
             logger.warning("show_balance BadRequest: %s", e)
     except Exception as e:
         logger.exception("show_balance failed")
         try:
-            await msg_obj.reply_text("⚠️ Could not fetch SOL balance.")
+            await get_outbox().reply(msg_obj, "⚠️ Could not fetch SOL balance.")
         except Exception:
             pass
@@ -0,0 +1,126 @@
+import os, time, asyncio, logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+from solders.hash import Hash
+from transactions.rpc_client import rpc_call
+from transactions.lookup_tables import lookup_tables
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+BLOCKHASH_POLL_INTERVAL = float(os.getenv("BLOCKHASH_POLL_INTERVAL", "2"))  # seconds
+BLOCKHASH_MIN_REMAINING = int(os.getenv("BLOCKHASH_MIN_REMAINING", "60"))   # blocks left before we re-stamp
+MAX_PROCESSING_AGE      = 150    # blocks a blockhash stays valid
+SLOT_TIME               = 0.4    # seconds, used to extrapolate between polls
+_KNOWN_HASHES           = 256
+
+
+@dataclass(frozen=True)
+class BlockhashInfo:
+    blockhash: Hash
+    last_valid_block_height: int
+    slot: int
+    fetched_at: float   # time.monotonic()
+
+
+class BlockhashManager:
+    """
+    Keeps the latest blockhash and lastValidBlockHeight current by polling
+    getLatestBlockhash in the background, so transactions can be built or
+    re-stamped without waiting on the network.
+    """
+
+    def __init__(self, interval: float = BLOCKHASH_POLL_INTERVAL):
+        self.interval = interval
+        self._latest: Optional[BlockhashInfo] = None
+        self._expiry: "OrderedDict[Hash, int]" = OrderedDict()  # blockhash -> lastValidBlockHeight
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = self.interval
+        while True:
+            try:
+                await self.refresh()
+                delay = self.interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("blockhash poll failed: %s", e)
+                delay = min(delay * 2, 30)
+            await asyncio.sleep(delay)
+
+    async def refresh(self) -> BlockhashInfo:
+        result = await rpc_call("getLatestBlockhash", [{"commitment": "confirmed"}])
+        value = result["value"]
+        info = BlockhashInfo(
+            blockhash=Hash.from_string(value["blockhash"]),
+            last_valid_block_height=int(value["lastValidBlockHeight"]),
+            slot=int(result["context"]["slot"]),
+            fetched_at=time.monotonic(),
+        )
+        self._latest = info
+        self.remember(info.blockhash, info.last_valid_block_height)
+        lookup_tables.note_slot(info.slot)
+        self._ready.set()
+        return info
+
+    def remember(self, blockhash: Hash, last_valid_block_height: int) -> None:
+        """Record the expiry of a blockhash obtained elsewhere (e.g. from Jupiter)."""
+        self._expiry[blockhash] = last_valid_block_height
+        self._expiry.move_to_end(blockhash)
+        while len(self._expiry) > _KNOWN_HASHES:
+            self._expiry.popitem(last=False)
+
+    def expiry(self, blockhash: Hash) -> Optional[int]:
+        """lastValidBlockHeight for a blockhash we have seen, else None."""
+        return self._expiry.get(blockhash)
+
+    def current(self) -> Optional[BlockhashInfo]:
+        """Latest known blockhash; never blocks (None until the first poll lands)."""
+        return self._latest
+
+    async def wait_ready(self, timeout: float = 5.0) -> Optional[BlockhashInfo]:
+        self.start()
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self._latest
+
+    def block_height(self) -> Optional[int]:
+        """Estimated current block height, extrapolated from the last poll."""
+        info = self._latest
+        if info is None:
+            return None
+        elapsed = time.monotonic() - info.fetched_at
+        return info.last_valid_block_height - MAX_PROCESSING_AGE + int(elapsed / SLOT_TIME)
+
+    def remaining(self, blockhash: Hash) -> Optional[int]:
+        """Blocks left before `blockhash` expires, or None if unknown."""
+        expiry = self.expiry(blockhash)
+        height = self.block_height()
+        if expiry is None or height is None:
+            return None
+        return expiry - height
+
+
+_manager: Optional[BlockhashManager] = None
+
+def get_blockhash_manager() -> BlockhashManager:
+    """Return the shared BlockhashManager."""
+    global _manager
+    if _manager is None:
+        _manager = BlockhashManager()
+    return _manager
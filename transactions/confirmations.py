@@ -0,0 +1,164 @@
+import os, time, asyncio, logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from solders.signature import Signature
+from helpers.ws_hub import get_ws_hub
+from transactions.rpc_client import rpc_call, rpc_batch
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+CONFIRM_POLL_INTERVAL = float(os.getenv("CONFIRM_POLL_INTERVAL", "1.0"))  # getSignatureStatuses cadence
+CONFIRM_USE_WS        = os.getenv("CONFIRM_USE_WS", "1") == "1"
+SIGS_PER_CALL         = 256   # getSignatureStatuses limit
+DEFAULT_TIMEOUT       = 60.0  # used when the blockhash expiry is unknown
+
+
+class OnChainError(Exception):
+    """The transaction landed but failed; `err` is the node's TransactionError."""
+
+    def __init__(self, err):
+        super().__init__(f"❌ On-chain error: {err}")
+        self.err = err
+
+
+@dataclass
+class Confirmation:
+    signature: str
+    slot: int
+
+
+class _Pending:
+    def __init__(self, future: asyncio.Future, last_valid: Optional[int], deadline: float):
+        self.future = future
+        self.last_valid = last_valid
+        self.deadline = deadline
+        self.ws_task: Optional[asyncio.Task] = None
+
+
+class ConfirmationTracker:
+    """
+    Resolve per-signature futures for any number of in-flight transactions.
+    Signature subscriptions on the shared WsHub give the fast path; a
+    batched getSignatureStatuses poller (256 sigs per call) catches what
+    the socket misses and enforces lastValidBlockHeight deadlines.
+    """
+
+    def __init__(self, interval: float = CONFIRM_POLL_INTERVAL, use_ws: bool = CONFIRM_USE_WS):
+        self.interval = interval
+        self.use_ws = use_ws
+        self._pending: Dict[str, _Pending] = {}
+        self._poller: Optional[asyncio.Task] = None
+        self._height: Optional[int] = None   # last confirmed block height seen
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def track(
+        self,
+        sig: str,
+        last_valid_block_height: Optional[int] = None,
+        timeout: float = DEFAULT_TIMEOUT
+    ) -> asyncio.Future:
+        """
+        Future resolving to a Confirmation once `sig` is confirmed. It fails
+        on an on-chain error, once the block height passes
+        `last_valid_block_height`, or after `timeout` seconds.
+        """
+        entry = self._pending.get(sig)
+        if entry is None:
+            fut = asyncio.get_running_loop().create_future()
+            entry = self._pending[sig] = _Pending(fut, last_valid_block_height, time.monotonic() + timeout)
+            if self.use_ws:
+                entry.ws_task = asyncio.create_task(self._watch(sig))
+            if self._poller is None or self._poller.done():
+                self._poller = asyncio.create_task(self._poll_loop())
+        return entry.future
+
+    def _resolve(self, sig: str, err=None, slot: int = 0, exc: Optional[BaseException] = None) -> None:
+        entry = self._pending.pop(sig, None)
+        if entry is None:
+            return
+        if entry.ws_task and entry.ws_task is not asyncio.current_task():
+            entry.ws_task.cancel()
+        if entry.future.done():
+            return
+        if exc is not None:
+            entry.future.set_exception(exc)
+        elif err is not None:
+            entry.future.set_exception(OnChainError(err))
+        else:
+            entry.future.set_result(Confirmation(sig, slot))
+
+    async def _watch(self, sig: str) -> None:
+        sub = None
+        try:
+            sub = await get_ws_hub().subscribe("signature", Signature.from_string(sig), commitment="confirmed")
+            async for notif in sub:
+                self._resolve(sig, notif.result.value.err, notif.result.context.slot)
+                return
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # the poller still covers this signature
+            logger.debug("signature ws for %s failed: %s", sig, e)
+        finally:
+            if sub is not None:
+                await sub.close()
+
+    async def _poll_loop(self) -> None:
+        while self._pending:
+            await asyncio.sleep(self.interval)
+            try:
+                await self._poll_once()
+            except Exception as e:
+                logger.warning("signature status poll failed: %s", e)
+            # deadlines hold even while the RPC keeps failing
+            self._expire()
+
+    async def _poll_once(self) -> None:
+        sigs = list(self._pending)
+        if not sigs:
+            return
+        chunks = [sigs[i:i + SIGS_PER_CALL] for i in range(0, len(sigs), SIGS_PER_CALL)]
+        with rpc_batch():
+            height_call = rpc_call("getBlockHeight", [{"commitment": "confirmed"}])
+            calls = [rpc_call("getSignatureStatuses", [chunk]) for chunk in chunks]
+        try:
+            self._height = max(await height_call, self._height or 0)
+        except Exception:
+            pass
+
+        for chunk, call in zip(chunks, calls):
+            try:
+                result = await call
+            except Exception as e:
+                logger.warning("getSignatureStatuses failed: %s", e)
+                continue
+            slot = result["context"]["slot"]
+            for sig, status in zip(chunk, result.get("value") or []):
+                entry = self._pending.get(sig)
+                if entry is None:
+                    continue
+                if status and status.get("confirmationStatus") in ("confirmed", "finalized"):
+                    self._resolve(sig, status.get("err"), status.get("slot") or slot)
+
+    def _expire(self) -> None:
+        """Fail every pending signature past its blockhash expiry or timeout."""
+        now = time.monotonic()
+        for sig, entry in list(self._pending.items()):
+            if self._height is not None and entry.last_valid is not None and self._height > entry.last_valid:
+                self._resolve(sig, exc=Exception(f"⏱ Blockhash expired before {sig} landed"))
+            elif now > entry.deadline:
+                self._resolve(sig, exc=Exception(f"⏱ Timed out waiting for confirmation of {sig}"))
+
+
+_tracker: Optional[ConfirmationTracker] = None
+
+def get_confirmation_tracker() -> ConfirmationTracker:
+    """Return the shared ConfirmationTracker."""
+    global _tracker
+    if _tracker is None:
+        _tracker = ConfirmationTracker()
+    return _tracker
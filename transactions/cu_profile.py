@@ -0,0 +1,153 @@
+import os, asyncio, logging
+from collections import deque
+from typing import Deque, Dict, Optional, Set
+from dotenv import load_dotenv
+from constants import SOL_MINT
+from helpers.metrics import count
+from helpers.snapshot_file import SnapshotFile
+from transactions.rpc_client import rpc_call
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+CACHE_DIR        = os.getenv("CACHE_DIR", ".cache")
+CU_PROFILE_FILE  = os.path.join(CACHE_DIR, "cu_profiles.json")
+CU_PROFILES      = os.getenv("CU_PROFILES", "1") == "1"
+CU_HEADROOM      = float(os.getenv("CU_HEADROOM", "0.15"))   # added on top of the largest recent sample
+CU_MIN_SAMPLES   = int(os.getenv("CU_MIN_SAMPLES", "3"))     # landed swaps before a route is trusted
+CU_SAMPLES       = 20       # recent samples kept per route
+# per setup instruction (ATA creation), kept outside the learned profile: the
+# low figure is taken off a sample, the high one added to a limit, so the
+# spread between Token and Token-2022 ATAs can only make a limit looser
+CU_SETUP_LEARN   = 20_000
+CU_SETUP_UNITS   = 30_000
+CU_MAX_LIMIT     = 1_400_000
+FLUSH_DELAY      = 5        # seconds between disk writes
+LEARN_DELAY      = 2.0      # seconds after confirmation before getTransaction
+LEARN_RETRIES    = 3
+
+
+def route_key(quote: Dict) -> str:
+    """Route shape: the AMM sequence plus the direction (SOL in / SOL out / token-token)."""
+    labels = [step["swapInfo"].get("label") or step["swapInfo"]["ammKey"] for step in quote.get("routePlan") or []]
+    if quote.get("inputMint") == SOL_MINT:
+        direction = "buy"
+    elif quote.get("outputMint") == SOL_MINT:
+        direction = "sell"
+    else:
+        direction = "swap"
+    return f"{direction}:{'>'.join(labels)}"
+
+
+class CuProfiles:
+    """
+    Compute units actually used per route shape, learned from the
+    unitsConsumed of landed swaps (getTransaction, in the background).
+    Once a route has CU_MIN_SAMPLES, swaps on it skip Jupiter's
+    dynamicComputeUnitLimit simulation and get a tight limit: the largest
+    recent sample plus CU_HEADROOM, plus a fixed allowance per setup
+    instruction. A swap that runs out of compute resets its route.
+    Mirrored to a JSON file so it survives restarts.
+    """
+
+    def __init__(self, path: str = CU_PROFILE_FILE, enabled: bool = CU_PROFILES):
+        self.path = path
+        self.enabled = enabled
+        self._samples: Dict[str, Deque[int]] = {}
+        self._loaded = False
+        self._file = SnapshotFile(path, self._snapshot, FLUSH_DELAY, "cu profile")
+        self._learning: Set[asyncio.Task] = set()
+
+    def _load(self) -> None:
+        self._loaded = True
+        for key, samples in (self._file.load() or {}).items():
+            self._samples[key] = deque(samples, maxlen=CU_SAMPLES)
+
+    def _snapshot(self) -> dict:
+        return {k: list(v) for k, v in self._samples.items()}
+
+    # --- reads ----------------------------------------------------------
+
+    def units(self, key: str) -> Optional[int]:
+        """Learned limit for the swap itself (no setup allowance), or None if not known yet."""
+        if not self.enabled:
+            return None
+        if not self._loaded:
+            self._load()
+        samples = self._samples.get(key)
+        if not samples or len(samples) < CU_MIN_SAMPLES:
+            return None
+        return min(int(max(samples) * (1 + CU_HEADROOM)), CU_MAX_LIMIT)
+
+    def known(self, quote: Dict) -> bool:
+        return self.units(route_key(quote)) is not None
+
+    def limit_for(self, swap_resp: Dict) -> Optional[int]:
+        units = self.units(swap_resp.get("routeKey") or "")
+        if units is None:
+            return None
+        return min(units + CU_SETUP_UNITS * len(swap_resp.get("setupInstructions") or []), CU_MAX_LIMIT)
+
+    # --- learning -------------------------------------------------------
+
+    def record(self, key: str, units: int) -> None:
+        if not self._loaded:
+            self._load()
+        self._samples.setdefault(key, deque(maxlen=CU_SAMPLES)).append(int(units))
+        self._file.schedule()
+
+    def reset(self, key: str) -> None:
+        if self._samples.pop(key, None) is not None:
+            self._file.schedule()
+
+    def learn_later(self, signature: str, swap_resp: Dict, limit: Optional[int] = None) -> None:
+        """Fetch the landed swap's unitsConsumed in the background and add it to its route."""
+        key = swap_resp.get("routeKey")
+        if not self.enabled or not key:
+            return
+        setups = len(swap_resp.get("setupInstructions") or [])
+        task = asyncio.create_task(self._learn(signature, key, setups, limit))
+        self._learning.add(task)
+        task.add_done_callback(self._learning.discard)
+
+    async def _learn(self, signature: str, key: str, setups: int, limit: Optional[int]) -> None:
+        for attempt in range(LEARN_RETRIES):
+            await asyncio.sleep(LEARN_DELAY * (attempt + 1))
+            try:
+                tx = await rpc_call("getTransaction", [
+                    signature,
+                    {"encoding": "json", "commitment": "confirmed", "maxSupportedTransactionVersion": 0},
+                ])
+            except Exception as e:
+                logger.debug("getTransaction %s failed: %s", signature, e)
+                continue
+            if not tx:
+                continue   # not indexed yet
+            meta = tx.get("meta") or {}
+            consumed = meta.get("computeUnitsConsumed")
+            if consumed is None:
+                return
+            if meta.get("err"):
+                if limit is not None and consumed >= limit:
+                    # ran out of compute under our limit: relearn this route
+                    count("cu_profile", "exceeded")
+                    self.reset(key)
+                return
+            self.record(key, max(consumed - CU_SETUP_LEARN * setups, 0))
+            count("cu_profile", "learned")
+            return
+        count("cu_profile", "missed")
+
+    async def join(self) -> None:
+        while self._learning:
+            await asyncio.gather(*list(self._learning), return_exceptions=True)
+
+
+_profiles: Optional[CuProfiles] = None
+
+def get_cu_profiles() -> CuProfiles:
+    """Return the shared per-route compute unit profiles."""
+    global _profiles
+    if _profiles is None:
+        _profiles = CuProfiles()
+    return _profiles
@@ -0,0 +1,104 @@
+import os, time, asyncio, logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+from dotenv import load_dotenv
+from helpers.metrics import observe, count
+from transactions.scored_endpoint import consume
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SWAP_QUEUE_DEPTH    = int(os.getenv("SWAP_QUEUE_DEPTH", "3"))      # waiting swaps per wallet
+SWAP_MAX_CONCURRENT = int(os.getenv("SWAP_MAX_CONCURRENT", "32"))  # swaps in flight across wallets
+
+Job = Callable[[], Awaitable[Any]]
+
+
+class ExecutorBusy(Exception):
+    """The wallet already has SWAP_QUEUE_DEPTH swaps waiting."""
+
+
+class _Lane:
+    def __init__(self, depth: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=depth)
+        self.worker: Optional[asyncio.Task] = None
+        self.running = 0
+
+
+class SwapExecutor:
+    """
+    Run swaps as background jobs. Each wallet gets one lane: its swaps run
+    one at a time in submission order (so balances and blockhashes never
+    race), while different wallets run in parallel up to max_concurrent.
+    """
+
+    def __init__(self, depth: int = SWAP_QUEUE_DEPTH, max_concurrent: int = SWAP_MAX_CONCURRENT):
+        self.depth = depth
+        self.max_concurrent = max_concurrent
+        self._lanes: Dict[str, _Lane] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def pending(self, wallet: str) -> int:
+        """Swaps queued or running for `wallet`."""
+        lane = self._lanes.get(wallet)
+        return lane.queue.qsize() + lane.running if lane else 0
+
+    def submit(self, wallet: str, job: Job) -> asyncio.Future:
+        """
+        Queue `job` on the wallet's lane and return a future for its result.
+        Raises ExecutorBusy instead of queueing past the depth limit.
+        """
+        lane = self._lanes.get(wallet)
+        if lane is None:
+            lane = self._lanes[wallet] = _Lane(self.depth)
+        fut = asyncio.get_running_loop().create_future()
+        fut.add_done_callback(consume)  # callers usually fire and forget; the worker logs failures
+        try:
+            lane.queue.put_nowait((job, fut, time.monotonic()))
+        except asyncio.QueueFull:
+            count("swap_queue", "rejected")
+            raise ExecutorBusy(f"{self.pending(wallet)} swaps already pending for this wallet")
+        count("swap_queue", "accepted")
+        if lane.worker is None or lane.worker.done():
+            lane.worker = asyncio.create_task(self._drain(wallet, lane))
+        return fut
+
+    async def _drain(self, wallet: str, lane: _Lane) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        while not lane.queue.empty():
+            job, fut, queued_at = lane.queue.get_nowait()
+            if fut.cancelled():
+                continue   # its submitter gave up while it was queued
+            lane.running = 1
+            try:
+                async with self._slots:
+                    observe("swap_queue", (time.monotonic() - queued_at) * 1000)
+                    result = await job()
+            except Exception as e:
+                logger.exception("swap job for %s failed", wallet)
+                if not fut.done():
+                    fut.set_exception(e)
+            else:
+                if not fut.done():
+                    fut.set_result(result)
+            finally:
+                lane.running = 0
+        # nothing awaits between the empty check and here, so no submit can slip in
+        if self._lanes.get(wallet) is lane:
+            del self._lanes[wallet]
+
+    async def join(self) -> None:
+        """Wait until every queued swap has finished."""
+        while self._lanes:
+            workers = [lane.worker for lane in self._lanes.values() if lane.worker]
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+_executor: Optional[SwapExecutor] = None
+
+def get_swap_executor() -> SwapExecutor:
+    """Return the shared SwapExecutor."""
+    global _executor
+    if _executor is None:
+        _executor = SwapExecutor()
+    return _executor
@@ -0,0 +1,251 @@
+import os, time, asyncio, logging
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from constants import LAMPORTS_PER_SOL
+from helpers.client_session import get_session
+from helpers.metrics import span, count
+from transactions.rpc_client import rpc_call, rpc_batch
+from transactions.sign_jupiter_swap_instructions import set_compute_budget
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+JITO_TIP_FLOOR_URL   = os.getenv("JITO_TIP_FLOOR_URL", "https://bundles.jito.wtf/api/v1/bundles/tip_floor")
+FEE_TIER             = os.getenv("FEE_TIER", "p50")                        # fixed | p50 | p75 | p95
+FEE_SAMPLE_INTERVAL  = float(os.getenv("FEE_SAMPLE_INTERVAL", "10"))       # seconds between samples
+FEE_MAX_AGE          = float(os.getenv("FEE_MAX_AGE", "60"))               # older estimates fall back to fixed
+FEE_MAX_TIP_LAMPORTS = int(os.getenv("FEE_MAX_TIP_LAMPORTS", "5000000"))   # 0.005 SOL
+FEE_MAX_CU_PRICE     = int(os.getenv("FEE_MAX_CU_PRICE", "1000000"))       # micro-lamports per CU
+FEE_WINDOW           = 600   # samples kept per window
+FEE_ACCOUNT_SETS     = 32    # account sets sampled besides the global one
+MAX_FEE_ACCOUNTS     = 128   # getRecentPrioritizationFees limit
+
+TIERS = {"p50": 50, "p75": 75, "p95": 95}
+FIXED = "fixed"
+
+# tip_floor field per tier (values in SOL)
+_TIP_FLOOR_FIELDS = {
+    "p50": "landed_tips_50th_percentile",
+    "p75": "landed_tips_75th_percentile",
+    "p95": "landed_tips_95th_percentile",
+}
+
+AccountSet = Tuple[str, ...]
+
+
+class RollingWindow:
+    """The last `size` samples, with percentiles over them."""
+
+    def __init__(self, size: int = FEE_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.updated = 0.0   # monotonic time of the last add
+
+    def extend(self, values: Iterable[float]) -> None:
+        self.samples.extend(values)
+        self.updated = time.monotonic()
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    @property
+    def age(self) -> Optional[float]:
+        return time.monotonic() - self.updated if self.updated else None
+
+
+class FeeEstimator:
+    """
+    Background sampler for priority fees and Jito tips.
+    Every FEE_SAMPLE_INTERVAL it sends one RPC batch of
+    getRecentPrioritizationFees (globally and for each recently swapped
+    account set) and reads Jito's tip floor. Each source keeps a rolling
+    window, and tiers (p50/p75/p95) are read from them. Estimates older than
+    FEE_MAX_AGE return None so callers fall back to their fixed values.
+    """
+
+    def __init__(self, interval: float = FEE_SAMPLE_INTERVAL, max_age: float = FEE_MAX_AGE):
+        self.interval = interval
+        self.max_age = max_age
+        self.global_fees = RollingWindow()
+        self.account_fees: "OrderedDict[AccountSet, RollingWindow]" = OrderedDict()
+        self.tips: Dict[str, RollingWindow] = {tier: RollingWindow(FEE_WINDOW // 10) for tier in TIERS}
+        self.last_sample_ms: Optional[float] = None
+        self._last_slot: Dict[Optional[AccountSet], int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    # --- reads ----------------------------------------------------------
+
+    def _fresh(self, window: RollingWindow) -> bool:
+        return window.age is not None and window.age <= self.max_age
+
+    def tip_lamports(self, tier: str) -> Optional[int]:
+        """Jito tip for `tier`, or None when unknown or stale."""
+        window = self.tips.get(tier)
+        if window is None or not self._fresh(window):
+            return None
+        # median of the recent tip-floor readings for that percentile
+        return min(int(window.percentile(50)), FEE_MAX_TIP_LAMPORTS)
+
+    def cu_price(self, tier: str, accounts: Optional[Iterable[str]] = None) -> Optional[int]:
+        """Compute-unit price (micro-lamports) for `tier`, from the account set's window if it has one."""
+        pct = TIERS.get(tier)
+        if pct is None:
+            return None
+        window = None
+        if accounts is not None:
+            window = self.account_fees.get(self._key(accounts))
+        if window is None or not self._fresh(window) or not window.samples:
+            window = self.global_fees
+        if not self._fresh(window):
+            return None
+        return min(int(window.percentile(pct)), FEE_MAX_CU_PRICE)
+
+    def staleness(self) -> Dict[str, Optional[float]]:
+        """Seconds since each source last sampled successfully."""
+        return {
+            "priority_fees": self.global_fees.age,
+            "jito_tips": self.tips["p50"].age,
+        }
+
+    # --- sampling -------------------------------------------------------
+
+    @staticmethod
+    def _key(accounts: Iterable[str]) -> AccountSet:
+        return tuple(sorted(set(accounts)))[:MAX_FEE_ACCOUNTS]
+
+    def watch(self, accounts: Iterable[str]) -> None:
+        """Sample this account set too (e.g. a swap's writable accounts)."""
+        key = self._key(accounts)
+        if not key:
+            return
+        if key in self.account_fees:
+            self.account_fees.move_to_end(key)
+            return
+        self.account_fees[key] = RollingWindow()
+        while len(self.account_fees) > FEE_ACCOUNT_SETS:
+            evicted, _ = self.account_fees.popitem(last=False)
+            self._last_slot.pop(evicted, None)
+
+    def _add_fees(self, key: Optional[AccountSet], window: RollingWindow, result: List[Dict]) -> None:
+        # the node returns the last ~150 slots each time; only keep slots not seen yet
+        last = self._last_slot.get(key, -1)
+        fresh = [r for r in result if r["slot"] > last]
+        if result:
+            self._last_slot[key] = max(r["slot"] for r in result)
+        window.extend(r["prioritizationFee"] for r in fresh)
+
+    async def _sample_fees(self) -> None:
+        keys = list(self.account_fees)
+        with rpc_batch():
+            global_call = rpc_call("getRecentPrioritizationFees", [])
+            calls = [rpc_call("getRecentPrioritizationFees", [list(key)]) for key in keys]
+        self._add_fees(None, self.global_fees, await global_call)
+        for key, call in zip(keys, calls):
+            try:
+                result = await call
+            except Exception as e:
+                logger.debug("priority fees for %d accounts failed: %s", len(key), e)
+                continue
+            window = self.account_fees.get(key)
+            if window is not None:
+                self._add_fees(key, window, result)
+
+    async def _sample_tips(self) -> None:
+        session = await get_session()
+        async with session.get(JITO_TIP_FLOOR_URL) as resp:
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+        floor = data[0] if isinstance(data, list) else data
+        for tier, field in _TIP_FLOOR_FIELDS.items():
+            if floor.get(field) is not None:
+                self.tips[tier].extend([float(floor[field]) * LAMPORTS_PER_SOL])
+
+    async def sample(self) -> None:
+        started = time.monotonic()
+        with span("fee_sample"):
+            results = await asyncio.gather(self._sample_fees(), self._sample_tips(), return_exceptions=True)
+        self.last_sample_ms = (time.monotonic() - started) * 1000
+        for source, result in zip(("priority_fees", "jito_tips"), results):
+            if isinstance(result, Exception):
+                count("fee_sample", f"{source}_error")
+                logger.warning("fee sample (%s) failed: %s", source, result)
+            else:
+                count("fee_sample", source)
+
+    async def _loop(self) -> None:
+        while True:
+            await self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+def writable_accounts(swap_resp: Dict) -> List[str]:
+    """Writable, non-signer accounts of a Jupiter swap instruction (the ones fees compete on)."""
+    return [
+        a["pubkey"] for a in swap_resp["swapInstruction"]["accounts"]
+        if a["isWritable"] and not a["isSigner"]
+    ]
+
+
+_estimator: Optional[FeeEstimator] = None
+
+def get_fee_estimator() -> FeeEstimator:
+    """Return the shared estimator, starting its sampler on first use."""
+    global _estimator
+    if _estimator is None:
+        _estimator = FeeEstimator()
+    _estimator.start()
+    return _estimator
+
+
+async def stop_fee_estimator() -> None:
+    global _estimator
+    if _estimator is not None:
+        await _estimator.stop()
+        _estimator = None
+
+
+def tip_for(task: Dict, side_tip_key: str) -> int:
+    """
+    Jito tip (lamports) for a swap task: the estimator's value for the
+    task's fee tier, or the task's fixed tip when the tier is 'fixed' or
+    the estimate is unavailable.
+    """
+    fixed = int(float(task.get(side_tip_key) or 0) * LAMPORTS_PER_SOL)
+    tier = task.get('fee_tier', FEE_TIER)
+    if tier == FIXED:
+        return fixed
+    estimate = get_fee_estimator().tip_lamports(tier)
+    if estimate is None:
+        count("fee_tier", "fallback")
+        return fixed
+    return estimate
+
+
+def apply_priority_fee(swap_resp: Dict, task: Dict) -> Optional[int]:
+    """
+    Set the compute-unit price of a Jupiter swap to the task tier's estimate
+    for its writable accounts (and start sampling that account set).
+    Returns the price used, or None when it was left as Jupiter built it.
+    """
+    tier = task.get('fee_tier', FEE_TIER)
+    if tier == FIXED:
+        return None
+    estimator = get_fee_estimator()
+    accounts = writable_accounts(swap_resp)
+    estimator.watch(accounts)
+    price = estimator.cu_price(tier, accounts)
+    if price:
+        set_compute_budget(swap_resp, unit_price=price)
+    return price
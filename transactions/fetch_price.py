@@ -1,52 +1,200 @@
-import sys, os, time, logging
+import sys, os, time, asyncio, logging
 root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if root not in sys.path:
     sys.path.insert(0, root)
+from typing import Dict, Iterable, List, Optional, Tuple
 from dotenv import load_dotenv
 from helpers.client_session import get_session
+from transactions.rpc_client import rpc_call
+from helpers.metrics import observe, count
+from transactions.pool_prices import get_price_engine, local_price_usdc
 
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-RPC_URL           = os.environ["RPC_URL"]
-JUPITER_PRICE_URL = "https://lite-api.jup.ag/price/v2"
+RPC_URL           = os.getenv("RPC_URL")
+JUPITER_PRICE_URL = os.getenv("JUPITER_PRICE_URL", "https://lite-api.jup.ag/price/v2")
 _USDC_address        = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
 _WSOL_address        = "So11111111111111111111111111111111111111112"
 
-async def fetch_price_usdc(address: str) -> float:
+PRICE_TTL          = float(os.getenv("PRICE_TTL", "2"))  # seconds a cached price may be served
+PRICE_BATCH_WINDOW = 0.005
+PRICE_MAX_IDS      = 100  # Jupiter price API ids= limit
+
+
+class PriceService:
+    """
+    Shared price lookups: concurrent requests for a mint collapse into one
+    in-flight fetch, ids requested within a short window go out together
+    (up to `max_ids` per call), results are kept for `ttl` seconds.
+    """
+
+    def __init__(self, fetch_many, ttl: float = PRICE_TTL, window: float = PRICE_BATCH_WINDOW, max_ids: int = PRICE_MAX_IDS):
+        self._fetch_many = fetch_many   # async (ids) -> {id: price}
+        self.ttl = ttl
+        self.window = window
+        self.max_ids = max_ids
+        self._cache: Dict[str, Tuple[float, float]] = {}  # id -> (price, fetched_at)
+        self._pending: Dict[str, asyncio.Future] = {}     # queued, not yet sent
+        self._inflight: Dict[str, asyncio.Future] = {}    # sent, awaiting reply
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def cached(self, address: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Cached price if younger than `max_age` (default ttl), else None."""
+        hit = self._cache.get(address)
+        if hit is None:
+            return None
+        price, fetched_at = hit
+        if time.monotonic() - fetched_at > (self.ttl if max_age is None else max_age):
+            return None
+        return price
+
+    async def get(self, address: str, max_age: Optional[float] = None, fresh: bool = False) -> float:
+        """
+        Price for one id. `max_age` bounds staleness of a cached value;
+        `fresh=True` skips the cache and any fetch already in flight.
+        """
+        if not fresh:
+            price = self.cached(address, max_age)
+            if price is not None:
+                return price
+        fut = self._pending.get(address)
+        if fut is None and not fresh:
+            fut = self._inflight.get(address)
+        if fut is None:
+            fut = self._enqueue(address)
+        return await asyncio.shield(fut)
+
+    async def get_many(self, addresses: Iterable[str], max_age: Optional[float] = None, fresh: bool = False) -> Dict[str, Optional[float]]:
+        """Prices for many ids in as few calls as possible; missing ones map to None."""
+        addresses = list(dict.fromkeys(addresses))
+        results = await asyncio.gather(
+            *(self.get(a, max_age=max_age, fresh=fresh) for a in addresses),
+            return_exceptions=True,
+        )
+        return {a: (None if isinstance(r, Exception) else r) for a, r in zip(addresses, results)}
+
+    def _enqueue(self, address: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = self._pending[address] = loop.create_future()
+        if len(self._pending) >= self.max_ids:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        ids = list(pending)
+        for i in range(0, len(ids), self.max_ids):
+            chunk = {a: pending[a] for a in ids[i:i + self.max_ids]}
+            self._inflight.update(chunk)
+            asyncio.create_task(self._run(chunk))
+
+    async def _run(self, chunk: Dict[str, asyncio.Future]) -> None:
+        try:
+            prices = await self._fetch_many(list(chunk))
+        except Exception as e:
+            prices, error = {}, e
+        else:
+            error = None
+        now = time.monotonic()
+        for address, fut in chunk.items():
+            if self._inflight.get(address) is fut:
+                del self._inflight[address]
+            if fut.done():
+                continue
+            price = prices.get(address)
+            if price is not None:
+                self._cache[address] = (price, now)
+                fut.set_result(price)
+            else:
+                fut.set_exception(error or ValueError("no direct price data"))
+
+
+async def _fetch_usdc_prices(addresses: List[str]) -> Dict[str, float]:
     start = time.monotonic()
     session = await get_session()
-    resp = await session.request("GET", JUPITER_PRICE_URL, params={"ids": address})
+    resp = await session.request("GET", JUPITER_PRICE_URL, params={"ids": ",".join(addresses)})
     j = await resp.json()
     elapsed = (time.monotonic() - start) * 1000
+    observe("price_usdc", elapsed)
 
-    data = j.get("data", {})
-    token = data.get(address)
-    if not token or "price" not in token:
-        raise ValueError("no direct price data")
+    data = j.get("data") or {}
+    prices = {}
+    for address in addresses:
+        token = data.get(address)
+        if token and token.get("price") is not None:
+            prices[address] = float(token["price"])
+    return prices
 
-    price = float(token["price"])
-    return price
-
-async def fetch_price_sol(address: str) -> float:
+async def _fetch_quote_price(addresses: List[str]) -> Dict[str, float]:
     qty = 10**6
     from transactions.jupiter_jito import get_quote_jupiter
 
+    address = addresses[0]
     start = time.monotonic()
     quote = await get_quote_jupiter(address, _USDC_address, qty)
     elapsed = (time.monotonic() - start) * 1000
+    observe("price_sol", elapsed)
 
     route = quote.get("routePlan") or []
     if route and "outAmount" in route[0]['swapInfo']:
         out = int(route[0]['swapInfo']["outAmount"])
         price = out / 10**6
-        return price
+        return {address: price}
     raise ValueError("no swap route for fallback")
 
-async def fetch_price(address: str) -> float:
+
+usdc_prices  = PriceService(_fetch_usdc_prices)
+# quote-derived prices can't be batched, but still coalesce and cache
+quote_prices = PriceService(_fetch_quote_price, max_ids=1)
+
+
+# Prices below come from the token's live pool reserves when the pool
+# engine has it subscribed (always current, so `fresh` needs no fetch);
+# otherwise from Jupiter, while the pool is resolved for next time.
+
+def cached_price_usdc(address: str, max_age: Optional[float] = None) -> Optional[float]:
+    """Local pool price, else a cached Jupiter price; never touches the network."""
+    price = local_price_usdc(address)
+    return price if price is not None else usdc_prices.cached(address, max_age=max_age)
+
+async def fetch_price_usdc(address: str, max_age: Optional[float] = None, fresh: bool = False) -> float:
+    price = local_price_usdc(address)
+    if price is not None:
+        count("price_read", "pool")
+        return price
+    count("price_read", "http")
+    return await usdc_prices.get(address, max_age=max_age, fresh=fresh)
+
+async def fetch_prices_usdc(addresses: Iterable[str], max_age: Optional[float] = None, fresh: bool = False) -> Dict[str, Optional[float]]:
+    prices = {a: local_price_usdc(a) for a in dict.fromkeys(addresses)}
+    remote = [a for a, p in prices.items() if p is None]
+    if len(remote) < len(prices):
+        count("price_read", "pool", len(prices) - len(remote))
+    if remote:
+        count("price_read", "http", len(remote))
+        prices.update(await usdc_prices.get_many(remote, max_age=max_age, fresh=fresh))
+    return prices
+
+async def fetch_price_sol(address: str, max_age: Optional[float] = None, fresh: bool = False) -> float:
+    """USDC value of 10^6 raw units of the token (a whole token at 6 decimals)."""
+    price = local_price_usdc(address)
+    decimals = get_price_engine().decimals(address)
+    if price is not None and decimals is not None:
+        count("price_read", "pool")
+        return price * 10**6 / 10**decimals
+    count("price_read", "http")
+    return await quote_prices.get(address, max_age=max_age, fresh=fresh)
+
+async def fetch_price(address: str, max_age: Optional[float] = None, fresh: bool = False) -> float:
     try:
-        return await fetch_price_usdc(address)
+        return await fetch_price_usdc(address, max_age=max_age, fresh=fresh)
     except Exception as e:
         print(f"⚠️ direct price failed: {e}")
     return 0.0
@@ -56,25 +204,11 @@ async def fetch_supply(address: str) -> float:
     supply = 0.0
     try:
         if address == _WSOL_address:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getSupply",
-                "params": [{"commitment": "finalized"}]
-            }
+            result = await rpc_call("getSupply", [{"commitment": "finalized"}])
         else:
-            payload = {
-                "jsonrpc": "2.0",
-                "id": 1,
-                "method": "getTokenSupply",
-                "params": [address]
-            }
-
-        session = await get_session()
-        resp = await session.post(RPC_URL, json=payload)
-        j = await resp.json()
-
-        val = j["result"]["value"]
+            result = await rpc_call("getTokenSupply", [address])
+
+        val = result["value"]
         if address == _WSOL_address:
             lamports = int(val["amount"])
             supply = lamports / 10**9
@@ -86,5 +220,6 @@ async def fetch_supply(address: str) -> float:
         supply = 0.0
 
     elapsed = (time.monotonic() - start) * 1000
+    observe("supply", elapsed)
     return supply
 
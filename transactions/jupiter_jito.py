@@ -2,16 +2,17 @@ import base64, os, sys
 root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if root not in sys.path:
     sys.path.insert(0, root)
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 
 from transactions.account import get_user_pubkey
 from solders.instruction import Instruction
 from helpers.client_session import get_session
+from transactions.cu_profile import get_cu_profiles, route_key
 
 load_dotenv()
 
-JUPITER_BASE_URL = "https://lite-api.jup.ag/swap"
+JUPITER_BASE_URL = os.getenv("JUPITER_BASE_URL", "https://lite-api.jup.ag/swap")
 API_VERSION = "v1"
 
 async def get_quote_jupiter(
@@ -37,16 +38,20 @@ async def get_quote_jupiter(
 
 async def swap_jupiter(
     quote_json: Dict,
-    tip_lamports: int = 0
+    tip_lamports: int = 0,
+    user_pubkey: Optional[str] = None
 ) -> Dict[str, List[Dict]]:
     """
     Fetch swap-instructions from Jupiter, ensuring ATAs exist for both mints.
+    Built for the default wallet unless `user_pubkey` is given. Routes with
+    a learned compute profile skip Jupiter's compute-unit simulation; the
+    limit is set when the transaction is built.
     """
     payload = {
         "quoteResponse": quote_json,
-        "userPublicKey": str(get_user_pubkey()),
+        "userPublicKey": user_pubkey or str(get_user_pubkey()),
         "wrapAndUnwrapSol": True,
-        "dynamicComputeUnitLimit": True,
+        "dynamicComputeUnitLimit": not get_cu_profiles().known(quote_json),
         "prioritizationFeeLamports": {"jitoTipLamports": tip_lamports}
     }
     session = await get_session()
@@ -67,7 +72,9 @@ async def swap_jupiter(
         "cleanupInstruction":        data.get("cleanupInstruction"),
         "addressLookupTableAddresses": data.get("addressLookupTableAddresses", []),
         "blockhashWithMetadata":     data["blockhashWithMetadata"],
-        "inputMint":                 quote_json["inputMint"]
+        "inputMint":                 quote_json["inputMint"],
+        "routePlan":                 quote_json.get("routePlan", []),
+        "routeKey":                  route_key(quote_json),
     }
 
 def solders_ix_to_jupiter(ix: Instruction) -> Dict:
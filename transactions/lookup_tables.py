@@ -0,0 +1,120 @@
+import os, base64, asyncio, logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from dotenv import load_dotenv
+from solders.pubkey import Pubkey
+from solders.address_lookup_table_account import AddressLookupTable, AddressLookupTableAccount
+from transactions.rpc_client import rpc_call, rpc_batch
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+ALT_CACHE_SIZE    = int(os.getenv("ALT_CACHE_SIZE", "512"))
+ALT_MAX_AGE_SLOTS = int(os.getenv("ALT_MAX_AGE_SLOTS", "9000"))  # ~1h; tables only grow, refresh now and then
+ALTS_PER_CALL     = 100
+_NOT_DEACTIVATED  = 2**64 - 1
+
+
+class LookupTableCache:
+    """
+    Decoded address lookup tables keyed by table address (LRU),
+    each stamped with the slot it was read at. Entries older than
+    ALT_MAX_AGE_SLOTS behind the newest slot seen are refetched.
+    """
+
+    def __init__(self, capacity: int = ALT_CACHE_SIZE, max_age_slots: int = ALT_MAX_AGE_SLOTS):
+        self.capacity = capacity
+        self.max_age_slots = max_age_slots
+        self.latest_slot = 0
+        self._entries: "OrderedDict[str, Tuple[AddressLookupTableAccount, int]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def note_slot(self, slot: int) -> None:
+        if slot > self.latest_slot:
+            self.latest_slot = slot
+
+    def _get(self, address: str) -> Optional[AddressLookupTableAccount]:
+        hit = self._entries.get(address)
+        if hit is None:
+            return None
+        table, slot = hit
+        if self.latest_slot - slot > self.max_age_slots:
+            del self._entries[address]
+            return None
+        self._entries.move_to_end(address)
+        return table
+
+    def _put(self, address: str, table: AddressLookupTableAccount, slot: int) -> None:
+        self._entries[address] = (table, slot)
+        self._entries.move_to_end(address)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    async def resolve(self, addresses: Iterable[str]) -> List[AddressLookupTableAccount]:
+        """
+        Return the lookup table accounts for `addresses`, in order.
+        Cached ones are served from memory, the rest fetched with batched
+        getMultipleAccounts. Missing or deactivated tables are skipped.
+        """
+        addresses = list(dict.fromkeys(addresses))
+        found: Dict[str, Optional[AddressLookupTableAccount]] = {}
+        waits: Dict[str, asyncio.Future] = {}
+        missing = []
+        for address in addresses:
+            table = self._get(address)
+            if table is not None:
+                found[address] = table
+            elif address in self._inflight:
+                waits[address] = self._inflight[address]
+            else:
+                missing.append(address)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            for address in missing:
+                self._inflight[address] = waits[address] = loop.create_future()
+            try:
+                await self._fetch(missing)
+            finally:
+                for address in missing:
+                    fut = self._inflight.pop(address)
+                    if not fut.done():
+                        fut.set_result(None)
+
+        for address, fut in waits.items():
+            found[address] = await asyncio.shield(fut)
+        return [found[a] for a in addresses if found.get(a) is not None]
+
+    async def _fetch(self, addresses: List[str]) -> None:
+        chunks = [addresses[i:i + ALTS_PER_CALL] for i in range(0, len(addresses), ALTS_PER_CALL)]
+        with rpc_batch():
+            calls = [rpc_call("getMultipleAccounts", [chunk, {"encoding": "base64"}]) for chunk in chunks]
+        for chunk, call in zip(chunks, calls):
+            try:
+                result = await call
+            except Exception as e:
+                logger.warning("lookup table fetch failed: %s", e)
+                continue
+            slot = result["context"]["slot"]
+            self.note_slot(slot)
+            for address, acct in zip(chunk, result.get("value") or []):
+                table = _decode(address, acct)
+                if table is not None:
+                    self._put(address, table, slot)
+                self._inflight[address].set_result(table)
+
+
+def _decode(address: str, acct) -> Optional[AddressLookupTableAccount]:
+    if not acct or not acct.get("data"):
+        return None
+    try:
+        table = AddressLookupTable.deserialize(base64.b64decode(acct["data"][0]))
+    except Exception as e:
+        logger.debug("lookup table %s undecodable: %s", address, e)
+        return None
+    if table.meta.deactivation_slot != _NOT_DEACTIVATED:
+        return None
+    return AddressLookupTableAccount(key=Pubkey.from_string(address), addresses=list(table.addresses))
+
+
+lookup_tables = LookupTableCache()
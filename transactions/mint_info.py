@@ -0,0 +1,231 @@
+import os, time, base64, asyncio, logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+from dotenv import load_dotenv
+from solders.pubkey import Pubkey
+from construct import Struct, Int8ul, Bytes, PaddedString
+from helpers.snapshot_file import SnapshotFile
+from transactions.rpc_client import rpc_call, rpc_batch
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+CACHE_DIR        = os.getenv("CACHE_DIR", ".cache")
+MINT_CACHE_FILE  = os.path.join(CACHE_DIR, "mint_info.json")
+MINT_CACHE_SIZE  = int(os.getenv("MINT_CACHE_SIZE", "5000"))
+NEGATIVE_TTL     = 600   # seconds an invalid address stays rejected
+MISSING_TTL      = 5     # seconds a not-yet-visible account stays rejected (fresh launches)
+FLUSH_DELAY      = 5     # seconds between disk writes
+MINTS_PER_CALL   = 50    # mint + metadata PDA = 2 accounts each, 100 max per call
+
+TOKEN_METADATA_PROGRAM = Pubkey.from_string("metaqbxxUerdq28cj1RbAWkYQm3ybzjb6a8bt518x1s")
+TOKEN_PROGRAM          = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+TOKEN_2022_PROGRAM     = "TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb"
+
+# Construct layout to parse name & symbol
+_MD_LAYOUT = Struct(
+    "key" / Int8ul,
+    "update_authority" / Bytes(32),
+    "mint" / Bytes(32),
+    "name" / PaddedString(32, "utf8"),
+    "symbol" / PaddedString(10, "utf8"),
+)
+
+# SPL mint base layout (shared by Token-2022): decimals sit after authority + supply
+_MINT_DECIMALS_OFFSET = 44
+_MINT_MIN_SIZE        = 82
+
+
+@dataclass
+class MintInfo:
+    mint: str
+    decimals: int
+    token_program: str
+    metadata_pda: str
+    name: Optional[str] = None     # None when the mint has no Metaplex metadata
+    symbol: Optional[str] = None
+
+
+@lru_cache(maxsize=MINT_CACHE_SIZE)
+def metadata_pda(mint_address: str) -> Pubkey:
+    """Metaplex metadata PDA for a mint. Raises ValueError on invalid Base58."""
+    mint_pub = Pubkey.from_string(mint_address)
+    pda, _ = Pubkey.find_program_address(
+        [b"metadata", bytes(TOKEN_METADATA_PROGRAM), bytes(mint_pub)],
+        TOKEN_METADATA_PROGRAM,
+    )
+    return pda
+
+
+def _parse_metadata(raw: bytes):
+    parsed = _MD_LAYOUT.parse(raw)
+    name = parsed.name.rstrip("\x00").strip()
+    sym  = parsed.symbol.rstrip("\x00").strip()
+    return name, sym
+
+
+class MintIndex:
+    """
+    Static per-mint facts (decimals, token program, metadata PDA, name, symbol).
+    LRU in memory, mirrored to a compact JSON file so it survives restarts,
+    plus a short negative cache for addresses that are not mints.
+    """
+
+    def __init__(self, path: str = MINT_CACHE_FILE, capacity: int = MINT_CACHE_SIZE):
+        self.path = path
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, MintInfo]" = OrderedDict()
+        self._negative: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._loaded = False
+        self._file = SnapshotFile(path, self._snapshot, FLUSH_DELAY, "mint cache")
+
+    def _load(self) -> None:
+        self._loaded = True
+        data = self._file.load() or {}
+        for mint, (decimals, program, pda, name, symbol) in data.items():
+            self._entries[mint] = MintInfo(mint, decimals, program, pda, name, symbol)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _snapshot(self) -> dict:
+        return {
+            m: [i.decimals, i.token_program, i.metadata_pda, i.name, i.symbol]
+            for m, i in self._entries.items()
+        }
+
+    def _put(self, info: MintInfo) -> None:
+        self._entries[info.mint] = info
+        self._entries.move_to_end(info.mint)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+        self._file.schedule()
+
+    def _reject(self, mint: str, ttl: float = NEGATIVE_TTL) -> None:
+        self._negative[mint] = time.monotonic() + ttl
+
+    def _is_rejected(self, mint: str) -> bool:
+        expiry = self._negative.get(mint)
+        if expiry is None:
+            return False
+        if expiry < time.monotonic():
+            del self._negative[mint]
+            return False
+        return True
+
+    def peek(self, mint: str) -> Optional[MintInfo]:
+        """Cached info or None; never touches the network."""
+        if not self._loaded:
+            self._load()
+        info = self._entries.get(mint)
+        if info is not None:
+            self._entries.move_to_end(mint)
+        return info
+
+    async def get(self, mint: str) -> MintInfo:
+        """Return MintInfo, raising ValueError for anything that is not a mint."""
+        info = (await self.get_many([mint])).get(mint)
+        if info is None:
+            raise ValueError(f"Invalid mint: {mint}")
+        return info
+
+    async def get_many(self, mints: Iterable[str]) -> Dict[str, Optional[MintInfo]]:
+        """
+        Resolve many mints at once; misses are fetched with batched
+        getMultipleAccounts (mint + metadata PDA per mint). Invalid ones map to None.
+        """
+        out: Dict[str, Optional[MintInfo]] = {}
+        waits: Dict[str, asyncio.Future] = {}
+        missing = []
+        for mint in dict.fromkeys(mints):
+            info = self.peek(mint)
+            if info is not None:
+                out[mint] = info
+            elif self._is_rejected(mint):
+                out[mint] = None
+            elif mint in self._inflight:
+                waits[mint] = self._inflight[mint]
+            else:
+                try:
+                    metadata_pda(mint)
+                except ValueError:
+                    self._reject(mint)
+                    out[mint] = None
+                    continue
+                missing.append(mint)
+
+        if missing:
+            loop = asyncio.get_running_loop()
+            for mint in missing:
+                self._inflight[mint] = waits[mint] = loop.create_future()
+            try:
+                await self._fetch(missing)
+            finally:
+                for mint in missing:
+                    fut = self._inflight.pop(mint)
+                    if not fut.done():
+                        fut.set_exception(RuntimeError(f"mint lookup failed: {mint}"))
+
+        for mint, fut in waits.items():
+            out[mint] = await asyncio.shield(fut)
+        return out
+
+    async def _fetch(self, mints) -> None:
+        chunks = [mints[i:i + MINTS_PER_CALL] for i in range(0, len(mints), MINTS_PER_CALL)]
+        with rpc_batch():
+            calls = [
+                rpc_call("getMultipleAccounts", [
+                    [a for m in chunk for a in (m, str(metadata_pda(m)))],
+                    {"encoding": "base64", "commitment": "confirmed"},
+                ])
+                for chunk in chunks
+            ]
+        for chunk, call in zip(chunks, calls):
+            try:
+                result = await call
+            except Exception as e:
+                for mint in chunk:
+                    self._inflight[mint].set_exception(e)
+                continue
+            values = (result or {}).get("value") or []
+            for i, mint in enumerate(chunk):
+                mint_acct = values[2 * i] if 2 * i < len(values) else None
+                md_acct = values[2 * i + 1] if 2 * i + 1 < len(values) else None
+                info = self._decode(mint, mint_acct, md_acct)
+                if info is None:
+                    # a missing account may just be a mint launched moments ago
+                    self._reject(mint, NEGATIVE_TTL if mint_acct else MISSING_TTL)
+                else:
+                    self._put(info)
+                self._inflight[mint].set_result(info)
+
+    def _decode(self, mint: str, mint_acct, md_acct) -> Optional[MintInfo]:
+        if not mint_acct or mint_acct.get("owner") not in (TOKEN_PROGRAM, TOKEN_2022_PROGRAM):
+            return None
+        raw = base64.b64decode(mint_acct["data"][0])
+        if len(raw) < _MINT_MIN_SIZE:
+            return None
+        info = MintInfo(
+            mint=mint,
+            decimals=raw[_MINT_DECIMALS_OFFSET],
+            token_program=mint_acct["owner"],
+            metadata_pda=str(metadata_pda(mint)),
+        )
+        if md_acct and md_acct.get("data"):
+            try:
+                info.name, info.symbol = _parse_metadata(base64.b64decode(md_acct["data"][0]))
+            except Exception as e:
+                logger.debug("metadata parse failed for %s: %s", mint, e)
+        return info
+
+
+_index: Optional[MintIndex] = None
+
+def get_mint_index() -> MintIndex:
+    """Return the shared MintIndex, loading the disk cache on first use."""
+    global _index
+    if _index is None:
+        _index = MintIndex()
+    return _index
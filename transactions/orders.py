@@ -0,0 +1,238 @@
+import os, time, heapq, asyncio, logging
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from constants import BUY, SELL
+from helpers.metrics import observe, count
+from helpers.snapshot_file import SnapshotFile
+from transactions.fetch_price import fetch_prices_usdc
+from transactions.wallets import get_wallets
+from transactions.executor import get_swap_executor, ExecutorBusy
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+CACHE_DIR           = os.getenv("CACHE_DIR", ".cache")
+ORDERS_FILE         = os.path.join(CACHE_DIR, "orders.json")
+ORDER_POLL_INTERVAL = float(os.getenv("ORDER_POLL_INTERVAL", "2"))  # seconds between price polls
+FLUSH_DELAY         = 0.5   # seconds; short so a fired order is off disk before its swap lands
+
+ABOVE, BELOW = "above", "below"
+
+# kind -> (side, direction the price must cross)
+KINDS = {
+    "tp":         (SELL, ABOVE),
+    "sl":         (SELL, BELOW),
+    "limit_buy":  (BUY,  BELOW),
+    "limit_sell": (SELL, ABOVE),
+}
+
+
+@dataclass
+class TriggerOrder:
+    id: int
+    chat_id: int
+    mint: str
+    kind: str               # key of KINDS
+    trigger: float          # USDC per token
+    task: Dict[str, Any]    # swap task snapshot: side, amount / autosell_pct, slippage, tip, processor
+    created: float = field(default_factory=time.time)
+    status: str = "open"    # open -> triggered -> filled | failed, or cancelled
+
+    @property
+    def side(self) -> str:
+        return KINDS[self.kind][0]
+
+    @property
+    def direction(self) -> str:
+        return KINDS[self.kind][1]
+
+
+class TriggerBook:
+    """
+    Open orders for one mint, indexed by threshold: a min-heap of "fire at
+    or above" triggers and a max-heap of "fire at or below" ones, so a tick
+    only looks at the edge that can cross. Cancelled orders are dropped
+    lazily when they reach the top.
+    """
+
+    def __init__(self):
+        self._above: List[Tuple[float, int]] = []   # (trigger, order id)
+        self._below: List[Tuple[float, int]] = []   # (-trigger, order id)
+
+    def add(self, order: TriggerOrder) -> None:
+        if order.direction == ABOVE:
+            heapq.heappush(self._above, (order.trigger, order.id))
+        else:
+            heapq.heappush(self._below, (-order.trigger, order.id))
+
+    def crossed(self, price: float) -> List[int]:
+        """Pop and return the ids of every order `price` has crossed."""
+        hit = []
+        while self._above and self._above[0][0] <= price:
+            hit.append(heapq.heappop(self._above)[1])
+        while self._below and -self._below[0][0] >= price:
+            hit.append(heapq.heappop(self._below)[1])
+        return hit
+
+
+class OrderEngine:
+    """
+    Take-profit, stop-loss and limit orders.
+    One loop polls the USDC price of every watched mint in a single batched
+    request per ORDER_POLL_INTERVAL, checks each mint's TriggerBook, and
+    hands crossed orders to the wallet's swap lane through `fire`. Open
+    orders are mirrored to ORDERS_FILE and reloaded on start; an order is
+    written off as triggered before its swap starts, so a restart never
+    fires it twice.
+    """
+
+    def __init__(self, path: str = ORDERS_FILE, interval: float = ORDER_POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.orders: Dict[int, TriggerOrder] = {}
+        self._books: Dict[str, TriggerBook] = {}
+        self._open_per_mint: Dict[str, int] = {}
+        self._next_id = 1
+        self._file = SnapshotFile(path, self._snapshot, FLUSH_DELAY, "orders")
+        self._task: Optional[asyncio.Task] = None
+        # async (order, price) -> signature or None; set by start()
+        self.fire: Optional[Callable] = None
+
+    # --- persistence ----------------------------------------------------
+
+    def load(self) -> None:
+        for raw in self._file.load() or []:
+            order = TriggerOrder(**raw)
+            if order.status == "open" and order.kind in KINDS:
+                self._index(order)
+        self._next_id = max(self.orders, default=0) + 1
+
+    def _snapshot(self) -> list:
+        return [asdict(o) for o in self.orders.values() if o.status == "open"]
+
+    # --- book keeping ---------------------------------------------------
+
+    def _index(self, order: TriggerOrder) -> None:
+        self.orders[order.id] = order
+        self._books.setdefault(order.mint, TriggerBook()).add(order)
+        self._open_per_mint[order.mint] = self._open_per_mint.get(order.mint, 0) + 1
+
+    def _close(self, order: TriggerOrder, status: str) -> None:
+        """Mark an open order done; drop its mint's book once nothing is open there."""
+        if order.status != "open":
+            return
+        order.status = status
+        left = self._open_per_mint[order.mint] - 1
+        if left:
+            self._open_per_mint[order.mint] = left
+        else:
+            del self._open_per_mint[order.mint]
+            del self._books[order.mint]
+        if status != "triggered":
+            self.orders.pop(order.id, None)
+        self._file.schedule()
+
+    def add(self, chat_id: int, mint: str, kind: str, trigger: float, task: Dict[str, Any]) -> TriggerOrder:
+        if kind not in KINDS:
+            raise ValueError(f"Unknown order kind {kind!r}")
+        if trigger <= 0:
+            raise ValueError("Trigger price must be positive")
+        order = TriggerOrder(self._next_id, chat_id, mint, kind, trigger, dict(task, side=KINDS[kind][0]))
+        self._next_id += 1
+        self._index(order)
+        self._file.schedule()
+        return order
+
+    def cancel(self, order_id: int, chat_id: Optional[int] = None) -> bool:
+        order = self.orders.get(order_id)
+        if order is None or order.status != "open" or (chat_id is not None and order.chat_id != chat_id):
+            return False
+        self._close(order, "cancelled")
+        return True
+
+    def open_orders(self, chat_id: Optional[int] = None) -> List[TriggerOrder]:
+        return [
+            o for o in self.orders.values()
+            if o.status == "open" and (chat_id is None or o.chat_id == chat_id)
+        ]
+
+    def finish(self, order: TriggerOrder, ok: bool) -> None:
+        """Forget a triggered order once its swap is done."""
+        order.status = "filled" if ok else "failed"
+        self.orders.pop(order.id, None)
+
+    # --- polling --------------------------------------------------------
+
+    async def tick(self) -> int:
+        """Poll prices once and fire every crossed order. Returns how many fired."""
+        if not self._books:
+            return 0
+        started = time.monotonic()
+        prices = await fetch_prices_usdc(list(self._books), max_age=self.interval)
+        observe("orders_tick", (time.monotonic() - started) * 1000)
+        fired = 0
+        for mint, price in prices.items():
+            book = self._books.get(mint)
+            if book is None or not price:
+                continue
+            for order_id in book.crossed(price):
+                order = self.orders.get(order_id)
+                if order is None or order.status != "open":
+                    continue   # cancelled since it was queued
+                if await self._submit(order, price):
+                    fired += 1
+                else:
+                    book.add(order)   # lane full: try again next tick
+        return fired
+
+    async def _submit(self, order: TriggerOrder, price: float) -> bool:
+        wallet = get_wallets().default().address
+
+        async def job():
+            try:
+                self.finish(order, bool(await self.fire(order, price)))
+            except Exception as e:
+                logger.warning("order %s swap failed: %s", order.id, e)
+                self.finish(order, False)
+
+        try:
+            get_swap_executor().submit(wallet, job)
+        except ExecutorBusy:
+            count("orders", "busy")
+            return False
+        count("orders", order.kind)
+        self._close(order, "triggered")
+        return True
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception as e:
+                count("orders", "poll_error")
+                logger.warning("order price poll failed: %s", e)
+            await asyncio.sleep(self.interval)
+
+    def start(self, fire: Callable) -> None:
+        """Load saved orders and start polling; `fire(order, price)` runs the swap."""
+        self.fire = fire
+        if self._task is None:
+            self.load()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self._file.close()
+
+
+_engine: Optional[OrderEngine] = None
+
+def get_order_engine() -> OrderEngine:
+    """Return the shared trigger-order engine."""
+    global _engine
+    if _engine is None:
+        _engine = OrderEngine()
+    return _engine
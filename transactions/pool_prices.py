@@ -0,0 +1,429 @@
+import os, time, base64, struct, asyncio, logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+from solders.pubkey import Pubkey
+from constants import SOL_MINT
+from helpers.ws_hub import get_ws_hub
+from helpers.metrics import count
+from helpers.snapshot_file import SnapshotFile
+from transactions.rpc_client import rpc_call, rpc_batch
+from transactions.mint_info import get_mint_index
+from transactions.pump_fun import PUMP_PROGRAM, bonding_curve_pda, decode_bonding_curve
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+CACHE_DIR        = os.getenv("CACHE_DIR", ".cache")
+POOL_CACHE_FILE  = os.path.join(CACHE_DIR, "pools.json")
+POOL_PRICES      = os.getenv("POOL_PRICES", "1") == "1"
+POOL_WATCH_MAX   = int(os.getenv("POOL_WATCH_MAX", "200"))   # pools kept subscribed (least recently read go first)
+SOL_USDC_POOL    = os.getenv("SOL_USDC_POOL", "58oQChx4yWmvKdwLLZzBi4ChoCc2fqCUWBkwMihLYQo2")  # Raydium AMM v4
+USDC_MINT        = "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"
+COMMITMENT       = "processed"
+NEGATIVE_TTL     = 600   # seconds a mint without a SOL/USDC pool isn't looked up again
+RETRY_TTL        = 30    # seconds before retrying a lookup that failed (RPC error, bad mint)
+FLUSH_DELAY      = 5     # seconds between disk writes
+RESUBSCRIBE_DELAY = 2.0
+
+RAYDIUM_AMM  = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+RAYDIUM_CPMM = "CPMMoo8L3F4NbTegBCKVNunggL7H1ZpdTHKxQB5qKP1C"
+PUMP_SWAP    = "pAMMBay6oceH9fJKBRHGP5D4bD4sWpmSwMn52FMfXEA"
+
+PUMP, PUMP_AMM, AMM_V4, CPMM = "pump", "pumpswap", "raydium_amm", "raydium_cpmm"
+QUOTE_MINTS = (SOL_MINT, USDC_MINT)
+
+# Raydium AMM v4 (752 bytes): decimals, then vaults and mints after the swap counters
+_AMM_SIZE = 752
+_AMM_BASE_DECIMALS, _AMM_QUOTE_DECIMALS = 32, 40
+_AMM_BASE_VAULT, _AMM_QUOTE_VAULT, _AMM_BASE_MINT, _AMM_QUOTE_MINT = 336, 368, 400, 432
+# Raydium CPMM PoolState (637 bytes, anchor)
+_CPMM_SIZE = 637
+_CPMM_VAULT_0, _CPMM_VAULT_1, _CPMM_MINT_0, _CPMM_MINT_1 = 72, 104, 168, 200
+_CPMM_DECIMALS_0, _CPMM_DECIMALS_1 = 331, 332
+# PumpSwap Pool (anchor): bump u8, index u16, creator, then mints and pool token accounts
+_PSWAP_BASE_MINT, _PSWAP_QUOTE_MINT, _PSWAP_BASE_VAULT, _PSWAP_QUOTE_VAULT = 43, 75, 139, 171
+# SPL token account: amount after mint + owner
+_TOKEN_AMOUNT = 64
+
+
+def _key(raw: bytes, offset: int) -> str:
+    return str(Pubkey.from_bytes(raw[offset:offset + 32]))
+
+
+@dataclass
+class PoolInfo:
+    """Static facts about a token's main pool (cached on disk)."""
+    mint: str
+    kind: str
+    address: str
+    quote_mint: str          # SOL or USDC
+    decimals: int
+    quote_decimals: int
+    accounts: List[str]      # carry the reserves: [curve] or [token vault, quote vault]
+
+    def to_json(self) -> list:
+        return [self.kind, self.address, self.quote_mint, self.decimals, self.quote_decimals, self.accounts]
+
+    @classmethod
+    def from_json(cls, mint: str, data: list) -> "PoolInfo":
+        kind, address, quote_mint, decimals, quote_decimals, accounts = data
+        return cls(mint, kind, address, quote_mint, decimals, quote_decimals, list(accounts))
+
+
+def _vault_pools(program: str, address: str, raw: bytes) -> Optional[Tuple[str, str, str, str, Optional[int], Optional[int]]]:
+    """(base mint, quote mint, base vault, quote vault, base decimals, quote decimals) of a vault-based pool."""
+    if program == RAYDIUM_AMM and len(raw) == _AMM_SIZE:
+        base_dec, quote_dec = struct.unpack_from("<QQ", raw, _AMM_BASE_DECIMALS)
+        return (_key(raw, _AMM_BASE_MINT), _key(raw, _AMM_QUOTE_MINT),
+                _key(raw, _AMM_BASE_VAULT), _key(raw, _AMM_QUOTE_VAULT), base_dec, quote_dec)
+    if program == RAYDIUM_CPMM and len(raw) == _CPMM_SIZE:
+        return (_key(raw, _CPMM_MINT_0), _key(raw, _CPMM_MINT_1),
+                _key(raw, _CPMM_VAULT_0), _key(raw, _CPMM_VAULT_1), raw[_CPMM_DECIMALS_0], raw[_CPMM_DECIMALS_1])
+    if program == PUMP_SWAP and len(raw) >= _PSWAP_QUOTE_VAULT + 32:
+        return (_key(raw, _PSWAP_BASE_MINT), _key(raw, _PSWAP_QUOTE_MINT),
+                _key(raw, _PSWAP_BASE_VAULT), _key(raw, _PSWAP_QUOTE_VAULT), None, None)
+    return None
+
+
+_KINDS = {RAYDIUM_AMM: AMM_V4, RAYDIUM_CPMM: CPMM, PUMP_SWAP: PUMP_AMM}
+
+
+@dataclass
+class PoolState:
+    """Live reserves of one watched pool."""
+    info: PoolInfo
+    reserves: Dict[str, Tuple[int, int]] = field(default_factory=dict)   # account -> (value, slot)
+    token_reserve: int = 0
+    quote_reserve: int = 0
+    loaded: bool = False
+    subscribed: int = 0
+    read_at: float = field(default_factory=time.monotonic)
+    tasks: List[asyncio.Task] = field(default_factory=list)
+    reload: Optional[asyncio.Event] = None
+
+    @property
+    def live(self) -> bool:
+        return self.loaded and self.subscribed == len(self.info.accounts)
+
+    def price_quote(self) -> Optional[float]:
+        """Quote-mint units per whole token at the current reserves."""
+        if not self.token_reserve or not self.quote_reserve:
+            return None
+        return (self.quote_reserve / 10 ** self.info.quote_decimals) / (self.token_reserve / 10 ** self.info.decimals)
+
+    def impact(self, amount_in: int, buy: bool = True) -> Optional[float]:
+        """Price impact (fraction) of swapping `amount_in` raw units of the quote mint (buy) or the token (sell)."""
+        reserve = self.quote_reserve if buy else self.token_reserve
+        if not reserve:
+            return None
+        return amount_in / (reserve + amount_in)
+
+
+class PoolPriceEngine:
+    """
+    Spot prices from each token's main pool instead of HTTP quotes.
+    A mint is resolved once to its deepest SOL/USDC pool: its live pump.fun
+    bonding curve, or else a PumpSwap, Raydium AMM v4 or CPMM pool. The
+    layout is cached on disk. The pool's reserve accounts are then kept
+    current over the shared WS hub, so reads are a dict lookup and a
+    division. Vault balances stand in for reserves (fees not yet swept
+    are counted). Reads return None until a pool is live; callers fall
+    back to their HTTP price.
+    """
+
+    def __init__(self, path: str = POOL_CACHE_FILE, capacity: int = POOL_WATCH_MAX):
+        self.path = path
+        self.capacity = capacity
+        self._pools: Dict[str, PoolInfo] = {}
+        self._negative: Dict[str, float] = {}
+        self._watched: "OrderedDict[str, PoolState]" = OrderedDict()
+        self._resolving: Dict[str, asyncio.Task] = {}
+        self._loaded = False
+        self._file = SnapshotFile(path, self._snapshot, FLUSH_DELAY, "pool cache")
+
+    # --- persistence ----------------------------------------------------
+
+    def _load(self) -> None:
+        self._loaded = True
+        for mint, entry in (self._file.load() or {}).items():
+            self._pools[mint] = PoolInfo.from_json(mint, entry)
+
+    def _snapshot(self) -> dict:
+        return {m: p.to_json() for m, p in self._pools.items()}
+
+    # --- reads ----------------------------------------------------------
+
+    def state(self, mint: str) -> Optional[PoolState]:
+        """The mint's live pool, or None (and start watching it)."""
+        state = self._watched.get(mint)
+        if state is None:
+            self.watch(mint)
+            return None
+        state.read_at = time.monotonic()
+        self._watched.move_to_end(mint)
+        return state if state.live else None
+
+    def price_usdc(self, mint: str) -> Optional[float]:
+        """USDC per whole token from local reserves, or None when no live pool."""
+        sol_usdc = self._sol_usdc()
+        if mint == SOL_MINT:
+            return sol_usdc
+        state = self.state(mint)
+        if state is None:
+            return None
+        price = state.price_quote()
+        if price is None or state.info.quote_mint == USDC_MINT:
+            return price
+        return price * sol_usdc if sol_usdc else None
+
+    def decimals(self, mint: str) -> Optional[int]:
+        info = self._pools.get(mint)
+        return info.decimals if info else None
+
+    def _sol_usdc(self) -> Optional[float]:
+        state = self.state(SOL_MINT)
+        return state.price_quote() if state else None
+
+    # --- watching -------------------------------------------------------
+
+    def watch(self, mint: str) -> None:
+        """Resolve the mint's pool and subscribe to it in the background."""
+        if not self._loaded:
+            self._load()
+        if mint in self._watched or mint in self._resolving:
+            return
+        expiry = self._negative.get(mint)
+        if expiry is not None and expiry > time.monotonic():
+            return
+        task = asyncio.create_task(self._watch(mint))
+        self._resolving[mint] = task
+        task.add_done_callback(lambda _t: self._resolving.pop(mint, None))
+
+    async def _watch(self, mint: str) -> None:
+        try:
+            info = self._pools.get(mint) or await self._resolve(mint)
+        except Exception as e:
+            count("pool_resolve", "error")
+            logger.debug("pool lookup for %s failed: %s", mint, e)
+            # back off too, or every price read re-sends the whole lookup batch
+            self._negative[mint] = time.monotonic() + RETRY_TTL
+            return
+        if info is None:
+            count("pool_resolve", "none")
+            self._negative[mint] = time.monotonic() + NEGATIVE_TTL
+            return
+        state = PoolState(info, reload=asyncio.Event())
+        self._watched[mint] = state
+        while len(self._watched) > self.capacity:
+            _, evicted = self._watched.popitem(last=False)
+            self._stop(evicted)
+        state.tasks = [asyncio.create_task(self._reload_loop(mint, state))] + [
+            asyncio.create_task(self._subscribe_forever(mint, state, account)) for account in info.accounts
+        ]
+
+    def _forget(self, mint: str) -> None:
+        """Drop a pool that no longer prices the mint (e.g. a curve that graduated)."""
+        state = self._watched.pop(mint, None)
+        if state:
+            self._stop(state)
+        if self._pools.pop(mint, None) is not None:
+            self._file.schedule()
+
+    @staticmethod
+    def _stop(state: PoolState) -> None:
+        for task in state.tasks:
+            task.cancel()
+        state.tasks = []
+
+    async def stop(self) -> None:
+        for state in self._watched.values():
+            self._stop(state)
+        self._watched.clear()
+        for task in self._resolving.values():
+            task.cancel()
+
+    # --- resolution -----------------------------------------------------
+
+    async def _resolve(self, mint: str) -> Optional[PoolInfo]:
+        if mint == SOL_MINT:
+            info = await self._resolve_sol_usdc()
+        else:
+            info = await self._resolve_token(mint)
+        if info is not None:
+            count("pool_resolve", info.kind)
+            self._pools[mint] = info
+            self._file.schedule()
+        return info
+
+    async def _resolve_sol_usdc(self) -> Optional[PoolInfo]:
+        result = await rpc_call("getAccountInfo", [SOL_USDC_POOL, {"encoding": "base64"}])
+        acct = (result or {}).get("value")
+        if not acct:
+            return None
+        pool = _vault_pools(acct["owner"], SOL_USDC_POOL, base64.b64decode(acct["data"][0]))
+        if pool is None:
+            return None
+        base_mint, quote_mint, base_vault, quote_vault, base_dec, quote_dec = pool
+        return PoolInfo(SOL_MINT, _KINDS[acct["owner"]], SOL_USDC_POOL, quote_mint,
+                        int(base_dec), int(quote_dec), [base_vault, quote_vault])
+
+    async def _resolve_token(self, mint: str) -> Optional[PoolInfo]:
+        curve_address = str(bonding_curve_pda(mint))
+
+        def gpa(program: str, offset: int, size: Optional[int] = None):
+            filters = [{"memcmp": {"offset": offset, "bytes": mint}}]
+            if size:
+                filters.insert(0, {"dataSize": size})
+            return rpc_call("getProgramAccounts", [program, {"encoding": "base64", "commitment": COMMITMENT, "filters": filters}])
+
+        with rpc_batch():
+            curve_call = rpc_call("getAccountInfo", [curve_address, {"encoding": "base64", "commitment": COMMITMENT}])
+            searches = [
+                (RAYDIUM_AMM, gpa(RAYDIUM_AMM, _AMM_BASE_MINT, _AMM_SIZE)),
+                (RAYDIUM_AMM, gpa(RAYDIUM_AMM, _AMM_QUOTE_MINT, _AMM_SIZE)),
+                (RAYDIUM_CPMM, gpa(RAYDIUM_CPMM, _CPMM_MINT_0, _CPMM_SIZE)),
+                (RAYDIUM_CPMM, gpa(RAYDIUM_CPMM, _CPMM_MINT_1, _CPMM_SIZE)),
+                (PUMP_SWAP, gpa(PUMP_SWAP, _PSWAP_BASE_MINT)),
+            ]
+        mint_info = await get_mint_index().get(mint)
+
+        # a live curve holds all of the token's liquidity
+        acct = ((await curve_call) or {}).get("value")
+        if acct and acct.get("owner") == str(PUMP_PROGRAM):
+            curve = decode_bonding_curve(curve_address, base64.b64decode(acct["data"][0]))
+            if curve is not None and not curve.complete:
+                return PoolInfo(mint, PUMP, curve_address, SOL_MINT, mint_info.decimals, 9, [curve_address])
+
+        candidates = []
+        for program, call in searches:
+            try:
+                found = await call
+            except Exception as e:
+                logger.debug("getProgramAccounts %s for %s failed: %s", program, mint, e)
+                continue
+            for keyed in found or []:
+                pool = _vault_pools(program, keyed["pubkey"], base64.b64decode(keyed["account"]["data"][0]))
+                if pool is None:
+                    continue
+                base_mint, quote_mint, base_vault, quote_vault, base_dec, quote_dec = pool
+                if base_mint == mint and quote_mint in QUOTE_MINTS:
+                    accounts, quote, quote_dec = [base_vault, quote_vault], quote_mint, quote_dec
+                elif quote_mint == mint and base_mint in QUOTE_MINTS:
+                    accounts, quote, quote_dec = [quote_vault, base_vault], base_mint, base_dec
+                else:
+                    continue
+                if quote_dec is None:
+                    quote_dec = 9 if quote == SOL_MINT else 6
+                candidates.append(PoolInfo(mint, _KINDS[program], keyed["pubkey"], quote, mint_info.decimals,
+                                           int(quote_dec), accounts))
+        if not candidates:
+            return None
+        return await self._deepest(candidates)
+
+    async def _deepest(self, candidates: List[PoolInfo]) -> PoolInfo:
+        """The candidate with the most quote-side liquidity (SOL counted at ~its USDC price)."""
+        result = await rpc_call("getMultipleAccounts", [[c.accounts[1] for c in candidates], {"encoding": "base64"}])
+        sol_usdc = self._sol_usdc() or 100.0   # only used to rank SOL against USDC pools
+
+        def depth(pair):
+            info, acct = pair
+            if not acct:
+                return 0.0
+            raw = base64.b64decode(acct["data"][0])
+            (amount,) = struct.unpack_from("<Q", raw, _TOKEN_AMOUNT)
+            value = amount / 10 ** info.quote_decimals
+            return value * sol_usdc if info.quote_mint == SOL_MINT else value
+
+        return max(zip(candidates, result["value"]), key=depth)[0]
+
+    # --- live reserves --------------------------------------------------
+
+    def _apply(self, mint: str, state: PoolState, account: str, raw: bytes, slot: int) -> None:
+        info = state.info
+        if info.kind == PUMP:
+            curve = decode_bonding_curve(account, raw)
+            if curve is None or curve.complete:
+                # graduated: resolve its AMM pool next time it's read
+                count("pool_resolve", "graduated")
+                self._forget(mint)
+                return
+            if slot >= state.reserves.get(account, (0, -1))[1]:
+                state.reserves[account] = (0, slot)
+                state.token_reserve, state.quote_reserve = curve.virtual_token_reserves, curve.virtual_sol_reserves
+            return
+        if len(raw) < _TOKEN_AMOUNT + 8:
+            return
+        (amount,) = struct.unpack_from("<Q", raw, _TOKEN_AMOUNT)
+        if slot >= state.reserves.get(account, (0, -1))[1]:
+            state.reserves[account] = (amount, slot)
+            token_vault, quote_vault = info.accounts
+            state.token_reserve = state.reserves.get(token_vault, (0, 0))[0]
+            state.quote_reserve = state.reserves.get(quote_vault, (0, 0))[0]
+
+    async def _reload(self, mint: str, state: PoolState) -> None:
+        result = await rpc_call("getMultipleAccounts", [state.info.accounts, {"encoding": "base64", "commitment": COMMITMENT}])
+        slot = result["context"]["slot"]
+        for account, acct in zip(state.info.accounts, result["value"]):
+            if acct:
+                self._apply(mint, state, account, base64.b64decode(acct["data"][0]), slot)
+        state.loaded = True
+
+    async def _reload_loop(self, mint: str, state: PoolState) -> None:
+        while True:
+            await state.reload.wait()
+            state.reload.clear()
+            try:
+                await self._reload(mint, state)
+            except Exception as e:
+                logger.warning("pool %s reload failed: %s", state.info.address, e)
+
+    async def _subscribe_forever(self, mint: str, state: PoolState, account: str) -> None:
+        while True:
+            sub = None
+            try:
+                sub = await get_ws_hub().subscribe(
+                    "account", Pubkey.from_string(account), commitment=COMMITMENT, encoding="base64"
+                )
+                sub.on_resubscribe = state.reload.set
+                state.subscribed += 1
+                # anything that changed before the subscription existed
+                state.reload.set()
+                try:
+                    async for notif in sub:
+                        self._apply(mint, state, account, bytes(notif.result.value.data), notif.result.context.slot)
+                finally:
+                    state.subscribed -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("pool %s subscription failed: %s", account, e)
+            finally:
+                if sub is not None:
+                    await sub.close()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+
+_engine: Optional[PoolPriceEngine] = None
+
+def get_price_engine() -> PoolPriceEngine:
+    """Return the shared pool price engine."""
+    global _engine
+    if _engine is None:
+        _engine = PoolPriceEngine()
+    return _engine
+
+
+async def stop_price_engine() -> None:
+    global _engine
+    if _engine is not None:
+        await _engine.stop()
+        _engine = None
+
+
+def local_price_usdc(mint: str) -> Optional[float]:
+    """USDC price from a live pool, or None (the pool starts resolving in the background)."""
+    if not POOL_PRICES:
+        return None
+    return get_price_engine().price_usdc(mint)
@@ -0,0 +1,127 @@
+import os, time, asyncio, logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from dotenv import load_dotenv
+from solders.keypair import Keypair
+from solders.transaction import VersionedTransaction
+from constants import SOL_MINT, LAMPORTS_PER_SOL
+from transactions.routes import get_quote, swap_instructions
+from transactions.sign_jupiter_swap_instructions import prepare_transaction
+from transactions.fetch_price import cached_price_usdc, fetch_price_usdc
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Speculative buy transactions for the quick-buy preset buttons (opt-in)
+PRESIGN_ENABLED   = os.getenv("PRESIGN_ENABLED", "0") == "1"
+PRESIGN_MAX_AGE   = float(os.getenv("PRESIGN_MAX_AGE", "20"))        # seconds; blockhash lives ~60s
+PRESIGN_MAX_DRIFT = float(os.getenv("PRESIGN_MAX_DRIFT_PCT", "2"))   # % move since the quote
+
+_Key = Tuple[str, str, int, float, int]  # wallet, mint, lamports, slippage, tip
+
+
+@dataclass
+class PreparedSwap:
+    tx: VersionedTransaction
+    quote: Dict
+    price: Optional[float]   # USDC price of the mint when the quote was taken
+    created_at: float
+    priced_at: float         # when that price was asked for; drift is checked against anything as fresh
+
+
+class PresignCache:
+    """
+    Holds signed buy transactions for preset amounts so a tap can send
+    them immediately. Entries are single-use and only handed out while
+    the quote/blockhash are younger than PRESIGN_MAX_AGE and the price
+    moved less than PRESIGN_MAX_DRIFT percent.
+    """
+
+    def __init__(self, max_age: float = PRESIGN_MAX_AGE, max_drift_pct: float = PRESIGN_MAX_DRIFT):
+        self.max_age = max_age
+        self.max_drift_pct = max_drift_pct
+        self._entries: Dict[_Key, PreparedSwap] = {}
+        self._tasks: Dict[_Key, asyncio.Task] = {}
+
+    @staticmethod
+    def key(keypair: Keypair, address: str, lamports: int, slippage: float, tip_lamports: int) -> _Key:
+        return (str(keypair.pubkey()), address, lamports, slippage, tip_lamports)
+
+    def prepare(
+        self,
+        *,
+        address: str,
+        sol_amounts: Iterable,
+        slippage: float,
+        tip_lamports: int,
+        keypair: Keypair
+    ) -> None:
+        """Build and sign buys for each amount in the background."""
+        self._evict()
+        for amount in sol_amounts:
+            lamports = int(float(amount) * LAMPORTS_PER_SOL)
+            key = self.key(keypair, address, lamports, slippage, tip_lamports)
+            if key in self._entries or key in self._tasks:
+                continue
+            task = asyncio.create_task(self._prepare_one(key, slippage, tip_lamports, keypair))
+            self._tasks[key] = task
+            task.add_done_callback(lambda _t, k=key: self._tasks.pop(k, None))
+
+    async def _prepare_one(self, key: _Key, slippage: float, tip_lamports: int, keypair: Keypair) -> None:
+        _, address, lamports, _, _ = key
+        priced_at = time.monotonic()
+        try:
+            quote, price = await asyncio.gather(
+                get_quote(SOL_MINT, address, lamports, slippage),
+                fetch_price_usdc(address),
+                return_exceptions=True,
+            )
+            if isinstance(quote, Exception):
+                raise quote
+            swap_resp = await swap_instructions(quote, tip_lamports, str(keypair.pubkey()))
+            tx = await prepare_transaction(swap_resp, keypair)
+        except Exception as e:
+            logger.debug("presign %s for %s failed: %s", lamports, address, e)
+            return
+        self._entries[key] = PreparedSwap(
+            tx=tx,
+            quote=quote,
+            price=None if isinstance(price, Exception) else price,
+            created_at=time.monotonic(),
+            priced_at=priced_at,
+        )
+
+    def take(
+        self,
+        *,
+        address: str,
+        lamports: int,
+        slippage: float,
+        tip_lamports: int,
+        keypair: Keypair
+    ) -> Optional[PreparedSwap]:
+        """Pop a usable prepared swap, or None if missing/stale."""
+        prepared = self._entries.pop(self.key(keypair, address, lamports, slippage, tip_lamports), None)
+        if prepared is None:
+            return None
+        if time.monotonic() - prepared.created_at > self.max_age:
+            return None
+        # live pool price, or a Jupiter price at least as fresh as the entry's own;
+        # no network on the tap path, and nothing to compare against means no send
+        current = cached_price_usdc(address, max_age=time.monotonic() - prepared.priced_at)
+        if not prepared.price or not current:
+            logger.info("presigned buy for %s dropped: no current price to check drift", address)
+            return None
+        drift = abs(current - prepared.price) / prepared.price * 100
+        if drift > self.max_drift_pct:
+            logger.info("presigned buy for %s dropped: price moved %.2f%%", address, drift)
+            return None
+        return prepared
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        for key in [k for k, p in self._entries.items() if now - p.created_at > self.max_age]:
+            del self._entries[key]
+
+
+presigned = PresignCache()
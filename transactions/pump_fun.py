@@ -0,0 +1,295 @@
+import os, time, base64, random, struct, asyncio, logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+from dotenv import load_dotenv
+from solders.pubkey import Pubkey
+from solders.instruction import Instruction, AccountMeta
+from solders.system_program import ID as SYSTEM_PROGRAM, transfer, TransferParams
+from solders import compute_budget
+from spl.token.instructions import get_associated_token_address, create_idempotent_associated_token_account
+from construct import Struct, Bytes, Int64ul, Flag, Optional as OptionalField
+from constants import SOL_MINT, BUY, SELL
+from transactions.rpc_client import rpc_call
+from transactions.account import get_user_pubkey
+from transactions.mint_info import get_mint_index
+from transactions.blockhash import get_blockhash_manager
+from transactions.jupiter_jito import solders_ix_to_jupiter
+from transactions.cu_profile import route_key
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+PUMP_DIRECT        = os.getenv("PUMP_DIRECT", "1") == "1"
+PUMP_FEE_BPS       = int(os.getenv("PUMP_FEE_BPS", "125"))     # protocol + creator fee the quote assumes
+PUMP_CU_LIMIT      = int(os.getenv("PUMP_CU_LIMIT", "150000")) # until the route has a learned profile
+PUMP_FEE_RECIPIENT = Pubkey.from_string(os.getenv("PUMP_FEE_RECIPIENT", "CebN5WGQ4jvEPvsVU4EoHEpgzq1VV7AbicfhtW4xC9iM"))
+PUMP_LABEL         = "Pump.fun"
+OFF_CURVE_SIZE     = 20_000   # mints remembered as graduated / not pump.fun
+NO_CURVE_TTL       = 10       # seconds a missing curve account is trusted (a fresh launch may not be visible yet)
+
+PUMP_PROGRAM     = Pubkey.from_string("6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P")
+PUMP_FEE_PROGRAM = Pubkey.from_string("pfeeUxB6jkeY1Hxd7CsFCAjcbHA9rWtchMGdZ6VojVZ")
+
+JITO_TIP_ACCOUNTS = [Pubkey.from_string(a) for a in (
+    "96gYZGLnJYVFmbjzopPSU6QiEV5fGqZNyN9nmNhvrZU5",
+    "HFqU5x63VTqvQss8hp11i4wVV8bD44PvwucfZ2bU7gRe",
+    "Cw8CFyM9FkoMi7K7Crf6HNQqf4uEMzpKw6QNghXLvLkY",
+    "ADaUMid9yfUytqMBgopwjb2DTLSokTSzL1zt6iGPaS49",
+    "DfXygSm4jCyNCybVYYK6DwvWqjKee8pbDmJGcLWNDXjh",
+    "ADuUkR4vqLUMWXxW9gh6D6L8pMSawimctcNZ5pGwDcEt",
+    "DttWaMuVvTiduZRnguLF7jNxTgiMBZ1hyAumKUiL2KRL",
+    "3AVi9Tg9Uo68tJfuvoKvqKNWKkC5wPdSSdeBnizKZ6jT",
+)]
+
+# Anchor discriminators: sha256("account:BondingCurve") / sha256("global:buy" | "global:sell"), first 8 bytes
+_CURVE_DISCRIMINATOR = bytes.fromhex("17b7f83760d8ac60")
+_BUY_DISCRIMINATOR   = bytes.fromhex("66063d1201daebea")
+_SELL_DISCRIMINATOR  = bytes.fromhex("33e685a4017f83ad")
+
+_CURVE_LAYOUT = Struct(
+    "discriminator" / Bytes(8),
+    "virtual_token_reserves" / Int64ul,
+    "virtual_sol_reserves" / Int64ul,
+    "real_token_reserves" / Int64ul,
+    "real_sol_reserves" / Int64ul,
+    "token_total_supply" / Int64ul,
+    "complete" / Flag,
+    "creator" / OptionalField(Bytes(32)),   # absent on curves created before creator fees
+)
+
+
+@dataclass
+class BondingCurve:
+    address: str
+    virtual_token_reserves: int
+    virtual_sol_reserves: int
+    real_token_reserves: int
+    real_sol_reserves: int
+    token_total_supply: int
+    complete: bool
+    creator: Optional[str]
+
+
+@lru_cache(maxsize=OFF_CURVE_SIZE)
+def bonding_curve_pda(mint: str) -> Pubkey:
+    pda, _ = Pubkey.find_program_address([b"bonding-curve", bytes(Pubkey.from_string(mint))], PUMP_PROGRAM)
+    return pda
+
+
+@lru_cache(maxsize=1)
+def _program_pdas() -> Dict[str, Pubkey]:
+    def pda(*seeds, program=PUMP_PROGRAM):
+        return Pubkey.find_program_address(list(seeds), program)[0]
+    return {
+        "global": pda(b"global"),
+        "event_authority": pda(b"__event_authority"),
+        "global_volume_accumulator": pda(b"global_volume_accumulator"),
+        "fee_config": pda(b"fee_config", bytes(PUMP_PROGRAM), program=PUMP_FEE_PROGRAM),
+    }
+
+
+def decode_bonding_curve(address: str, raw: bytes) -> Optional[BondingCurve]:
+    """BondingCurve from account data, or None if it isn't one."""
+    if raw[:8] != _CURVE_DISCRIMINATOR:
+        return None
+    parsed = _CURVE_LAYOUT.parse(raw)
+    return BondingCurve(
+        address=address,
+        virtual_token_reserves=parsed.virtual_token_reserves,
+        virtual_sol_reserves=parsed.virtual_sol_reserves,
+        real_token_reserves=parsed.real_token_reserves,
+        real_sol_reserves=parsed.real_sol_reserves,
+        token_total_supply=parsed.token_total_supply,
+        complete=parsed.complete,
+        creator=str(Pubkey.from_bytes(parsed.creator)) if parsed.creator else None,
+    )
+
+
+# --- curve math (constant product on the virtual reserves) -----------------
+
+def buy_out(curve: BondingCurve, lamports: int, fee_bps: int = PUMP_FEE_BPS) -> int:
+    """Tokens (raw) bought for `lamports`, fees included."""
+    net = lamports * 10_000 // (10_000 + fee_bps)
+    out = curve.virtual_token_reserves * net // (curve.virtual_sol_reserves + net)
+    return min(out, curve.real_token_reserves)
+
+
+def sell_out(curve: BondingCurve, tokens: int, fee_bps: int = PUMP_FEE_BPS) -> int:
+    """Lamports received for selling `tokens` (raw), after fees."""
+    gross = curve.virtual_sol_reserves * tokens // (curve.virtual_token_reserves + tokens)
+    return gross * (10_000 - fee_bps) // 10_000
+
+
+def spot_price_sol(curve: BondingCurve, decimals: int) -> float:
+    """SOL per whole token at the current reserves."""
+    return (curve.virtual_sol_reserves / 1e9) / (curve.virtual_token_reserves / 10 ** decimals)
+
+
+# --- quotes -----------------------------------------------------------------
+
+# mint -> expiry (monotonic); inf for graduated curves and accounts owned by another program
+_off_curve: "OrderedDict[str, float]" = OrderedDict()
+
+def _mark_off_curve(mint: str, ttl: float = float("inf")) -> None:
+    # a graduated curve never comes back; a missing one may just not have reached this node yet
+    _off_curve[mint] = time.monotonic() + ttl
+    _off_curve.move_to_end(mint)
+    while len(_off_curve) > OFF_CURVE_SIZE:
+        _off_curve.popitem(last=False)
+
+
+async def fetch_bonding_curve(mint: str) -> Optional[BondingCurve]:
+    """The mint's live bonding curve, or None if it has none or has graduated."""
+    expiry = _off_curve.get(mint)
+    if expiry is not None:
+        if expiry > time.monotonic():
+            return None
+        del _off_curve[mint]
+    address = str(bonding_curve_pda(mint))
+    result = await rpc_call("getAccountInfo", [address, {"encoding": "base64", "commitment": "processed"}])
+    acct = (result or {}).get("value")
+    if not acct:
+        _mark_off_curve(mint, NO_CURVE_TTL)
+        return None
+    if acct.get("owner") != str(PUMP_PROGRAM):
+        _mark_off_curve(mint)
+        return None
+    curve = decode_bonding_curve(address, base64.b64decode(acct["data"][0]))
+    if curve is None or curve.complete:
+        _mark_off_curve(mint)
+        return None
+    return curve
+
+
+async def get_quote_pump(input_mint: str, output_mint: str, amount: int, slippage: float) -> Optional[Dict]:
+    """
+    Quote a SOL↔token swap on the token's pump.fun bonding curve, shaped
+    like a Jupiter quote (plus a "pump" section the builder reads).
+    None when the token is not on a live curve.
+    """
+    if not PUMP_DIRECT:
+        return None
+    if input_mint == SOL_MINT:
+        side, mint = BUY, output_mint
+    elif output_mint == SOL_MINT:
+        side, mint = SELL, input_mint
+    else:
+        return None
+    curve, info = await asyncio.gather(fetch_bonding_curve(mint), get_mint_index().get(mint))
+    if curve is None:
+        return None
+
+    slippage_bps = int(slippage * 100)
+    if side == BUY:
+        out = buy_out(curve, amount)
+        if out <= 0:
+            return None
+        # exact-out on chain: buy `out` tokens, paying at most amount + slippage
+        token_amount, sol_limit = out, amount * (10_000 + slippage_bps) // 10_000
+        threshold = out * (10_000 - slippage_bps) // 10_000
+        impact = amount / (curve.virtual_sol_reserves + amount)
+    else:
+        out = sell_out(curve, amount)
+        token_amount, sol_limit = amount, out * (10_000 - slippage_bps) // 10_000
+        threshold = sol_limit
+        impact = amount / (curve.virtual_token_reserves + amount)
+
+    swap_info = {
+        "ammKey": curve.address, "label": PUMP_LABEL,
+        "inputMint": input_mint, "outputMint": output_mint,
+        "inAmount": str(amount), "outAmount": str(out),
+        "feeAmount": str(amount * PUMP_FEE_BPS // 10_000 if side == BUY else out * PUMP_FEE_BPS // 10_000),
+        "feeMint": SOL_MINT,
+    }
+    return {
+        "inputMint": input_mint, "inAmount": str(amount),
+        "outputMint": output_mint, "outAmount": str(out),
+        "otherAmountThreshold": str(threshold),
+        "swapMode": "ExactIn", "slippageBps": slippage_bps,
+        "priceImpactPct": f"{impact:.6f}",
+        "routePlan": [{"swapInfo": swap_info, "percent": 100}],
+        "pump": {
+            "side": side, "mint": mint, "bondingCurve": curve.address, "creator": curve.creator,
+            "tokenProgram": info.token_program, "tokenAmount": token_amount, "solLimit": sol_limit,
+        },
+    }
+
+
+def is_pump_quote(quote: Dict) -> bool:
+    return "pump" in quote
+
+
+# --- instructions -----------------------------------------------------------
+
+def _pump_instruction(pump: Dict, user: Pubkey) -> Instruction:
+    mint = Pubkey.from_string(pump["mint"])
+    curve = Pubkey.from_string(pump["bondingCurve"])
+    token_program = Pubkey.from_string(pump["tokenProgram"])
+    creator = Pubkey.from_string(pump["creator"]) if pump["creator"] else Pubkey.default()
+    creator_vault = Pubkey.find_program_address([b"creator-vault", bytes(creator)], PUMP_PROGRAM)[0]
+    pdas = _program_pdas()
+
+    def meta(key, writable=False, signer=False):
+        return AccountMeta(key, signer, writable)
+
+    head = [
+        meta(pdas["global"]),
+        meta(PUMP_FEE_RECIPIENT, writable=True),
+        meta(mint),
+        meta(curve, writable=True),
+        meta(get_associated_token_address(curve, mint, token_program), writable=True),
+        meta(get_associated_token_address(user, mint, token_program), writable=True),
+        meta(user, writable=True, signer=True),
+        meta(SYSTEM_PROGRAM),
+    ]
+    tail = [meta(pdas["event_authority"]), meta(PUMP_PROGRAM)]
+    fees = [meta(pdas["fee_config"]), meta(PUMP_FEE_PROGRAM)]
+    if pump["side"] == BUY:
+        user_volume = Pubkey.find_program_address([b"user_volume_accumulator", bytes(user)], PUMP_PROGRAM)[0]
+        accounts = head + [meta(token_program), meta(creator_vault, writable=True)] + tail + [
+            meta(pdas["global_volume_accumulator"], writable=True),
+            meta(user_volume, writable=True),
+        ] + fees
+        data = _BUY_DISCRIMINATOR + struct.pack("<QQ", pump["tokenAmount"], pump["solLimit"])
+    else:
+        accounts = head + [meta(creator_vault, writable=True), meta(token_program)] + tail + fees
+        data = _SELL_DISCRIMINATOR + struct.pack("<QQ", pump["tokenAmount"], pump["solLimit"])
+    return Instruction(PUMP_PROGRAM, data, accounts)
+
+
+async def swap_pump(quote: Dict, tip_lamports: int = 0, user_pubkey: Optional[str] = None) -> Dict:
+    """
+    Build the swap for a pump.fun quote locally, in the same shape
+    swap_jupiter returns: idempotent ATA creation for buys, the curve
+    buy/sell instruction and a Jito tip transfer. No blockhash comes with
+    it, so the build uses the blockhash manager's.
+    """
+    pump = quote["pump"]
+    user = Pubkey.from_string(user_pubkey) if user_pubkey else get_user_pubkey()
+    setup = []
+    if pump["side"] == BUY:
+        setup.append(create_idempotent_associated_token_account(
+            user, user, Pubkey.from_string(pump["mint"]), Pubkey.from_string(pump["tokenProgram"])
+        ))
+    other = []
+    if tip_lamports:
+        other.append(transfer(TransferParams(
+            from_pubkey=user, to_pubkey=random.choice(JITO_TIP_ACCOUNTS), lamports=int(tip_lamports)
+        )))
+    manager = get_blockhash_manager()
+    if manager.current() is None:
+        await manager.wait_ready()
+    return {
+        "setupInstructions": [solders_ix_to_jupiter(ix) for ix in setup],
+        "computeBudgetInstructions": [solders_ix_to_jupiter(compute_budget.set_compute_unit_limit(PUMP_CU_LIMIT))],
+        "otherInstructions": [solders_ix_to_jupiter(ix) for ix in other],
+        "swapInstruction": solders_ix_to_jupiter(_pump_instruction(pump, user)),
+        "cleanupInstruction": None,
+        "addressLookupTableAddresses": [],
+        "blockhashWithMetadata": None,
+        "inputMint": quote["inputMint"],
+        "routePlan": quote["routePlan"],
+        "routeKey": route_key(quote),
+    }
@@ -0,0 +1,95 @@
+import os, time, base64, asyncio, logging
+from dataclasses import dataclass
+from typing import Optional
+from dotenv import load_dotenv
+from solders.transaction import VersionedTransaction
+from transactions.blockhash import get_blockhash_manager
+from transactions.senders import get_tx_sender
+from transactions.scored_endpoint import consume
+from transactions.rpc_client import get_rpc
+from transactions.confirmations import get_confirmation_tracker, Confirmation
+from helpers.metrics import span, observe, count
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+REBROADCAST_INTERVAL = float(os.getenv("REBROADCAST_INTERVAL", "1.0"))  # seconds between resends
+LANDING_TIMEOUT      = float(os.getenv("LANDING_TIMEOUT", "60"))        # hard cap when expiry is unknown
+
+
+@dataclass
+class LandingReport:
+    signature: str
+    sends: int
+    elapsed_ms: float
+    landed: bool
+    error: Optional[str] = None
+    slot: Optional[int] = None
+
+
+async def wait_confirm(sig: str, timeout: float = 12.0, last_valid_block_height: Optional[int] = None) -> Confirmation:
+    """
+    Wait for `sig` on the shared confirmation tracker (WS + batched status polling).
+    """
+    fut = get_confirmation_tracker().track(sig, last_valid_block_height, timeout)
+    return await asyncio.shield(fut)
+
+
+async def broadcast_until_landed(
+    tx: VersionedTransaction,
+    interval: float = REBROADCAST_INTERVAL
+) -> LandingReport:
+    """
+    Send `tx`, then resend the same bytes every `interval` seconds until the
+    signature confirms or its blockhash passes lastValidBlockHeight
+    (deadline enforced by the confirmation tracker).
+    Raises on on-chain errors and on expiry; returns the landing report.
+    """
+    sender = get_tx_sender()
+    manager = get_blockhash_manager()
+    tx_b64 = base64.b64encode(bytes(tx)).decode()
+    sig = str(tx.signatures[0])
+    last_valid = manager.expiry(tx.message.recent_blockhash)
+    start = time.monotonic()
+
+    confirm = asyncio.create_task(wait_confirm(sig, LANDING_TIMEOUT, last_valid))
+    confirm.add_done_callback(consume)
+    try:
+        with span("send"):
+            await sender.send(tx_b64)
+    except Exception:
+        confirm.cancel()
+        raise
+    sends = 1
+    sent_at = time.monotonic()
+
+    def report(landed: bool, error: Optional[str] = None, slot: Optional[int] = None) -> LandingReport:
+        return LandingReport(sig, sends, (time.monotonic() - start) * 1000, landed, error, slot)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({confirm}, timeout=interval)
+            if done:
+                break
+            resend = asyncio.create_task(sender.send(tx_b64))
+            resend.add_done_callback(consume)
+            sends += 1
+    except asyncio.CancelledError:
+        confirm.cancel()
+        raise
+
+    observe("confirm", (time.monotonic() - sent_at) * 1000)
+    count("rebroadcast", "sent", sends - 1)
+    try:
+        confirmation = confirm.result()
+    except Exception as e:
+        count("confirm", "error")
+        r = report(False, str(e))
+        logger.info("tx %s failed after %d sends (%.0f ms): %s", sig, r.sends, r.elapsed_ms, e)
+        raise
+    count("confirm", "ok")
+    # later balance reads must come from nodes that have seen this slot
+    get_rpc().note_write(confirmation.slot)
+    r = report(True, slot=confirmation.slot)
+    logger.info("tx %s landed in %.0f ms after %d sends", sig, r.elapsed_ms, r.sends)
+    return r
@@ -0,0 +1,31 @@
+import logging
+from typing import Dict, Optional
+from helpers.metrics import count
+from transactions.jupiter_jito import get_quote_jupiter, swap_jupiter
+from transactions.pump_fun import get_quote_pump, swap_pump, is_pump_quote
+
+logger = logging.getLogger(__name__)
+
+
+async def get_quote(input_mint: str, output_mint: str, amount: int, slippage: float = 0.2) -> Dict:
+    """
+    Quote a swap: locally from the pump.fun bonding curve while the token
+    is still on it, otherwise from Jupiter (graduated or non-pump tokens).
+    """
+    try:
+        quote = await get_quote_pump(input_mint, output_mint, amount, slippage)
+    except Exception as e:
+        logger.debug("pump.fun quote for %s→%s failed: %s", input_mint, output_mint, e)
+        quote = None
+    if quote is not None:
+        count("route", "pump")
+        return quote
+    count("route", "jupiter")
+    return await get_quote_jupiter(input_mint, output_mint, amount, slippage)
+
+
+async def swap_instructions(quote: Dict, tip_lamports: int = 0, user_pubkey: Optional[str] = None) -> Dict:
+    """Instructions for a quote from get_quote(), built locally for pump.fun quotes."""
+    if is_pump_quote(quote):
+        return await swap_pump(quote, tip_lamports, user_pubkey)
+    return await swap_jupiter(quote, tip_lamports, user_pubkey)
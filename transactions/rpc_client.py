@@ -0,0 +1,299 @@
+import os, time, asyncio, logging
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+from dotenv import load_dotenv
+from helpers.client_session import get_session
+from helpers.metrics import observe, count
+from transactions.scored_endpoint import ScoredEndpoint, consume
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+RPC_URL  = os.getenv("RPC_URL")
+RPC_URLS = [u.strip() for u in os.getenv("RPC_URLS", "").split(",") if u.strip()] or [RPC_URL]
+
+# calls issued within this window go out as one JSON-RPC batch POST
+RPC_BATCH_WINDOW = float(os.getenv("RPC_BATCH_WINDOW_MS", "2")) / 1000
+RPC_MAX_BATCH    = 100
+RPC_TIMEOUT      = 10
+# with several RPC_URLS: a batch still unanswered after ~the endpoint's p95 is also sent to the next one
+RPC_HEDGE        = os.getenv("RPC_HEDGE", "1") == "1"
+RPC_HEDGE_MIN_MS = float(os.getenv("RPC_HEDGE_MIN_MS", "30"))
+RPC_HEDGE_MAX_MS = float(os.getenv("RPC_HEDGE_MAX_MS", "1500"))
+RPC_MAX_SLOT_LAG = 30     # slots behind the freshest endpoint before one is ranked down
+LATENCY_WINDOW   = 128    # recent latencies per endpoint the hedge delay is taken from
+
+# never duplicated onto a second endpoint
+_NO_HEDGE = {"sendTransaction", "requestAirdrop"}
+# balance-style reads that must not come from a node behind our last landed
+# transaction: position of their config object in params
+_READ_AFTER_WRITE = {
+    "getBalance": 1, "getAccountInfo": 1, "getMultipleAccounts": 1,
+    "getTokenAccountBalance": 1, "getTokenAccountsByOwner": 2,
+}
+# only reads at these commitments are pinned; the finalized bank trails our
+# confirmed write by ~32 slots
+_READ_AFTER_WRITE_COMMITMENTS = {"processed", "confirmed"}
+_MIN_CONTEXT_SLOT_NOT_REACHED = -32016
+
+_Call = Tuple[str, list, asyncio.Future]
+
+
+class RpcError(Exception):
+    """JSON-RPC error returned for a single call."""
+
+    def __init__(self, method: str, error: dict):
+        self.method = method
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(f"{method} failed: {error.get('message')} ({self.code})")
+
+
+class RpcEndpoint(ScoredEndpoint):
+    """One JSON-RPC provider with rolling latency and error scores and the newest slot it has answered at."""
+
+    def __init__(self, url: str):
+        super().__init__(url, RPC_TIMEOUT)
+        self.recent: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.slot = 0
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        super().record(elapsed_ms, ok)
+        if ok:
+            self.recent.append(elapsed_ms)
+
+    def p95(self) -> Optional[float]:
+        if len(self.recent) < 8:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[int(len(ordered) * 0.95)]
+
+    def score(self, head_slot: int = 0) -> float:
+        score = super().score()
+        if self.slot and head_slot - self.slot > RPC_MAX_SLOT_LAG:
+            score += RPC_TIMEOUT * 1000   # lagging node: stale reads
+        return score
+
+
+class _ExplicitBatch:
+    def __init__(self):
+        self.calls: List[_Call] = []
+        self.open = True
+
+_current_batch: ContextVar[Optional[_ExplicitBatch]] = ContextVar("rpc_batch", default=None)
+
+
+class RpcBatcher:
+    """
+    Queue JSON-RPC calls and send them as batch arrays.
+    `call()` returns a future resolving to that call's `result`
+    (or raising RpcError for that call only).
+
+    With several endpoints, each batch goes to the best-scored one (EWMA
+    latency, errors, slot lag). If it hasn't answered after about that
+    endpoint's recent p95, the same batch is hedged to the next endpoint
+    and the first answer wins. A failed endpoint fails over at once.
+    Balance reads carry minContextSlot of our last landed transaction, so
+    a lagging node can't serve a pre-swap balance; such calls are retried
+    elsewhere.
+    """
+
+    def __init__(self, urls: Sequence[str] = RPC_URLS, window: float = RPC_BATCH_WINDOW,
+                 max_batch: int = RPC_MAX_BATCH, hedge: bool = RPC_HEDGE):
+        if isinstance(urls, str):
+            urls = [urls]
+        self.endpoints = [RpcEndpoint(u) for u in urls]
+        self.url = self.endpoints[0].url
+        self.window = window
+        self.max_batch = max_batch
+        self.hedge = hedge
+        self.write_slot = 0
+        self._queue: List[_Call] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def note_write(self, slot: Optional[int]) -> None:
+        """A transaction of ours landed at `slot`: later balance reads must see it."""
+        if slot:
+            self.write_slot = max(self.write_slot, int(slot))
+
+    def ranked(self) -> List[RpcEndpoint]:
+        head = max(e.slot for e in self.endpoints)
+        return sorted(self.endpoints, key=lambda e: e.score(head))
+
+    def call(self, method: str, params: Optional[list] = None) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        entry = (method, params or [], fut)
+
+        batch = _current_batch.get()
+        if batch is not None and batch.open:
+            batch.calls.append(entry)
+            return fut
+
+        self._queue.append(entry)
+        if len(self._queue) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return fut
+
+    def flush(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        calls, self._queue = self._queue, []
+        self.dispatch(calls)
+
+    def dispatch(self, calls: List[_Call]) -> None:
+        for i in range(0, len(calls), self.max_batch):
+            asyncio.create_task(self._send(calls[i:i + self.max_batch]))
+
+    def _params(self, method: str, params: list) -> list:
+        index = _READ_AFTER_WRITE.get(method)
+        if index is None or not self.write_slot or len(params) <= index:
+            return params
+        config = params[index]
+        # no commitment means finalized, which can't see our write for ~13s yet
+        if not isinstance(config, dict) or config.get("commitment") not in _READ_AFTER_WRITE_COMMITMENTS:
+            return params
+        params = list(params)
+        params[index] = dict(config, minContextSlot=self.write_slot)
+        return params
+
+    async def _post(self, ep: RpcEndpoint, body: Any) -> Any:
+        start = time.monotonic()
+        try:
+            session = await get_session()
+            resp = await session.post(ep.url, json=body, timeout=RPC_TIMEOUT)
+            resp.raise_for_status()
+            data = await resp.json(content_type=None)
+        except Exception:
+            ep.record((time.monotonic() - start) * 1000, ok=False)
+            count("rpc", "error")
+            raise
+        elapsed = (time.monotonic() - start) * 1000
+        ep.record(elapsed, ok=True)
+        observe("rpc", elapsed, ep.url)
+        count("rpc", "ok")
+        for r in data if isinstance(data, list) else [data]:
+            result = r.get("result") if isinstance(r, dict) else None
+            if isinstance(result, dict) and isinstance(result.get("context"), dict):
+                ep.slot = max(ep.slot, result["context"].get("slot") or 0)
+        return data
+
+    async def _race(self, calls: List[_Call], body: Any, exclude: Sequence[RpcEndpoint]) -> Tuple[RpcEndpoint, Any]:
+        """Send `body` to the best endpoint, hedging / failing over down the ranking; first answer wins."""
+        ranked = [e for e in self.ranked() if e not in exclude] or self.ranked()
+        hedge = self.hedge and not any(method in _NO_HEDGE for method, _, _ in calls)
+        running: Dict[asyncio.Task, RpcEndpoint] = {}
+        last_exc: Optional[BaseException] = None
+
+        def launch() -> None:
+            ep = ranked[len(running)]
+            task = asyncio.create_task(self._post(ep, body))
+            task.add_done_callback(consume)
+            running[task] = ep
+
+        launch()
+        pending = set(running)
+        while pending:
+            delay = None
+            if hedge and len(running) < len(ranked):
+                p95 = ranked[len(running) - 1].p95()
+                delay = min(max(p95 if p95 is not None else RPC_HEDGE_MAX_MS, RPC_HEDGE_MIN_MS), RPC_HEDGE_MAX_MS) / 1000
+            done, pending = await asyncio.wait(pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if len(running) > 1:
+                        count("rpc_hedge", "won" if running[task] is not ranked[0] else "lost")
+                    return running[task], task.result()
+                last_exc = task.exception()
+            if len(running) < len(ranked) and (not done and hedge or done and not pending):
+                # slow: hedge to the next endpoint; failed: fail over to it
+                count("rpc_hedge", "sent" if not done else "failover")
+                launch()
+                pending = {t for t in running if not t.done()}
+        raise last_exc or RuntimeError("no RPC endpoints configured")
+
+    async def _send(self, calls: List[_Call], exclude: Sequence[RpcEndpoint] = ()) -> None:
+        body: Any = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": self._params(method, params)}
+            for i, (method, params, _) in enumerate(calls)
+        ]
+        if len(body) == 1:
+            body = body[0]
+        try:
+            ep, data = await self._race(calls, body, exclude)
+        except Exception as e:
+            for _, _, fut in calls:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        if isinstance(data, dict):
+            data = [data]
+        by_id = {r.get("id"): r for r in data if isinstance(r, dict)}
+        # a provider that rejects the whole batch answers with a single id-less error
+        batch_error = by_id.get(None, {}).get("error")
+
+        behind = []
+        for i, call in enumerate(calls):
+            method, _, fut = call
+            if fut.done():
+                continue
+            r = by_id.get(i)
+            if r is None:
+                fut.set_exception(RpcError(method, batch_error or {"message": "missing response"}))
+            elif r.get("error"):
+                if r["error"].get("code") == _MIN_CONTEXT_SLOT_NOT_REACHED and len(exclude) + 1 < len(self.endpoints):
+                    behind.append(call)
+                else:
+                    fut.set_exception(RpcError(method, r["error"]))
+            else:
+                fut.set_result(r.get("result"))
+        if behind:
+            # that node hasn't seen our last transaction yet; ask another
+            count("rpc", "behind")
+            await self._send(behind, list(exclude) + [ep])
+
+
+_rpc: Optional[RpcBatcher] = None
+
+def get_rpc() -> RpcBatcher:
+    """Return the shared batcher for RPC_URLS (or RPC_URL)."""
+    global _rpc
+    if _rpc is None:
+        _rpc = RpcBatcher()
+    return _rpc
+
+def rpc_call(method: str, params: Optional[list] = None) -> asyncio.Future:
+    """
+    Queue one JSON-RPC call on the shared batcher and return its future.
+    Calls made in the same ~2ms window share a single HTTP round trip.
+    """
+    return get_rpc().call(method, params)
+
+@contextmanager
+def rpc_batch():
+    """
+    Collect every rpc_call() made inside the block into one batch,
+    sent when the block exits:
+
+        with rpc_batch():
+            bal = rpc_call("getBalance", [owner])
+            sup = rpc_call("getTokenSupply", [mint])
+        balance, supply = await bal, await sup
+
+    Do not await the futures inside the block — they resolve after it exits.
+    """
+    batch = _ExplicitBatch()
+    token = _current_batch.set(batch)
+    try:
+        yield batch
+    finally:
+        _current_batch.reset(token)
+        batch.open = False
+        if batch.calls:
+            get_rpc().dispatch(batch.calls)
@@ -0,0 +1,46 @@
+import time, asyncio
+from typing import Optional
+
+EWMA_ALPHA      = 0.2
+ERROR_HALF_LIFE = 60   # seconds; lets an endpoint that failed earlier back to the top
+
+
+def consume(task: asyncio.Future) -> None:
+    """Done callback for a straggler nobody awaits: retrieve its error so asyncio doesn't report it."""
+    if not task.cancelled():
+        task.exception()
+
+
+class ScoredEndpoint:
+    """
+    An endpoint with rolling latency and error scores; callers rank by
+    `score()`, lowest first. `timeout` is what one failure is worth.
+    """
+
+    def __init__(self, url: str, timeout: float):
+        self.url = url
+        self.timeout = timeout
+        self.latency_ms: Optional[float] = None   # EWMA of successful calls
+        self.error_rate = 0.0                     # EWMA of failures (0..1)
+        self.calls = 0
+        self.failures = 0
+        self.last_failure = 0.0
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+            self.last_failure = time.monotonic()
+        if ok or self.latency_ms is None:
+            self.latency_ms = elapsed_ms if self.latency_ms is None else (
+                EWMA_ALPHA * elapsed_ms + (1 - EWMA_ALPHA) * self.latency_ms
+            )
+        self.error_rate = EWMA_ALPHA * (0.0 if ok else 1.0) + (1 - EWMA_ALPHA) * self.error_rate
+
+    def score(self) -> float:
+        # untried endpoints rank first so every one gets measured
+        if self.latency_ms is None:
+            return 0.0
+        # a failing endpoint costs us up to a full timeout, however fast it answers
+        decay = 0.5 ** ((time.monotonic() - self.last_failure) / ERROR_HALF_LIFE)
+        return self.latency_ms + self.error_rate * decay * self.timeout * 1000
@@ -0,0 +1,102 @@
+import os, time, asyncio, logging
+from typing import List, Optional
+from dotenv import load_dotenv
+from helpers.client_session import get_session
+from constants import JITO_RPC_URL
+from helpers.metrics import observe, count
+from transactions.scored_endpoint import ScoredEndpoint, consume
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+_JITO_REGIONS = ("amsterdam", "frankfurt", "ny", "tokyo", "slc")
+DEFAULT_JITO_ENDPOINTS = [JITO_RPC_URL] + [
+    f"https://{region}.mainnet.block-engine.jito.wtf/api/v1/transactions"
+    for region in _JITO_REGIONS
+]
+
+JITO_ENDPOINTS = [u.strip() for u in os.getenv("JITO_ENDPOINTS", "").split(",") if u.strip()] or DEFAULT_JITO_ENDPOINTS
+SEND_VIA_RPC   = os.getenv("SEND_VIA_RPC", "0") == "1"   # also submit through plain RPC sendTransaction
+SEND_FANOUT    = int(os.getenv("SEND_FANOUT", "3"))      # endpoints hit per send (top-K by score)
+SEND_TIMEOUT   = 10
+
+
+class SendEndpoint(ScoredEndpoint):
+    """One sendTransaction target with rolling latency and error scores."""
+
+    def __init__(self, url: str, kind: str = "jito"):
+        super().__init__(url, SEND_TIMEOUT)
+        self.kind = kind
+
+
+class TxSender:
+    """
+    Submit the same signed transaction to the top-K endpoints at once and
+    return the first valid signature. Slower endpoints keep running in the
+    background so their latency still feeds the ranking.
+    """
+
+    def __init__(self, endpoints: List[SendEndpoint], fanout: int = SEND_FANOUT):
+        self.endpoints = endpoints
+        self.fanout = max(1, fanout)
+
+    def ranked(self) -> List[SendEndpoint]:
+        return sorted(self.endpoints, key=lambda e: e.score())
+
+    async def send(self, tx_b64: str) -> str:
+        targets = self.ranked()[:self.fanout]
+        pending = {asyncio.create_task(self._send_one(ep, tx_b64)) for ep in targets}
+        for task in pending:
+            task.add_done_callback(consume)
+        last_exc: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_exc = task.exception()
+        raise last_exc or RuntimeError("No send endpoints configured")
+
+    async def _send_one(self, ep: SendEndpoint, tx_b64: str) -> str:
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "sendTransaction",
+            "params": [
+                tx_b64,
+                {"encoding": "base64", "skipPreflight": True, "maxRetries": 1}
+            ]
+        }
+        start = time.monotonic()
+        try:
+            session = await get_session()
+            r = await session.post(ep.url, json=payload, timeout=SEND_TIMEOUT)
+            r.raise_for_status()
+            res = await r.json()
+            if res.get("error"):
+                raise Exception(f"{ep.kind} send failed: {res['error'].get('message')}")
+            if not res.get("result"):
+                raise RuntimeError(f"{ep.kind} returned no signature: {res}")
+        except Exception as e:
+            ep.record((time.monotonic() - start) * 1000, ok=False)
+            count("send_endpoint", "error")
+            logger.debug("send via %s failed: %s", ep.url, e)
+            raise
+        elapsed = (time.monotonic() - start) * 1000
+        ep.record(elapsed, ok=True)
+        observe("send_endpoint", elapsed, ep.url)
+        count("send_endpoint", "ok")
+        return res["result"]
+
+
+_sender: Optional[TxSender] = None
+
+def get_tx_sender() -> TxSender:
+    """Return the shared sender built from JITO_ENDPOINTS (+ RPC_URL if SEND_VIA_RPC=1)."""
+    global _sender
+    if _sender is None:
+        endpoints = [SendEndpoint(url) for url in JITO_ENDPOINTS]
+        if SEND_VIA_RPC and os.getenv("RPC_URL"):
+            endpoints.append(SendEndpoint(os.getenv("RPC_URL"), kind="rpc"))
+        _sender = TxSender(endpoints)
+    return _sender
@@ -1,7 +1,6 @@
 import os, asyncio, logging
 import base64
-import base58
-from typing import Dict
+from typing import Dict, Sequence
 from solders.keypair import Keypair
 from solders.instruction import Instruction, AccountMeta
 from solders.address_lookup_table_account import AddressLookupTableAccount
@@ -9,134 +8,187 @@ from solders.message import MessageV0
 from solders.hash import Hash
 from solders.transaction import VersionedTransaction
 from solders.pubkey import Pubkey
-from helpers.client_session import get_session
-from solders.signature import Signature
-from helpers.ws_subscribe import ws_subscribe
-from constants import SOL_MINT, SELL, BUY, JITO_RPC_URL
+from solders import compute_budget
 from spl.token.instructions import create_associated_token_account
+from transactions.lookup_tables import lookup_tables
+from transactions.blockhash import get_blockhash_manager, BLOCKHASH_MIN_REMAINING
+from transactions.senders import get_tx_sender
+from transactions.rebroadcast import broadcast_until_landed
+from transactions.cu_profile import get_cu_profiles
+from transactions.jupiter_jito import solders_ix_to_jupiter
 
 logger = logging.getLogger(__name__)
 
-async def sign_and_send_transaction(
-    swap_resp: Dict,
-    user_keypair: Keypair
-) -> str:
+def _to_instruction(inst: Dict) -> Instruction:
+    prog = Pubkey.from_string(inst["programId"])
+    accounts = [
+        AccountMeta(
+            Pubkey.from_string(a["pubkey"]),
+            a["isSigner"],
+            a["isWritable"]
+        ) for a in inst["accounts"]
+    ]
+    data = base64.b64decode(inst["data"])
+    return Instruction(program_id=prog, data=data, accounts=accounts)
+
+_COMPUTE_BUDGET = str(compute_budget.ID)
+_SET_CU_LIMIT, _SET_CU_PRICE = 2, 3   # ComputeBudget instruction tags
+
+def set_compute_budget(swap_resp: Dict, unit_price: int = None, unit_limit: int = None) -> None:
     """
-    Build and send a Jito transaction, reusing aiohttp sessions for:
-      - Jito bundler (for sendTransaction)
+    Replace (or add) the SetComputeUnitPrice / SetComputeUnitLimit
+    instructions in a Jupiter swap response before it is built.
     """
-    try:
-        session = await get_session()
-        
+    wanted = {}
+    if unit_price is not None:
+        wanted[_SET_CU_PRICE] = compute_budget.set_compute_unit_price(int(unit_price))
+    if unit_limit is not None:
+        wanted[_SET_CU_LIMIT] = compute_budget.set_compute_unit_limit(int(unit_limit))
+    kept = []
+    for inst in swap_resp.get("computeBudgetInstructions", []):
+        data = base64.b64decode(inst["data"])
+        if inst["programId"] == _COMPUTE_BUDGET and data and data[0] in wanted:
+            continue
+        kept.append(inst)
+    swap_resp["computeBudgetInstructions"] = [solders_ix_to_jupiter(ix) for ix in wanted.values()] + kept
+
+def _pick_blockhash(swap_resp: Dict) -> Hash:
+    """
+    Freshest of Jupiter's blockhash and the one polled by the blockhash manager.
+    """
+    manager = get_blockhash_manager()
+    ours = manager.current()
+    meta = swap_resp.get("blockhashWithMetadata")
+    if meta:
+        jup_hash = Hash(bytes(meta["blockhash"]))
+        jup_valid = meta.get("lastValidBlockHeight")
+        if jup_valid:
+            manager.remember(jup_hash, int(jup_valid))
+        if ours is None or not jup_valid or int(jup_valid) >= ours.last_valid_block_height:
+            return jup_hash
+    if ours is None:
+        raise RuntimeError("No recent blockhash available")
+    return ours.blockhash
 
-        ix_list = []
-    
-        for key in ("computeBudgetInstructions", "setupInstructions", "otherInstructions"):
-            for inst in swap_resp.get(key, []):
-                prog = Pubkey.from_string(inst["programId"])
-                accounts = [
-                    AccountMeta(
-                        Pubkey.from_string(a["pubkey"]),
-                        a["isSigner"],
-                        a["isWritable"]
-                    ) for a in inst["accounts"]
-                ]
-                data = base64.b64decode(inst["data"])
-                ix_list.append(Instruction(program_id=prog, data=data, accounts=accounts))
-        swap_inst = swap_resp.get("swapInstruction")
-        if swap_inst:
-            prog = Pubkey.from_string(swap_inst["programId"])
-            accounts = [
-                AccountMeta(
-                    Pubkey.from_string(a["pubkey"]),
-                    a["isSigner"],
-                    a["isWritable"]
-                ) for a in swap_inst["accounts"]
-            ]
-            data = base64.b64decode(swap_inst["data"])
-            ix_list.append(Instruction(program_id=prog, data=data, accounts=accounts))
+def restamp(
+    tx: VersionedTransaction,
+    user_keypair: Keypair,
+    blockhash: Hash
+) -> VersionedTransaction:
+    """
+    Re-sign the same message with a new recent blockhash.
+    """
+    msg = tx.message
+    message = MessageV0(
+        msg.header,
+        msg.account_keys,
+        blockhash,
+        msg.instructions,
+        msg.address_table_lookups,
+    )
+    return VersionedTransaction(message, [user_keypair])
 
-        cleanup_inst = swap_resp.get("cleanupInstruction")
-        if cleanup_inst:
-            prog = Pubkey.from_string(cleanup_inst["programId"])
-            accounts = [
-                AccountMeta(
-                    Pubkey.from_string(a["pubkey"]),
-                    a["isSigner"],
-                    a["isWritable"]
-                ) for a in cleanup_inst["accounts"]
-            ]
-            data = base64.b64decode(cleanup_inst["data"])
-            ix_list.append(Instruction(program_id=prog, data=data, accounts=accounts))
+def ensure_fresh_blockhash(
+    tx: VersionedTransaction,
+    user_keypair: Keypair
+) -> VersionedTransaction:
+    """
+    Re-stamp `tx` with the latest blockhash when its own has fewer than
+    BLOCKHASH_MIN_REMAINING blocks left (or an unknown expiry).
+    """
+    manager = get_blockhash_manager()
+    latest = manager.current()
+    blockhash = tx.message.recent_blockhash
+    if latest is None or latest.blockhash == blockhash:
+        return tx
+    remaining = manager.remaining(blockhash)
+    if remaining is not None and remaining >= BLOCKHASH_MIN_REMAINING:
+        return tx
+    return restamp(tx, user_keypair, latest.blockhash)
 
-        bh_bytes = bytes(swap_resp["blockhashWithMetadata"]["blockhash"])
-        bh_b58 = base58.b58encode(bh_bytes).decode()
-        recent_blockhash = Hash.from_string(bh_b58)
+def build_transaction(
+    swap_resp: Dict,
+    user_keypair: Keypair,
+    lookup_table_accounts: Sequence[AddressLookupTableAccount] = ()
+) -> VersionedTransaction:
+    """
+    Decode Jupiter swap-instructions, compile a v0 message and sign it.
+    """
+    ix_list = []
+    for key in ("computeBudgetInstructions", "setupInstructions", "otherInstructions"):
+        for inst in swap_resp.get(key, []):
+            ix_list.append(_to_instruction(inst))
+    swap_inst = swap_resp.get("swapInstruction")
+    if swap_inst:
+        ix_list.append(_to_instruction(swap_inst))
+    cleanup_inst = swap_resp.get("cleanupInstruction")
+    if cleanup_inst:
+        ix_list.append(_to_instruction(cleanup_inst))
 
-        message = MessageV0.try_compile(
-            payer=user_keypair.pubkey(),
-            instructions=ix_list,
-            address_lookup_table_accounts=[],
-            recent_blockhash=recent_blockhash
-        )
-        tx = VersionedTransaction(message, [user_keypair])
-        tx_b64 = base64.b64encode(bytes(tx)).decode()
+    recent_blockhash = _pick_blockhash(swap_resp)
 
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "sendTransaction",
-            "params": [
-                tx_b64,
-                {"encoding": "base64", "skipPreflight": True, "maxRetries": 1}
-            ]
-        }
-        sig = None
-        side = SELL if swap_resp.get("inputMint") == SOL_MINT else BUY
+    message = MessageV0.try_compile(
+        payer=user_keypair.pubkey(),
+        instructions=ix_list,
+        address_lookup_table_accounts=list(lookup_table_accounts),
+        recent_blockhash=recent_blockhash
+    )
+    return VersionedTransaction(message, [user_keypair])
 
-        async def send_jito():
-            url = f"{JITO_RPC_URL}"
-            r = await session.post(url, json=payload, timeout=10)
-            r.raise_for_status()
-            res = await r.json()
-            result = res.get("result")
-            if not result: raise RuntimeError(f"Jito RPC returned no signature: {res}")
-            if res.get("error"): raise Exception(f"Jito send failed: {res['error']['message']}")
-            return res.get("result")
-        if side == SELL:
-            jito_task = asyncio.create_task(send_jito())
-            try:
-                sig = await asyncio.wait_for(jito_task, timeout=1)
-            except asyncio.TimeoutError:
-                sig = await asyncio.wait_for(jito_task, timeout=1)
-        else:
-            sig = await send_jito()
-        
-        async def wait_confirm(sig: str, timeout: float = 12.0):
-            sig_obj = Signature.from_string(sig)
-            agen = ws_subscribe("signature", sig_obj, commitment="confirmed")
-            pull = asyncio.create_task(agen.__anext__())
+async def prepare_transaction(
+    swap_resp: Dict,
+    user_keypair: Keypair
+) -> VersionedTransaction:
+    """
+    Resolve the route's address lookup tables (cached) and build the signed tx.
+    A route with a learned compute profile gets its tight CU limit here.
+    """
+    limit = get_cu_profiles().limit_for(swap_resp)
+    if limit is not None:
+        set_compute_budget(swap_resp, unit_limit=limit)
+        swap_resp["computeUnitLimit"] = limit
+    get_blockhash_manager().start()
+    tables = await lookup_tables.resolve(swap_resp.get("addressLookupTableAddresses", []))
+    return build_transaction(swap_resp, user_keypair, tables)
 
-            try:
-                notif = await asyncio.wait_for(asyncio.shield(pull), timeout)
-            except asyncio.TimeoutError:
-                pull.cancel()
-                raise Exception(f"⏱ Timed out waiting for confirmation of {sig}")
-            except StopAsyncIteration:
-                raise Exception(f"No WS notification received for {sig}")
-            else:
-                try:
-                    await agen.aclose()
-                except:
-                    pass
+async def send_transaction(tx: VersionedTransaction) -> str:
+    """
+    Send a signed transaction to the fastest block-engine endpoints at once
+    and return the first signature accepted.
+    """
+    tx_b64 = base64.b64encode(bytes(tx)).decode()
+    return await get_tx_sender().send(tx_b64)
 
-                status = notif.result.value
-                if status.err is None:
-                    return status
-                raise Exception(f"❌ On-chain error: {status.err}")
+async def send_and_confirm(
+    tx: VersionedTransaction,
+    user_keypair: Keypair = None
+) -> str:
+    """
+    Send an already signed transaction, rebroadcasting it until it confirms
+    or its blockhash expires. With `user_keypair`, a transaction whose
+    blockhash is about to expire (e.g. it sat in a queue) is re-stamped
+    and re-signed first.
+    """
+    try:
+        if user_keypair is not None:
+            tx = ensure_fresh_blockhash(tx, user_keypair)
+        report = await broadcast_until_landed(tx)
+        return report.signature
+    except Exception as e:
+        logger.warning('Error on jito send')
+        raise
 
-        await wait_confirm(sig)
-        return sig
+async def sign_and_send_transaction(
+    swap_resp: Dict,
+    user_keypair: Keypair
+) -> str:
+    """
+    Build and send a Jito transaction, reusing aiohttp sessions for:
+      - Jito bundler (for sendTransaction)
+    """
+    try:
+        tx = await prepare_transaction(swap_resp, user_keypair)
     except Exception as e:
         logger.warning('Error on jito sign')
-        raise
\ No newline at end of file
+        raise
+    return await send_and_confirm(tx)
@@ -2,59 +2,172 @@ import os, sys
 root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if root not in sys.path:
     sys.path.insert(0, root)
-from typing import Any, Dict
-from transactions.jupiter_jito import get_quote_jupiter, swap_jupiter
-from transactions.sign_jupiter_swap_instructions import sign_and_send_transaction
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from transactions.routes import get_quote, swap_instructions
+from transactions.sign_jupiter_swap_instructions import prepare_transaction, send_and_confirm
+from transactions.presign import presigned
 from constants import SOL_MINT, LAMPORTS_PER_SOL, BUY
 from dotenv import load_dotenv
-from transactions.account import get_token_account_balance, get_user_keypair
+from transactions.account import get_token_account_balance
+from transactions.wallets import Wallet, get_wallets
+from transactions.executor import get_swap_executor
 from helpers.swap_notification import swap_notification
+from helpers.metrics import span, observe, count
+from transactions.fee_estimator import tip_for, apply_priority_fee
+from transactions.cu_profile import get_cu_profiles
+from transactions.confirmations import OnChainError
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 load_dotenv()
 
-async def swap(
+def buy_params(task: Dict[str, Any]):
+    """(slippage %, tip lamports) a buy for this task is built with."""
+    slippage = float(task.get('buy_slippage') or float(task.get('slippage')) or 0)
+    tip_lamports = tip_for(task, 'buy_tip')
+    return slippage, tip_lamports
+
+async def execute_swap(
     *,
     address: str,
     side: str,
     task: Dict[str, Any],
-    reply_message = None
+    wallet: Optional[Wallet] = None,
+    quote: Optional[Dict] = None
 ) -> str:
     """
-    Unified swap:
+    Run one swap through to confirmation and return its signature:
       - side='buy': SOL→token
       - side='sell': token→SOL
+    Uses the default wallet unless `wallet` is given; a `quote` (shared
+    across wallets, or sized by the caller) replaces the one built from
+    the task. Tokens still on a pump.fun bonding curve are quoted and built
+    locally; everything else goes through Jupiter. Raises on any failure;
+    `swap()` is the notifying wrapper.
     """
-    try: 
-        tip_sol = (
-            float(task.get('buy_tip'))
-            if side == BUY
-            else float(task.get('sell_tip'))
-        )
-        tip_lamports = int(tip_sol * LAMPORTS_PER_SOL)
-        lamports = None
+    started = time.monotonic()
+    wallet = wallet or get_wallets().default()
+    tip_lamports = tip_for(task, 'buy_tip' if side == BUY else 'sell_tip')
+    lamports = None
 
-        slippage = None
+    slippage = None
 
-        if side==BUY:
-            in_mint, out_mint = SOL_MINT, address
-            sol_amt = float(task['amount'])
-            slippage = float(task.get('buy_slippage') or float(task.get('slippage')) or 0)
-            lamports = int(sol_amt * LAMPORTS_PER_SOL)
-        else:
-            in_mint, out_mint = address, SOL_MINT
-            token_info    = await get_token_account_balance(address)
+    if side==BUY:
+        in_mint, out_mint = SOL_MINT, address
+        sol_amt = float(task['amount'])
+        slippage, _ = buy_params(task)
+        lamports = int(sol_amt * LAMPORTS_PER_SOL)
+
+        prepared = presigned.take(
+            address=address, lamports=lamports, slippage=slippage,
+            tip_lamports=tip_lamports, keypair=wallet.keypair
+        )
+        if prepared:
+            count("presign", "hit")
+            sig = await send_and_confirm(prepared.tx, wallet.keypair)
+            observe("swap_total", (time.monotonic() - started) * 1000)
+            count("swap", "ok")
+            return sig
+    else:
+        in_mint, out_mint = address, SOL_MINT
+        slippage = float(task.get('sell_slippage') or 5)
+        if quote is None:
+            token_info    = await get_token_account_balance(address, wallet.address)
             token_balance = token_info['amount']
             pct = float(task.get('autosell_pct'))
-            slippage = float(task.get('sell_slippage') or 5)
             lamports   = int(token_balance * pct / 100)
-        
-        quote = await get_quote_jupiter(in_mint, out_mint, lamports, slippage)
-        tx_b64 = await swap_jupiter(quote, tip_lamports)
 
-        sig = await sign_and_send_transaction(tx_b64, get_user_keypair())
-        await swap_notification(reply_message=reply_message, task=task, address=address, side=side, tx_sig=sig)
-        return sig
+    if quote is None:
+        with span("quote"):
+            quote = await get_quote(in_mint, out_mint, lamports, slippage)
+    with span("swap_instructions"):
+        swap_resp = await swap_instructions(quote, tip_lamports, wallet.address)
+    apply_priority_fee(swap_resp, task)
+    with span("build"):
+        tx = await prepare_transaction(swap_resp, wallet.keypair)
+
+    try:
+        sig = await send_and_confirm(tx)
+    except OnChainError:
+        # landed but failed: if it ran out of compute under a learned limit, the route is relearned
+        get_cu_profiles().learn_later(str(tx.signatures[0]), swap_resp, swap_resp.get("computeUnitLimit"))
+        raise
+    get_cu_profiles().learn_later(sig, swap_resp, swap_resp.get("computeUnitLimit"))
+    observe("swap_total", (time.monotonic() - started) * 1000)
+    count("swap", "ok")
+    return sig
+
+async def swap(
+    *,
+    address: str,
+    side: str,
+    task: Dict[str, Any],
+    reply_message = None
+) -> Optional[str]:
+    """
+    Unified swap: execute_swap() plus a chat notification either way.
+    Returns the signature, or None when the swap failed.
+    """
+    try:
+        sig = await execute_swap(address=address, side=side, task=task)
     except Exception as e:
+        count("swap", "error")
         await swap_notification(reply_message=reply_message, task=task, address=address, side=side, error=f"Error on processing for {address} {e}")
+        return None
+    with span("notify"):
+        await swap_notification(reply_message=reply_message, task=task, address=address, side=side, tx_sig=sig)
+    return sig
+
+
+@dataclass
+class FanoutResult:
+    wallet: Wallet
+    signature: Optional[str] = None
+    error: Optional[str] = None
+
+
+async def fan_out_swap(
+    *,
+    address: str,
+    side: str,
+    task: Dict[str, Any],
+    wallets: List[Wallet]
+) -> List[FanoutResult]:
+    """
+    Run the same swap on every wallet at once, each on its own executor lane
+    (so it still queues behind that wallet's other swaps). Buys of a fixed
+    SOL amount share one quote. Never raises; errors are per wallet.
+    """
+    quote = None
+    if side == BUY:
+        slippage, _ = buy_params(task)
+        lamports = int(float(task['amount']) * LAMPORTS_PER_SOL)
+        try:
+            with span("quote"):
+                quote = await get_quote(SOL_MINT, address, lamports, slippage)
+        except Exception as e:
+            return [FanoutResult(w, error=str(e)) for w in wallets]
+
+    executor = get_swap_executor()
+    futures = []
+    for wallet in wallets:
+        async def job(wallet=wallet):
+            return await execute_swap(address=address, side=side, task=task, wallet=wallet, quote=quote)
+        try:
+            futures.append(executor.submit(wallet.address, job))
+        except Exception as e:
+            fut = asyncio.get_running_loop().create_future()
+            fut.set_exception(e)
+            futures.append(fut)
+
+    results = []
+    for wallet, outcome in zip(wallets, await asyncio.gather(*futures, return_exceptions=True)):
+        if isinstance(outcome, BaseException):
+            count("swap", "error")
+            results.append(FanoutResult(wallet, error=str(outcome)))
+        else:
+            results.append(FanoutResult(wallet, signature=outcome))
+    return results
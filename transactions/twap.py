@@ -0,0 +1,240 @@
+import os, time, random, asyncio, logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+from constants import SOL_MINT, LAMPORTS_PER_SOL, BUY
+from helpers.metrics import count
+from transactions.routes import get_quote
+from transactions.account import get_token_account_balance
+from transactions.wallets import Wallet, get_wallets
+from transactions.executor import get_swap_executor, ExecutorBusy
+from transactions.swap_jito import execute_swap, buy_params
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+TWAP_JITTER         = float(os.getenv("TWAP_JITTER", "0.2"))          # ± share of the slice interval
+TWAP_MAX_IMPACT_PCT = float(os.getenv("TWAP_MAX_IMPACT_PCT", "3"))    # skip a slice quoted above this
+TWAP_MAX_SLICES     = 200
+TWAP_BUSY_RETRY     = 1.0   # seconds between retries while the wallet lane is full
+
+
+class NothingToSell(Exception):
+    pass
+
+
+@dataclass
+class TwapOrder:
+    id: int
+    chat_id: int
+    mint: str
+    side: str
+    size: float              # SOL to spend (buy) or % of the holding to sell
+    slices: int
+    duration: float          # seconds
+    jitter: float
+    max_impact_pct: float
+    task: Dict[str, Any]
+    total: int = 0           # input units (lamports / raw token amount) for the whole order
+    spent: int = 0
+    received: int = 0        # output units, from the quotes of filled slices
+    done: int = 0            # slices attempted
+    filled: int = 0
+    skipped: List[str] = field(default_factory=list)
+    signatures: List[str] = field(default_factory=list)
+    status: str = "running"  # running | done | cancelled | failed
+    error: Optional[str] = None
+    started: float = field(default_factory=time.monotonic)
+    next_at: Optional[float] = None
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.spent, 0)
+
+    @property
+    def interval(self) -> float:
+        return self.duration / max(self.slices - 1, 1)
+
+
+ProgressCallback = Callable[[TwapOrder], Awaitable[None]]
+
+
+class TwapScheduler:
+    """
+    Splits a parent swap into `slices` child swaps spread over `duration`.
+    Every parent runs as its own task on asyncio timers; each child re-sizes
+    to remaining / slices left, is quoted right before it runs on the
+    wallet's swap lane, and is skipped (its size rolls into the later
+    slices) when the quote's priceImpactPct is above the order's limit.
+    """
+
+    def __init__(self):
+        self.orders: Dict[int, TwapOrder] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._next_id = 1
+
+    def start(
+        self, *, chat_id: int, mint: str, side: str, size: float, slices: int, duration: float,
+        task: Dict[str, Any], jitter: float = TWAP_JITTER, max_impact_pct: float = TWAP_MAX_IMPACT_PCT,
+        wallet: Optional[Wallet] = None, on_progress: Optional[ProgressCallback] = None
+    ) -> TwapOrder:
+        if not 1 <= slices <= TWAP_MAX_SLICES:
+            raise ValueError(f"Slices must be 1–{TWAP_MAX_SLICES}")
+        if duration < 0 or size <= 0 or not 0 <= jitter < 1:
+            raise ValueError("Invalid size, duration or jitter")
+        order = TwapOrder(
+            self._next_id, chat_id, mint, side, size, slices, duration, jitter, max_impact_pct, dict(task, side=side)
+        )
+        self._next_id += 1
+        self.orders[order.id] = order
+        self._tasks[order.id] = asyncio.create_task(
+            self._run(order, wallet or get_wallets().default(), on_progress)
+        )
+        return order
+
+    def cancel(self, order_id: int, chat_id: Optional[int] = None) -> bool:
+        order = self.orders.get(order_id)
+        if order is None or order.status != "running" or (chat_id is not None and order.chat_id != chat_id):
+            return False
+        order.status = "cancelled"
+        self._tasks[order_id].cancel()
+        return True
+
+    def active(self, chat_id: Optional[int] = None) -> List[TwapOrder]:
+        return [
+            o for o in self.orders.values()
+            if o.status == "running" and (chat_id is None or o.chat_id == chat_id)
+        ]
+
+    async def join(self) -> None:
+        """Wait for every running parent order (used by the bench)."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()), return_exceptions=True)
+
+    async def _run(self, order: TwapOrder, wallet: Wallet, on_progress: Optional[ProgressCallback]) -> None:
+        async def report():
+            if on_progress:
+                try:
+                    await on_progress(order)
+                except Exception as e:
+                    logger.warning("twap %s progress update failed: %s", order.id, e)
+
+        try:
+            if order.side == BUY:
+                order.total = int(order.size * LAMPORTS_PER_SOL)
+            else:
+                held = await get_token_account_balance(order.mint, wallet.address, fresh=True)
+                order.total = int(held["amount"] * order.size / 100)
+                if not order.total:
+                    raise NothingToSell("nothing to sell")
+
+            for i in range(order.slices):
+                if i:
+                    delay = order.interval * (1 + random.uniform(-order.jitter, order.jitter))
+                    order.next_at = time.monotonic() + delay
+                    await report()
+                    await asyncio.sleep(delay)
+                order.next_at = None
+                amount = order.remaining // (order.slices - i)
+                if amount <= 0:
+                    break
+                await self._child(order, wallet, amount)
+                order.done += 1
+            order.status = "done"
+        except asyncio.CancelledError:
+            order.status = "cancelled"
+        except Exception as e:
+            order.status, order.error = "failed", str(e)
+            logger.warning("twap %s failed: %s", order.id, e)
+        finally:
+            count("twap", order.status)
+            self._tasks.pop(order.id, None)
+            await report()
+
+    async def _child(self, order: TwapOrder, wallet: Wallet, amount: int) -> None:
+        """Quote, guard and run one slice on the wallet's lane; a skipped slice leaves `remaining` as is."""
+        if order.side == BUY:
+            in_mint, out_mint = SOL_MINT, order.mint
+            slippage, _ = buy_params(order.task)
+        else:
+            in_mint, out_mint = order.mint, SOL_MINT
+            slippage = float(order.task.get('sell_slippage') or 5)
+
+        started = False
+
+        async def job():
+            nonlocal started
+            started = True
+            if order.status != "running":
+                return None   # stopped while queued on the lane
+            size = amount
+            if order.side != BUY:
+                held = await get_token_account_balance(order.mint, wallet.address, fresh=True)
+                size = min(size, held["amount"])
+                if size <= 0:
+                    raise NothingToSell("nothing left to sell")
+            quote = await get_quote(in_mint, out_mint, size, slippage)
+            impact = float(quote.get("priceImpactPct") or 0) * 100
+            if impact > order.max_impact_pct:
+                return None   # expected under thin liquidity; not a lane failure
+            if order.status != "running":
+                return None   # stopped while quoting; don't send
+            # the child's own size, so a presigned buy of the parent amount can't be picked up
+            child = dict(order.task, amount=size / LAMPORTS_PER_SOL) if order.side == BUY else order.task
+            sig = await execute_swap(address=order.mint, side=order.side, task=child, wallet=wallet, quote=quote)
+            return sig, size, int(quote.get("outAmount") or 0)
+
+        executor = get_swap_executor()
+        while True:
+            try:
+                fut = executor.submit(wallet.address, job)
+                break
+            except ExecutorBusy:
+                # lane full; wait for it rather than dropping the slice
+                await asyncio.sleep(TWAP_BUSY_RETRY)
+        stopped = None
+        try:
+            result = await asyncio.shield(fut)
+        except asyncio.CancelledError as e:
+            if not started:
+                fut.cancel()   # still queued: the lane skips it
+                raise
+            # already running: it either bails out or sends, so wait and account for it
+            stopped = e
+            try:
+                result = await asyncio.shield(fut)
+            except Exception:
+                raise stopped
+        except NothingToSell:
+            raise
+        except Exception as e:
+            count("twap_slice", "error")
+            order.skipped.append(str(e))
+            return
+        if stopped is not None:
+            if result is not None:
+                self._record(order, *result)
+            raise stopped
+        if result is None:
+            count("twap_slice", "impact")
+            order.skipped.append(f"price impact above {order.max_impact_pct:g}%")
+            return
+        self._record(order, *result)
+
+    @staticmethod
+    def _record(order: TwapOrder, sig: str, spent: int, received: int) -> None:
+        count("twap_slice", "ok")
+        order.filled += 1
+        order.spent += spent
+        order.received += received
+        order.signatures.append(sig)
+
+
+_scheduler: Optional[TwapScheduler] = None
+
+def get_twap_scheduler() -> TwapScheduler:
+    """Return the shared TWAP/DCA scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = TwapScheduler()
+    return _scheduler
@@ -0,0 +1,258 @@
+import os, struct, asyncio, logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from solders.pubkey import Pubkey
+from solana.rpc.types import MemcmpOpts
+from helpers.ws_hub import get_ws_hub
+from helpers.metrics import count
+from transactions.rpc_client import rpc_call, rpc_batch
+from transactions.mint_info import get_mint_index, TOKEN_PROGRAM, TOKEN_2022_PROGRAM
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+WALLET_MIRROR             = os.getenv("WALLET_MIRROR", "1") == "1"
+WALLET_RECONCILE_INTERVAL = float(os.getenv("WALLET_RECONCILE_INTERVAL", "30"))  # seconds between RPC reconciles
+MIRROR_COMMITMENT         = "processed"   # same commitment as the direct balance reads
+TOKEN_ACCOUNT_SIZE        = 165           # Token program; Token-2022 accounts may carry extensions
+RESUBSCRIBE_DELAY         = 2.0
+
+# SPL token account layout (shared by Token-2022): mint, owner, amount
+_MINT_OFFSET, _OWNER_OFFSET, _AMOUNT_OFFSET = 0, 32, 64
+
+
+@dataclass
+class TokenHolding:
+    account: str
+    mint: str
+    amount: int
+    decimals: int
+    program: str
+    slot: int
+
+
+@dataclass
+class SolBalance:
+    lamports: int
+    slot: int
+
+
+class WalletMirror:
+    """
+    In-memory SOL + SPL (Token and Token-2022) balances for one owner.
+    Loaded once over RPC, then kept current by an account subscription on
+    the owner and owner-filtered program subscriptions on both token
+    programs. Every update carries its slot and older updates never
+    overwrite newer ones. A periodic RPC reconcile (and one after each
+    reconnect) catches anything the sockets missed, including closed accounts.
+    """
+
+    def __init__(self, owner: str, reconcile_interval: float = WALLET_RECONCILE_INTERVAL):
+        self.owner = owner
+        self.reconcile_interval = reconcile_interval
+        self.commitment = MIRROR_COMMITMENT
+        self.sol_balance: Optional[SolBalance] = None
+        self.accounts: Dict[str, TokenHolding] = {}
+        self.loaded = False
+        self._live = {"sol": False, TOKEN_PROGRAM: False, TOKEN_2022_PROGRAM: False}
+        self._reconcile_now: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def live(self) -> bool:
+        """True when every subscription is up, so local reads are current."""
+        return self.loaded and all(self._live.values())
+
+    @property
+    def slot(self) -> int:
+        slots = [h.slot for h in self.accounts.values()]
+        if self.sol_balance:
+            slots.append(self.sol_balance.slot)
+        return max(slots, default=-1)
+
+    # --- reads ----------------------------------------------------------
+
+    def sol(self) -> Optional[SolBalance]:
+        return self.sol_balance
+
+    def token(self, mint: str) -> Dict[str, int]:
+        """Same shape as get_token_account_balance(), plus the slot it was last seen at."""
+        held = [h for h in self.accounts.values() if h.mint == mint]
+        if not held:
+            return {"mint": mint, "amount": 0, "decimals": 0, "slot": self.slot}
+        return {
+            "mint": mint,
+            "amount": sum(h.amount for h in held),
+            "decimals": held[0].decimals,
+            "slot": max(h.slot for h in held),
+        }
+
+    def holdings(self) -> List[TokenHolding]:
+        return list(self.accounts.values())
+
+    # --- writes ---------------------------------------------------------
+
+    def apply_sol(self, lamports: int, slot: int) -> None:
+        if self.sol_balance is None or slot >= self.sol_balance.slot:
+            self.sol_balance = SolBalance(lamports, slot)
+
+    def apply_holding(self, holding: TokenHolding) -> None:
+        current = self.accounts.get(holding.account)
+        if current is None or holding.slot >= current.slot:
+            self.accounts[holding.account] = holding
+
+    def remove_holding(self, account: str, slot: int) -> None:
+        current = self.accounts.get(account)
+        if current is not None and slot >= current.slot:
+            del self.accounts[account]
+
+    def apply_parsed(self, keyed: dict, program: str, slot: int) -> None:
+        """Apply one jsonParsed getTokenAccountsByOwner entry."""
+        info = keyed["account"]["data"]["parsed"]["info"]
+        amount = info["tokenAmount"]
+        self.apply_holding(TokenHolding(
+            account=keyed["pubkey"], mint=info["mint"], amount=int(amount["amount"]),
+            decimals=int(amount["decimals"]), program=program, slot=slot,
+        ))
+
+    # --- lifecycle ------------------------------------------------------
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._reconcile_now = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._reconcile_loop()),
+            asyncio.create_task(self._watch_sol()),
+            asyncio.create_task(self._watch_program(TOKEN_PROGRAM)),
+            asyncio.create_task(self._watch_program(TOKEN_2022_PROGRAM)),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def reconcile(self) -> None:
+        """Reload everything over RPC in one batch and merge it by slot."""
+        owner_filter = {"encoding": "jsonParsed", "commitment": self.commitment}
+        with rpc_batch():
+            sol_call = rpc_call("getBalance", [self.owner, {"commitment": self.commitment}])
+            calls = {
+                program: rpc_call("getTokenAccountsByOwner", [self.owner, {"programId": program}, owner_filter])
+                for program in (TOKEN_PROGRAM, TOKEN_2022_PROGRAM)
+            }
+        sol = await sol_call
+        before = {a: h.amount for a, h in self.accounts.items()}
+        self.apply_sol(sol["value"], sol["context"]["slot"])
+        for program, call in calls.items():
+            result = await call
+            slot = result["context"]["slot"]
+            seen = set()
+            for keyed in result.get("value") or []:
+                seen.add(keyed["pubkey"])
+                self.apply_parsed(keyed, program, slot)
+            # accounts closed while we weren't listening
+            for account, holding in list(self.accounts.items()):
+                if holding.program == program and account not in seen:
+                    self.remove_holding(account, slot)
+        if self.loaded and before != {a: h.amount for a, h in self.accounts.items()}:
+            count("wallet_reconcile", "drift")
+        else:
+            count("wallet_reconcile", "ok")
+        self.loaded = True
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                count("wallet_reconcile", "error")
+                logger.warning("wallet %s reconcile failed: %s", self.owner, e)
+            try:
+                await asyncio.wait_for(self._reconcile_now.wait(), self.reconcile_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._reconcile_now.clear()
+
+    async def _subscribe_forever(self, key: str, method: str, args: tuple, kwargs: dict, handle) -> None:
+        while True:
+            sub = None
+            try:
+                sub = await get_ws_hub().subscribe(method, *args, **kwargs)
+                sub.on_resubscribe = self._reconcile_now.set
+                self._live[key] = True
+                # anything that changed before the subscription existed
+                self._reconcile_now.set()
+                async for notif in sub:
+                    await handle(notif)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("wallet %s %s subscription failed: %s", self.owner, key, e)
+            finally:
+                self._live[key] = False
+                if sub is not None:
+                    await sub.close()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    async def _watch_sol(self) -> None:
+        async def handle(notif):
+            self.apply_sol(notif.result.value.lamports, notif.result.context.slot)
+
+        await self._subscribe_forever(
+            "sol", "account", (Pubkey.from_string(self.owner),),
+            {"commitment": self.commitment, "encoding": "base64"}, handle,
+        )
+
+    async def _watch_program(self, program: str) -> None:
+        filters = [MemcmpOpts(offset=_OWNER_OFFSET, bytes=self.owner)]
+        if program == TOKEN_PROGRAM:
+            filters.insert(0, TOKEN_ACCOUNT_SIZE)
+
+        async def handle(notif):
+            slot = notif.result.context.slot
+            keyed = notif.result.value
+            account, data = str(keyed.pubkey), bytes(keyed.account.data)
+            if str(keyed.account.owner) != program or len(data) < _AMOUNT_OFFSET + 8:
+                self.remove_holding(account, slot)
+                return
+            mint = str(Pubkey.from_bytes(data[_MINT_OFFSET:_MINT_OFFSET + 32]))
+            (amount,) = struct.unpack_from("<Q", data, _AMOUNT_OFFSET)
+            current = self.accounts.get(account)
+            decimals = current.decimals if current else await self._decimals(mint)
+            self.apply_holding(TokenHolding(account, mint, amount, decimals, program, slot))
+
+        await self._subscribe_forever(
+            program, "program", (Pubkey.from_string(program),),
+            {"commitment": self.commitment, "encoding": "base64", "filters": filters}, handle,
+        )
+
+    async def _decimals(self, mint: str) -> int:
+        try:
+            return (await get_mint_index().get(mint)).decimals
+        except Exception:
+            return 0
+
+
+_mirrors: Dict[str, WalletMirror] = {}
+
+def get_wallet_mirror(owner: str) -> Optional[WalletMirror]:
+    """The running mirror for `owner`, or None if it isn't mirrored."""
+    return _mirrors.get(owner)
+
+def start_wallet_mirrors(owners) -> None:
+    """Start mirroring each owner (no-op when WALLET_MIRROR=0)."""
+    if not WALLET_MIRROR:
+        return
+    for owner in owners:
+        mirror = _mirrors.get(owner)
+        if mirror is None:
+            mirror = _mirrors[owner] = WalletMirror(owner)
+        mirror.start()
+
+async def stop_wallet_mirrors() -> None:
+    for mirror in _mirrors.values():
+        await mirror.stop()
+    _mirrors.clear()
@@ -0,0 +1,96 @@
+import os, logging
+from dataclasses import dataclass
+from typing import List, Optional
+from dotenv import load_dotenv
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Wallet:
+    index: int          # 1-based, as shown in chat
+    keypair: Keypair
+    pubkey: Pubkey
+    address: str        # str(pubkey), cached for RPC params and lane keys
+
+    @property
+    def label(self) -> str:
+        return f"W{self.index} {self.address[:4]}…{self.address[-4:]}"
+
+
+def _parse(key: str, source: str) -> Keypair:
+    try:
+        return Keypair.from_base58_string(key.strip())
+    except Exception as e:
+        raise RuntimeError(f"❌ Invalid {source}: {e}")
+
+
+class WalletRegistry:
+    """
+    Every trading keypair, parsed once at startup.
+    SOL_PRIVATE_KEY is wallet 1; SOL_PRIVATE_KEYS (comma-separated) adds more.
+    """
+
+    def __init__(self, primary: Optional[str], extra: str = ""):
+        keys = []
+        if primary:
+            keys.append(_parse(primary, "SOL_PRIVATE_KEY"))
+        for i, key in enumerate(k for k in extra.split(",") if k.strip()):
+            keys.append(_parse(key, f"SOL_PRIVATE_KEYS entry {i + 1}"))
+
+        self.wallets: List[Wallet] = []
+        seen = set()
+        for kp in keys:
+            pub = kp.pubkey()
+            if pub in seen:
+                continue
+            seen.add(pub)
+            self.wallets.append(Wallet(len(self.wallets) + 1, kp, pub, str(pub)))
+
+    def __len__(self) -> int:
+        return len(self.wallets)
+
+    def default(self) -> Wallet:
+        if not self.wallets:
+            raise RuntimeError("❌ SOL_PRIVATE_KEY not set")
+        return self.wallets[0]
+
+    def get(self, index: int) -> Wallet:
+        if not 1 <= index <= len(self.wallets):
+            raise ValueError(f"No wallet {index} (have {len(self.wallets)})")
+        return self.wallets[index - 1]
+
+    def select(self, spec: Optional[str] = None) -> List[Wallet]:
+        """
+        Wallets matching a spec like "1-8", "1,3,5" or "all" (the default).
+        """
+        if not spec or spec.strip().lower() == "all":
+            return list(self.wallets)
+        picked: List[Wallet] = []
+        for part in spec.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            lo, sep, hi = part.partition("-")
+            try:
+                first, last = int(lo), int(hi) if sep else int(lo)
+            except ValueError:
+                raise ValueError(f"Bad wallet spec {part!r}; use e.g. 1-8 or 1,3,5")
+            for i in range(first, last + 1):
+                wallet = self.get(i)
+                if wallet not in picked:
+                    picked.append(wallet)
+        return picked
+
+
+_registry: Optional[WalletRegistry] = None
+
+def get_wallets() -> WalletRegistry:
+    """Return the shared registry built from SOL_PRIVATE_KEY / SOL_PRIVATE_KEYS."""
+    global _registry
+    if _registry is None:
+        _registry = WalletRegistry(os.getenv("SOL_PRIVATE_KEY"), os.getenv("SOL_PRIVATE_KEYS", ""))
+    return _registry